@@ -0,0 +1,29 @@
+"""add asset content hashes
+
+Revision ID: 14e44e98c70f
+Revises: 4c0a9fbf8a7d
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "14e44e98c70f"
+down_revision = "4c0a9fbf8a7d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("assets", sa.Column("size_bytes", sa.BigInteger()))
+    op.add_column("assets", sa.Column("crc32c", sa.String(length=16)))
+    op.add_column("assets", sa.Column("sha256", sa.String(length=64)))
+
+
+def downgrade() -> None:
+    op.drop_column("assets", "sha256")
+    op.drop_column("assets", "crc32c")
+    op.drop_column("assets", "size_bytes")
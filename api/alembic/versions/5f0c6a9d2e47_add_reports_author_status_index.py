@@ -0,0 +1,24 @@
+"""add reports author status index
+
+Revision ID: 5f0c6a9d2e47
+Revises: e3a8f27c5d10
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5f0c6a9d2e47"
+down_revision = "e3a8f27c5d10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_reports_author_id_status", "reports", ["author_id", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reports_author_id_status", table_name="reports")
@@ -0,0 +1,24 @@
+"""add jobs idempotency index
+
+Revision ID: 9d2f61c3a8e5
+Revises: 14e44e98c70f
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9d2f61c3a8e5"
+down_revision = "14e44e98c70f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_jobs_type_idempotency_key", "jobs", ["type", "idempotency_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_type_idempotency_key", table_name="jobs")
@@ -0,0 +1,33 @@
+"""add assets variant
+
+Revision ID: a1c7e5b3f920
+Revises: 5f0c6a9d2e47
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1c7e5b3f920"
+down_revision = "5f0c6a9d2e47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assets",
+        sa.Column("variant", sa.String(length=32), nullable=False, server_default="original"),
+    )
+    op.drop_index("ix_assets_report_id_kind", table_name="assets")
+    op.create_index("ix_assets_report_id_kind_variant", "assets", ["report_id", "kind", "variant"])
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM assets WHERE variant <> 'original'")
+    op.drop_index("ix_assets_report_id_kind_variant", table_name="assets")
+    op.create_index("ix_assets_report_id_kind", "assets", ["report_id", "kind"])
+    op.drop_column("assets", "variant")
@@ -0,0 +1,25 @@
+"""add jobs lease_expires_at
+
+Revision ID: b7e4d1c09a52
+Revises: 9d2f61c3a8e5
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e4d1c09a52"
+down_revision = "9d2f61c3a8e5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "lease_expires_at")
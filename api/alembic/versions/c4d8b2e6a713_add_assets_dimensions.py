@@ -0,0 +1,27 @@
+"""add assets width and height
+
+Revision ID: c4d8b2e6a713
+Revises: a1c7e5b3f920
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c4d8b2e6a713"
+down_revision = "a1c7e5b3f920"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("assets", sa.Column("width", sa.Integer(), nullable=True))
+    op.add_column("assets", sa.Column("height", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("assets", "height")
+    op.drop_column("assets", "width")
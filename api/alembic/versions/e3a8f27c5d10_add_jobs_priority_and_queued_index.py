@@ -0,0 +1,35 @@
+"""add jobs priority and queued index
+
+Revision ID: e3a8f27c5d10
+Revises: b7e4d1c09a52
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e3a8f27c5d10"
+down_revision = "b7e4d1c09a52"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "jobs",
+        sa.Column("priority", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    op.create_index(
+        "ix_jobs_queued",
+        "jobs",
+        [sa.text("priority DESC"), "created_at"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_queued", table_name="jobs")
+    op.drop_column("jobs", "priority")
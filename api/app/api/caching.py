@@ -0,0 +1,50 @@
+"""Conditional GET helpers (weak ETags and ``If-None-Match``)."""
+
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Clients may keep a copy but must revalidate it on every poll.
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: object) -> str:
+    digest = hashlib.sha1(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def matches_if_none_match(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` against the request's ``If-None-Match``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_opaque(tag) == _opaque(etag) for tag in header.split(","))
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
+
+
+__all__ = [
+    "CACHE_CONTROL",
+    "weak_etag",
+    "matches_if_none_match",
+    "set_cache_headers",
+    "not_modified",
+]
@@ -2,17 +2,27 @@ from fastapi import HTTPException, status
 
 from app.core.exceptions import BadRequestError, ConflictError, ForbiddenError, NotFoundError
 
+_STATUS_CODES: dict[type[Exception], int] = {
+    NotFoundError: status.HTTP_404_NOT_FOUND,
+    ForbiddenError: status.HTTP_403_FORBIDDEN,
+    ConflictError: status.HTTP_409_CONFLICT,
+    BadRequestError: status.HTTP_400_BAD_REQUEST,
+}
+
+
+def service_error_status(exc: Exception) -> int | None:
+    """HTTP status for a service exception, or ``None`` if it is not one."""
+    for exc_type, status_code in _STATUS_CODES.items():
+        if isinstance(exc, exc_type):
+            return status_code
+    return None
+
 
 def handle_service_error(exc: Exception) -> None:
-    if isinstance(exc, NotFoundError):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    if isinstance(exc, ForbiddenError):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
-    if isinstance(exc, ConflictError):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
-    if isinstance(exc, BadRequestError):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    status_code = service_error_status(exc)
+    if status_code is not None:
+        raise HTTPException(status_code=status_code, detail=str(exc)) from exc
     raise exc
 
 
-__all__ = ["handle_service_error"]
+__all__ = ["handle_service_error", "service_error_status"]
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from pathlib import PurePosixPath
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_author_id
 from app.api.errors import handle_service_error
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.enums import AssetKind
+from app.db.session import get_db, get_read_db
 from app.schemas.asset import (
     AssetAttachRequest,
     AssetReadUrlRequest,
@@ -13,6 +17,7 @@ from app.schemas.asset import (
     AssetUploadUrlResponse,
 )
 from app.services import asset_service, report_service
+from app.services.storage import get_storage, is_configured
 from app.utils.storage_paths import gcs_object_key, mime_to_ext
 
 router = APIRouter(prefix="/v1/reports/{report_id}/assets", tags=["assets"])
@@ -22,6 +27,7 @@ router = APIRouter(prefix="/v1/reports/{report_id}/assets", tags=["assets"])
 async def create_upload_url(
     report_id: str,
     payload: AssetUploadUrlRequest,
+    origin: str | None = Header(None),
     author_id: str = Depends(get_author_id),
     db: AsyncSession = Depends(get_db),
 ):
@@ -32,7 +38,53 @@ async def create_upload_url(
 
     ext = mime_to_ext(payload.mime_type)
     gcs_path = gcs_object_key(report_id, payload.kind, ext)
-    return AssetUploadUrlResponse(gcs_path=gcs_path, upload_url=None)
+    if not is_configured():
+        return AssetUploadUrlResponse(gcs_path=gcs_path, upload_url=None)
+
+    storage = get_storage()
+    if payload.crc32c:
+        # Re-uploads of identical content (e.g. resubmitting a report) skip the transfer.
+        existing = await storage.stat(gcs_path)
+        if (
+            existing is not None
+            and existing.crc32c == payload.crc32c
+            and payload.size_bytes in (None, existing.size)
+        ):
+            return AssetUploadUrlResponse(
+                gcs_path=gcs_path,
+                upload_url=None,
+                already_uploaded=True,
+            )
+
+    # Videos are large enough that a dropped connection should not restart the upload.
+    resumable = payload.resumable
+    if resumable is None:
+        resumable = payload.kind == AssetKind.VIDEO
+
+    if resumable:
+        upload_url = await storage.create_resumable_upload_url(
+            gcs_path,
+            content_type=payload.mime_type,
+            size=payload.size_bytes,
+            origin=origin,
+        )
+        return AssetUploadUrlResponse(
+            gcs_path=gcs_path,
+            upload_url=upload_url,
+            resumable=True,
+        )
+
+    upload_url = await storage.signed_put_url(
+        gcs_path,
+        content_type=payload.mime_type,
+        expires_s=settings.GCS_UPLOAD_URL_TTL_S,
+    )
+    return AssetUploadUrlResponse(
+        gcs_path=gcs_path,
+        upload_url=upload_url,
+        upload_headers={"Content-Type": payload.mime_type},
+        expires_in_s=settings.GCS_UPLOAD_URL_TTL_S,
+    )
 
 
 @router.post("/attach", response_model=AssetResponse)
@@ -42,6 +94,41 @@ async def attach_asset(
     author_id: str = Depends(get_author_id),
     db: AsyncSession = Depends(get_db),
 ):
+    try:
+        await report_service.get_report(db, report_id, author_id)
+    except Exception as exc:
+        handle_service_error(exc)
+
+    # Only the key issued by upload-url for this report and kind may be attached.
+    if payload.mime_type:
+        ext = mime_to_ext(payload.mime_type)
+    else:
+        ext = PurePosixPath(payload.gcs_path).suffix.lstrip(".")
+    if payload.gcs_path != gcs_object_key(report_id, payload.kind, ext):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="gcs_path is not the upload path for this report and kind",
+        )
+
+    # Dedup keys on the size and CRC32C storage reports; the bytes never pass
+    # through the API. sha256 is filled in by the worker that reads the object.
+    size_bytes, crc32c = payload.size_bytes, payload.crc32c
+    if is_configured():
+        try:
+            stored = await get_storage().stat(payload.gcs_path)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        if stored is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded object not found"
+            )
+        if crc32c and stored.crc32c and crc32c != stored.crc32c:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded object checksum does not match",
+            )
+        size_bytes, crc32c = stored.size, stored.crc32c or crc32c
+
     try:
         return await asset_service.upsert_asset_ready(
             db,
@@ -50,6 +137,8 @@ async def attach_asset(
             kind=payload.kind,
             gcs_path=payload.gcs_path,
             mime_type=payload.mime_type,
+            size_bytes=size_bytes,
+            crc32c=crc32c,
         )
     except Exception as exc:
         handle_service_error(exc)
@@ -59,7 +148,7 @@ async def attach_asset(
 async def list_assets(
     report_id: str,
     author_id: str = Depends(get_author_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     try:
         return await asset_service.list_assets(db, report_id, author_id)
@@ -72,18 +161,36 @@ async def read_asset_url(
     report_id: str,
     payload: AssetReadUrlRequest,
     author_id: str = Depends(get_author_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     try:
         assets = await asset_service.list_assets(db, report_id, author_id)
     except Exception as exc:
         handle_service_error(exc)
 
-    asset = next((item for item in assets if item.kind == payload.kind), None)
+    asset = asset_service.pick_asset(
+        assets,
+        payload.kind,
+        variant=payload.variant,
+        width=payload.width,
+        mime_types=payload.mime_types,
+    )
     if asset is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
 
-    return AssetReadUrlResponse(gcs_path=asset.gcs_path, url=None)
+    if not is_configured():
+        return AssetReadUrlResponse(
+            gcs_path=asset.gcs_path, url=None, width=asset.width, mime_type=asset.mime_type
+        )
+
+    url = await get_storage().signed_get_url(asset.gcs_path, expires_s=settings.GCS_READ_URL_TTL_S)
+    return AssetReadUrlResponse(
+        gcs_path=asset.gcs_path,
+        url=url,
+        expires_in_s=settings.GCS_READ_URL_TTL_S,
+        width=asset.width,
+        mime_type=asset.mime_type,
+    )
 
 
 @router.post("/delete", status_code=status.HTTP_501_NOT_IMPLEMENTED)
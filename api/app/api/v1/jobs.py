@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.caching import matches_if_none_match, not_modified, set_cache_headers, weak_etag
 from app.api.deps import get_author_id
 from app.api.errors import handle_service_error
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.schemas.job import JobResponse
 from app.services import report_service
 
@@ -13,10 +14,17 @@ router = APIRouter(prefix="/v1/reports/{report_id}/jobs", tags=["jobs"])
 @router.get("", response_model=list[JobResponse])
 async def list_jobs(
     report_id: str,
+    request: Request,
+    response: Response,
     author_id: str = Depends(get_author_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     try:
+        version = await report_service.report_version(db, report_id, author_id)
+        etag = weak_etag("jobs", report_id, *version)
+        if matches_if_none_match(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
         return await report_service.list_jobs(db, report_id, author_id)
     except Exception as exc:
         handle_service_error(exc)
@@ -1,24 +1,56 @@
 from datetime import date
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.caching import matches_if_none_match, not_modified, set_cache_headers, weak_etag
 from app.api.deps import get_author_id
-from app.api.errors import handle_service_error
+from app.api.errors import handle_service_error, service_error_status
+from app.core.config import settings
 from app.core.enums import JobStatus, ReportStatus
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, read_sessionmaker
 from app.schemas.report import (
+    ReportBatchSubmitRequest,
+    ReportBatchSubmitResponse,
+    ReportBatchSubmitResult,
     ReportCreate,
     ReportDetail,
+    ReportImportError,
+    ReportImportResponse,
     ReportListItem,
     ReportResponse,
+    ReportStats,
     ReportUpdate,
 )
 from app.services import report_service
-from app.services.queue import enqueue_job
+from app.services.queue import enqueue_job, enqueue_jobs
+from app.services.report_export import export_reports
+from app.utils.records import iter_records
 
 router = APIRouter(prefix="/v1/reports", tags=["reports"])
 
+_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_PROJECTED_ROWS = TypeAdapter(list[dict[str, Any]])
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    """Validate a ``fields=a,b`` projection against the list item schema."""
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested).difference(ReportListItem.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    # Always return the id so clients can key and link rows.
+    return ["id", *dict.fromkeys(name for name in requested if name != "id")]
+
 
 @router.post("", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_report(
@@ -32,6 +64,35 @@ async def create_report(
         handle_service_error(exc)
 
 
+@router.post(":import", response_model=ReportImportResponse)
+async def import_reports(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] | None = Query(
+        None, alias="format", description="Defaults from Content-Type (text/csv or NDJSON)"
+    ),
+    author_id: str = Depends(get_author_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create draft reports from a streamed NDJSON or CSV body (date, opponent, content)."""
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if content_type.startswith("text/csv") else "ndjson"
+    try:
+        imported, errors = await report_service.import_reports(
+            db,
+            author_id,
+            iter_records(request.stream(), fmt),
+            batch_size=settings.REPORT_IMPORT_BATCH_SIZE,
+        )
+    except Exception as exc:
+        handle_service_error(exc)
+    return ReportImportResponse(
+        imported=imported,
+        failed=len(errors),
+        errors=[ReportImportError(row=row, error=error) for row, error in errors],
+    )
+
+
 @router.patch("/{report_id}", response_model=ReportResponse)
 async def update_report(
     report_id: str,
@@ -45,21 +106,55 @@ async def update_report(
         handle_service_error(exc)
 
 
+@router.get("/stats", response_model=ReportStats)
+async def report_stats(
+    author_id: str = Depends(get_author_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        counts = await report_service.count_reports_by_status(db, author_id)
+        return ReportStats(total=sum(counts.values()), counts=counts)
+    except Exception as exc:
+        handle_service_error(exc)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_report_rows(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include_asset_urls: bool = Query(False, description="Add signed URLs for ready assets"),
+    author_id: str = Depends(get_author_id),
+):
+    """Stream every report of the author as NDJSON or CSV, oldest first."""
+    sessionmaker = await read_sessionmaker(request)
+    return StreamingResponse(
+        export_reports(sessionmaker, author_id, fmt, include_asset_urls=include_asset_urls),
+        media_type=_EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="reports.{fmt}"'},
+    )
+
+
 @router.get("/{report_id}", response_model=ReportDetail)
 async def get_report(
     report_id: str,
+    request: Request,
+    response: Response,
     author_id: str = Depends(get_author_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     try:
+        version = await report_service.report_version(db, report_id, author_id)
+        etag = weak_etag("report", report_id, *version)
+        if matches_if_none_match(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+
         report = await report_service.get_report(db, report_id, author_id)
         assets = await report_service.list_assets(db, report_id, author_id)
         jobs = await report_service.list_jobs(db, report_id, author_id)
-        return ReportDetail(
-            **ReportResponse.model_validate(report).model_dump(),
-            assets=assets,
-            jobs=jobs,
-        )
+        # Returning a ready model lets FastAPI skip re-validation and dump it
+        # straight to JSON bytes.
+        return ReportDetail.from_orm_parts(report, assets, jobs)
     except Exception as exc:
         handle_service_error(exc)
 
@@ -72,11 +167,13 @@ async def list_reports(
     opponent: str | None = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
     author_id: str = Depends(get_author_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    projection = _parse_fields(fields)
     try:
-        return await report_service.list_reports(
+        reports = await report_service.list_reports(
             db,
             author_id,
             status=status,
@@ -85,7 +182,12 @@ async def list_reports(
             opponent=opponent,
             limit=limit,
             offset=offset,
+            fields=projection,
         )
+        if projection is None:
+            return reports
+        rows = [{name: getattr(report, name) for name in projection} for report in reports]
+        return Response(_PROJECTED_ROWS.dump_json(rows), media_type="application/json")
     except Exception as exc:
         handle_service_error(exc)
 
@@ -113,6 +215,48 @@ async def submit_report(
         handle_service_error(exc)
 
 
+@router.post(":batchSubmit", response_model=ReportBatchSubmitResponse)
+async def batch_submit_reports(
+    payload: ReportBatchSubmitRequest,
+    author_id: str = Depends(get_author_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        report_ids = list(dict.fromkeys(payload.report_ids))
+        outcomes, jobs = await report_service.submit_reports(db, report_ids, author_id)
+        await db.commit()
+        try:
+            await enqueue_jobs(
+                [(job.id, job.type.value) for job in jobs if job.status != JobStatus.SUCCEEDED]
+            )
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Failed to enqueue jobs",
+            ) from exc
+    except Exception as exc:
+        handle_service_error(exc)
+
+    jobs_by_report: dict[str, list] = {}
+    for job in jobs:
+        jobs_by_report.setdefault(job.report_id, []).append(job)
+
+    results = [
+        ReportBatchSubmitResult(
+            report_id=report_id, status_code=service_error_status(outcome), error=str(outcome)
+        )
+        if isinstance(outcome, Exception)
+        else ReportBatchSubmitResult(
+            report_id=report_id,
+            status_code=status.HTTP_200_OK,
+            report=ReportResponse.model_validate(outcome),
+            jobs=jobs_by_report.get(report_id, []),
+        )
+        for report_id, outcome in outcomes.items()
+    ]
+    return ReportBatchSubmitResponse(results=results)
+
+
 @router.post("/{report_id}/publish", response_model=ReportResponse)
 async def publish_report(
     report_id: str,
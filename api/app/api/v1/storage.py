@@ -0,0 +1,51 @@
+import mimetypes
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.services.storage import LocalStorage, get_storage, verify_local_url
+
+router = APIRouter(prefix="/v1/storage", tags=["storage"])
+
+
+def _get_local_storage(method: str, path: str, expires: int, signature: str) -> LocalStorage:
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not verify_local_url(method, path, expires, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired signature"
+        )
+    return storage
+
+
+@router.get("/{path:path}")
+async def download_object(
+    path: str,
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    storage = _get_local_storage("GET", path, expires, signature)
+    try:
+        file_path = storage.resolve(path)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found") from exc
+    if not file_path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    media_type, _ = mimetypes.guess_type(file_path.name)
+    return FileResponse(file_path, media_type=media_type or "application/octet-stream")
+
+
+@router.put("/{path:path}")
+async def upload_object(
+    path: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    storage = _get_local_storage("PUT", path, expires, signature)
+    try:
+        await storage.upload_stream(path, request.stream())
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return Response(status_code=status.HTTP_200_OK)
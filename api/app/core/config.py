@@ -1,20 +1,70 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_S: float = 30.0
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    WORKER_DB_POOL_SIZE: int = 2
+    WORKER_DB_MAX_OVERFLOW: int = 2
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PGBOUNCER: bool = False
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int | None = None
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_S: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_S: float = 5.0
+    READ_YOUR_WRITES_S: int = 5
     REDIS_URL: str = "redis://localhost:6379/0"
+    QUEUE_BACKEND: Literal["redis", "postgres"] = "redis"
+    QUEUE_POLL_INTERVAL_S: float = 5.0
     GEMINI_EXTRACT_MODEL: str = "gemini-2.5-flash"
     GEMINI_REQUEST_TIMEOUT_S: float = 30.0
+    EXTRACT_PROMPT_MAX_CHARS: int = 12000
     EXTRACT_MOMENTS_MAX_ATTEMPTS: int = 3
+    EXTRACT_BATCH_MAX_SIZE: int = 1
+    EXTRACT_BATCH_WINDOW_S: float = 0.5
+    EXTRACT_BATCH_TIMEOUT_S: float = 90.0
+    JOB_LEASE_S: int = 300
+    WORKER_CONCURRENCY: int = 1
+    IMAGE_PROCESS_WORKERS: int = 2
+    GIMP_INPUT_MAX_SIDE: int = 1536
+    THUMBNAIL_WIDTHS: list[int] = [320, 640, 1280]
+    THUMBNAIL_FORMATS: list[str] = ["avif", "webp"]
+    VIDEO_POSTPROCESS_ENABLED: bool = False
+    FFMPEG_PATH: str = "ffmpeg"
+    FFMPEG_CONCURRENCY: int = 1
+    FFMPEG_TIMEOUT_S: float = 300.0
+    VIDEO_MOBILE_MAX_HEIGHT: int = 480
+    VIDEO_MOBILE_BITRATE_KBPS: int = 800
     REPLICATE_API_TOKEN: str | None = None
     REPLICATE_GIMP_MODEL: str | None = None
     REPLICATE_VIDEO_MODEL: str | None = None
     REPLICATE_GIMP_MODEL_VERSION: str | None = None
     REPLICATE_VIDEO_MODEL_VERSION: str | None = None
+    STORAGE_BACKEND: Literal["gcs", "local", "memory"] = "gcs"
+    LOCAL_STORAGE_ROOT: str = ".storage"
+    LOCAL_STORAGE_BASE_URL: str = "http://localhost:8000"
+    LOCAL_STORAGE_SIGNING_KEY: str = "local-dev-signing-key"
+    REPORT_IMPORT_BATCH_SIZE: int = 500
+    REPORT_EXPORT_BATCH_SIZE: int = 500
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_CONTENT_TYPES: list[str] = ["application/json", "application/x-ndjson", "text/"]
     GCS_BUCKET: str | None = None
+    GCS_EMULATOR_HOST: str | None = None
+    GCS_UPLOAD_URL_TTL_S: int = 900
+    GCS_READ_URL_TTL_S: int = 3600
+    GCS_SIGNER_EMAIL: str | None = None
+    GCS_MAX_CONCURRENCY: int = 8
+    GCS_UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    GCS_TIMEOUT_S: float = 60.0
 
     @property
     def replicate_gimp_identifier(self) -> str | None:
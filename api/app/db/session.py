@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+import time
 from collections.abc import AsyncIterator
+from typing import Literal
+from uuid import uuid4
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from sqlalchemy import text
 from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Set after a write so the same client reads its own writes from the primary
+# until the replica has had time to catch up.
+READ_PRIMARY_COOKIE = "rl_read_primary"
+
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
 
 
 def sanitize_asyncpg_url(url: str) -> tuple[str, dict]:
@@ -21,11 +37,58 @@ def sanitize_asyncpg_url(url: str) -> tuple[str, dict]:
     return url_obj.render_as_string(hide_password=False), connect_args
 
 
+PoolProfile = Literal["api", "worker"]
+
+
+def _engine_options(profile: PoolProfile, connect_args: dict, *, asyncpg: bool) -> dict:
+    """Pool and statement-cache options for the API or the worker.
+
+    The API serves many short requests concurrently; the worker runs one job
+    at a time and only needs a couple of connections for its short phases.
+    """
+    if profile == "worker":
+        pool_size, max_overflow = settings.WORKER_DB_POOL_SIZE, settings.WORKER_DB_MAX_OVERFLOW
+    else:
+        pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+
+    connect_args = dict(connect_args)
+    if asyncpg and settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode hands each transaction a different server
+        # connection, so named prepared statements must not be cached or reused.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif asyncpg:
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    return {
+        "echo": False,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_S,
+        "pool_recycle": settings.DB_POOL_RECYCLE_S,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
 def create_engine_and_sessionmaker(
     url: str,
+    *,
+    profile: PoolProfile = "api",
 ) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
     db_url, connect_args = sanitize_asyncpg_url(url)
-    engine = create_async_engine(db_url, echo=False, connect_args=connect_args)
+    url_obj = make_url(db_url)
+    asyncpg = url_obj.drivername.endswith("+asyncpg")
+    if asyncpg:
+        # SQLAlchemy keeps its own prepared statement cache on top of asyncpg's.
+        # Unset, it is off behind PgBouncer and left at SQLAlchemy's default otherwise.
+        cache_size = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+        if cache_size is None and settings.DB_PGBOUNCER:
+            cache_size = 0
+        if cache_size is not None:
+            url_obj = url_obj.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+    options = _engine_options(profile, connect_args, asyncpg=asyncpg)
+    engine = create_async_engine(url_obj, **options)
     sessionmaker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
     return engine, sessionmaker
 
@@ -34,19 +97,70 @@ async def init_db(app: FastAPI) -> None:
     engine, sessionmaker = create_engine_and_sessionmaker(settings.DATABASE_URL)
     app.state.db_engine = engine
     app.state.db_sessionmaker = sessionmaker
+    app.state.db_replica_engine = None
+    app.state.db_replica_sessionmaker = None
+    app.state.replica_checked_at = 0.0
+    app.state.replica_fresh = False
+    if settings.DATABASE_REPLICA_URL:
+        replica_engine, replica_sessionmaker = create_engine_and_sessionmaker(
+            settings.DATABASE_REPLICA_URL
+        )
+        app.state.db_replica_engine = replica_engine
+        app.state.db_replica_sessionmaker = replica_sessionmaker
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, int]:
+    """Connection pool counters for monitoring."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
 
 
 async def close_db(app: FastAPI) -> None:
-    engine = getattr(app.state, "db_engine", None)
-    if engine is not None:
-        await engine.dispose()
-
-
-async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    for name in ("db_engine", "db_replica_engine"):
+        engine = getattr(app.state, name, None)
+        if engine is not None:
+            await engine.dispose()
+
+
+async def _replica_is_fresh(app: FastAPI, sessionmaker: async_sessionmaker[AsyncSession]) -> bool:
+    """Whether the replica is within ``REPLICA_MAX_LAG_S``; checked at most every interval."""
+    now = time.monotonic()
+    if now - app.state.replica_checked_at < settings.REPLICA_LAG_CHECK_INTERVAL_S:
+        return app.state.replica_fresh
+
+    app.state.replica_checked_at = now
+    try:
+        async with sessionmaker() as session:
+            lag_s = float((await session.execute(_REPLICA_LAG_SQL)).scalar_one())
+    except Exception as exc:
+        logger.warning("replica_lag_check_failed", error=str(exc))
+        app.state.replica_fresh = False
+        return False
+
+    fresh = lag_s <= settings.REPLICA_MAX_LAG_S
+    if not fresh and app.state.replica_fresh:
+        logger.warning("replica_lagging", lag_s=lag_s)
+    app.state.replica_fresh = fresh
+    return fresh
+
+
+async def get_db(request: Request, response: Response) -> AsyncIterator[AsyncSession]:
     sessionmaker = getattr(request.app.state, "db_sessionmaker", None)
     if sessionmaker is None:
         raise RuntimeError("Database sessionmaker is not initialized")
 
+    if request.method not in ("GET", "HEAD") and getattr(
+        request.app.state, "db_replica_sessionmaker", None
+    ):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, "1", max_age=settings.READ_YOUR_WRITES_S, httponly=True
+        )
+
     async with sessionmaker() as session:
         try:
             yield session
@@ -56,10 +170,41 @@ async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
             raise
 
 
+async def read_sessionmaker(request: Request) -> async_sessionmaker[AsyncSession]:
+    """Sessionmaker for read-only work, the replica when it is safe.
+
+    Falls back to the primary when no replica is configured, when the client
+    wrote recently (read-your-writes cookie), or when the replica is lagging.
+    """
+    state = request.app.state
+    sessionmaker = getattr(state, "db_replica_sessionmaker", None)
+    if (
+        sessionmaker is None
+        or READ_PRIMARY_COOKIE in request.cookies
+        or not await _replica_is_fresh(request.app, sessionmaker)
+    ):
+        sessionmaker = getattr(state, "db_sessionmaker", None)
+    if sessionmaker is None:
+        raise RuntimeError("Database sessionmaker is not initialized")
+    return sessionmaker
+
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for read-only endpoints (see ``read_sessionmaker``)."""
+    sessionmaker = await read_sessionmaker(request)
+    async with sessionmaker() as session:
+        yield session
+
+
 __all__ = [
+    "PoolProfile",
     "create_engine_and_sessionmaker",
+    "pool_stats",
     "sanitize_asyncpg_url",
     "init_db",
     "close_db",
     "get_db",
+    "get_read_db",
+    "read_sessionmaker",
+    "READ_PRIMARY_COOKIE",
 ]
@@ -1,63 +1,89 @@
 import asyncio
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
 from app.core.config import settings
 from app.core.enums import JobStatus, ReportStatus
-from app.jobs.utils import get_job_and_report
-from app.services.genai_extractor import extract_moments
+from app.core.logging import get_logger
+from app.jobs.utils import SessionFactory, job_transaction
+from app.services.genai_extractor import extract_moments, get_batcher
+from app.services.job_service import notify_job_queued
+from app.services.local_extractor import extract_moments_locally
 from app.services.queue import enqueue_job
 
+logger = get_logger(__name__)
+
 
 async def _retry_or_fail(
+    sessionmaker: SessionFactory,
     job_id: str,
-    job_type: str,
-    job,
-    report,
     error: str,
 ) -> None:
-    job.last_error = error
-    if job.attempts < settings.EXTRACT_MOMENTS_MAX_ATTEMPTS:
-        job.status = JobStatus.QUEUED
+    async with job_transaction(sessionmaker, job_id) as (db, job, report):
+        job.last_error = error
+        retry = job.attempts < settings.EXTRACT_MOMENTS_MAX_ATTEMPTS
+        if retry:
+            job.status = JobStatus.QUEUED
+            await notify_job_queued(db, job.type)
+        else:
+            job.status = JobStatus.FAILED
+            report.status = ReportStatus.FAILED
+        job_type = job.type.value
+    # Enqueue only once the QUEUED status is committed, so the next worker sees it.
+    if retry:
         await enqueue_job(job_id, job_type)
-        return
-    job.status = JobStatus.FAILED
-    report.status = ReportStatus.FAILED
 
 
-async def run(db: AsyncSession, job_id: str) -> None:
-    job, report = await get_job_and_report(db, job_id)
-    if job.attempts >= settings.EXTRACT_MOMENTS_MAX_ATTEMPTS:
-        job.status = JobStatus.FAILED
-        job.last_error = "Max attempts exceeded"
-        report.status = ReportStatus.FAILED
-        return
+async def run(sessionmaker: SessionFactory, job_id: str) -> None:
+    async with job_transaction(sessionmaker, job_id) as (_, job, report):
+        # The runner has already counted this attempt when claiming the job.
+        if job.attempts > settings.EXTRACT_MOMENTS_MAX_ATTEMPTS:
+            job.status = JobStatus.FAILED
+            job.last_error = "Max attempts exceeded"
+            report.status = ReportStatus.FAILED
+            return
 
-    job.status = JobStatus.RUNNING
-    job.attempts += 1
-    await db.flush()
+        content = (report.content or "").strip()
+        if not content:
+            job.status = JobStatus.FAILED
+            job.last_error = "Report content is empty"
+            report.status = ReportStatus.FAILED
+            return
 
-    content = (report.content or "").strip()
-    if not content:
-        job.status = JobStatus.FAILED
-        job.last_error = "Report content is empty"
-        report.status = ReportStatus.FAILED
+        # Templated reports label both fields; no need to ask Gemini.
+        local = extract_moments_locally(content)
+        if local is not None:
+            report.gimp_name = local.gimp_name
+            report.champagne_moment = local.champagne_moment
+            job.status = JobStatus.SUCCEEDED
+            job.last_error = None
+    # Every success logs its source, so the share of skipped Gemini calls is
+    # count(source=local) / count(moments_extracted).
+    if local is not None:
+        logger.info("moments_extracted", job_id=job_id, source="local")
         return
 
+    if settings.EXTRACT_BATCH_MAX_SIZE > 1:
+        # Share a Gemini request with other reports extracted around the same time.
+        # The wait covers the batching window plus the longer combined request.
+        extraction = get_batcher().submit(content)
+        timeout_s = settings.EXTRACT_BATCH_WINDOW_S + settings.EXTRACT_BATCH_TIMEOUT_S
+    else:
+        extraction = asyncio.to_thread(extract_moments, content)
+        timeout_s = settings.GEMINI_REQUEST_TIMEOUT_S
+
     try:
-        result = await asyncio.wait_for(
-            asyncio.to_thread(extract_moments, content),
-            timeout=settings.GEMINI_REQUEST_TIMEOUT_S,
-        )
+        result = await asyncio.wait_for(extraction, timeout=timeout_s)
     except TimeoutError:
-        await _retry_or_fail(job.id, job.type.value, job, report, "Gemini request timed out")
+        await _retry_or_fail(sessionmaker, job_id, "Gemini request timed out")
         return
     except Exception as exc:
-        await _retry_or_fail(job.id, job.type.value, job, report, str(exc))
+        await _retry_or_fail(sessionmaker, job_id, str(exc))
         return
 
-    report.gimp_name = result.gimp_name
-    report.champagne_moment = result.champagne_moment
+    async with job_transaction(sessionmaker, job_id) as (_, job, report):
+        report.gimp_name = result.gimp_name
+        report.champagne_moment = result.champagne_moment
+
+        job.status = JobStatus.SUCCEEDED
+        job.last_error = None
 
-    job.status = JobStatus.SUCCEEDED
-    job.last_error = None
+    logger.info("moments_extracted", job_id=job_id, source="gemini")
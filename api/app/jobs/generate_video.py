@@ -9,59 +9,172 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.enums import AssetKind, JobStatus
 from app.core.logging import get_logger
-from app.jobs.utils import get_job_and_report
+from app.jobs.utils import (
+    SessionFactory,
+    copy_output_asset,
+    find_derived_assets,
+    find_reusable_output,
+    job_fingerprint,
+    job_transaction,
+    mark_job_failed,
+    record_copied_asset,
+)
+from app.models.report import Report
 from app.services.asset_service import upsert_asset_ready
-from app.services.gcs import upload_bytes
 from app.services.replicate_service import ReplicatePredictionError, ReplicateService
+from app.services.storage import ObjectInfo, get_storage, upload_bytes_if_changed
+from app.services.video_processing import FfmpegError, Rendition, postprocess_video
+from app.utils.hashing import sha256_hex
 from app.utils.storage_paths import gcs_object_key
 
 logger = get_logger(__name__)
 
 
-async def run(db: AsyncSession, job_id: str) -> None:
-    """Run the video generation job."""
-    job, report = await get_job_and_report(db, job_id)
-    log = logger.bind(job_id=job_id, report_id=report.id)
+async def _upload_renditions(
+    report_id: str, video_bytes: bytes, log
+) -> list[tuple[Rendition, str, ObjectInfo]]:
+    """Post-process the video with ffmpeg and store each rendition.
 
-    job.status = JobStatus.RUNNING
-    job.attempts += 1
-    await db.flush()
+    Optional (``VIDEO_POSTPROCESS_ENABLED``): the original mp4 still plays, so
+    an ffmpeg failure is logged and the job succeeds without the renditions.
+    """
+    if not settings.VIDEO_POSTPROCESS_ENABLED:
+        return []
+    try:
+        renditions = await postprocess_video(video_bytes)
+    except (FfmpegError, OSError) as exc:
+        log.warning("video_postprocess_failed", error=str(exc))
+        return []
+
+    storage = get_storage()
+    paths = [
+        gcs_object_key(report_id, AssetKind.VIDEO, rendition.ext, rendition.variant)
+        for rendition in renditions
+    ]
+    results = await asyncio.gather(
+        *(
+            upload_bytes_if_changed(storage, path, rendition.data, content_type=rendition.mime_type)
+            for rendition, path in zip(renditions, paths, strict=True)
+        )
+    )
+    log.info(
+        "video_renditions_stored",
+        original_bytes=len(video_bytes),
+        **{f"{rendition.variant}_bytes": len(rendition.data) for rendition in renditions},
+    )
+    return [
+        (rendition, path, stored)
+        for rendition, path, (stored, _) in zip(renditions, paths, results, strict=True)
+    ]
+
+
+async def _record_renditions(
+    db: AsyncSession, report: Report, uploaded: list[tuple[Rendition, str, ObjectInfo]]
+) -> None:
+    for rendition, gcs_path, stored in uploaded:
+        await upsert_asset_ready(
+            db,
+            report_id=report.id,
+            author_id=report.author_id,
+            kind=AssetKind.VIDEO,
+            gcs_path=gcs_path,
+            mime_type=rendition.mime_type,
+            size_bytes=stored.size,
+            crc32c=stored.crc32c,
+            sha256=sha256_hex(rendition.data),
+            variant=rendition.variant,
+            width=rendition.width,
+            height=rendition.height,
+        )
 
-    # Build prompt from report content
-    prompt = report.content or ""
-    prompt = prompt.strip()
-    if report.opponent:
-        prompt = f"{prompt}\nOpponent: {report.opponent}".strip()
-    if report.date:
-        prompt = f"{prompt}\nDate: {report.date.isoformat()}".strip()
 
-    if not prompt:
-        job.status = JobStatus.FAILED
-        job.last_error = "Report content is empty"
-        log.warning("job_failed", error=job.last_error)
-        return
+async def run(sessionmaker: SessionFactory, job_id: str) -> None:
+    """Run the video generation job.
+
+    Like the gimpify job, DB work happens in short transactions on either side
+    of the Replicate prediction rather than in one session held for its duration.
+    """
+    log = logger.bind(job_id=job_id)
+
+    async with job_transaction(sessionmaker, job_id) as (db, job, report):
+        log = log.bind(report_id=report.id)
+        report_id = report.id
+
+        # Build prompt from report content
+        prompt = report.content or ""
+        prompt = prompt.strip()
+        if report.opponent:
+            prompt = f"{prompt}\nOpponent: {report.opponent}".strip()
+        if report.date:
+            prompt = f"{prompt}\nDate: {report.date.isoformat()}".strip()
+
+        if not prompt:
+            job.status = JobStatus.FAILED
+            job.last_error = "Report content is empty"
+            log.warning("job_failed", error=job.last_error)
+            return
 
-    # Validate model configuration
-    model_id = settings.replicate_video_identifier
-    if not model_id:
-        job.status = JobStatus.FAILED
-        job.last_error = "REPLICATE_VIDEO_MODEL is not configured"
-        log.warning("job_failed", error=job.last_error)
+        # Validate model configuration
+        model_id = settings.replicate_video_identifier
+        if not model_id:
+            job.status = JobStatus.FAILED
+            job.last_error = "REPLICATE_VIDEO_MODEL is not configured"
+            log.warning("job_failed", error=job.last_error)
+            return
+
+        # Reuse the output of an identical earlier prediction instead of paying for a new one
+        fingerprint = job_fingerprint(model_id, prompt)
+        reusable = await find_reusable_output(
+            db, job, fingerprint, AssetKind.VIDEO, author_id=report.author_id
+        )
+        derived = await find_derived_assets(db, reusable[1]) if reusable is not None else []
+
+        # A previous attempt with the same inputs may have left a prediction we can wait on
+        prediction_id = job.provider_job_id if job.idempotency_key == fingerprint else None
+        job.idempotency_key = fingerprint
+
+    if reusable is not None:
+        previous, source = reusable
+        # Renditions are copied like the video itself; ffmpeg only runs when
+        # the source job has none (e.g. post-processing was off at the time).
+        gcs_path, *derived_paths = await asyncio.gather(
+            copy_output_asset(source, report_id),
+            *(copy_output_asset(asset, report_id) for asset in derived),
+        )
+        renditions = []
+        if settings.VIDEO_POSTPROCESS_ENABLED and not derived:
+            renditions = await _upload_renditions(
+                report_id, await get_storage().download_bytes(gcs_path), log
+            )
+        async with job_transaction(sessionmaker, job_id) as (db, job, report):
+            await record_copied_asset(db, report, source, gcs_path)
+            for asset, asset_path in zip(derived, derived_paths, strict=True):
+                await record_copied_asset(db, report, asset, asset_path)
+            await _record_renditions(db, report, renditions)
+            job.provider_job_id = previous.provider_job_id
+            job.status = JobStatus.SUCCEEDED
+            job.last_error = None
+        log.info("job_reused_output", source_job_id=previous.id, gcs_path=gcs_path)
         return
 
     service = ReplicateService()
 
     try:
-        # Create prediction
-        prediction = await service.create_prediction(
-            model_id,
-            {"prompt": prompt},
-        )
-        prediction_id = prediction["id"]
-        job.provider_job_id = prediction_id
-        await db.flush()
-
-        log.info("prediction_created", prediction_id=prediction_id)
+        if prediction_id is None:
+            # Create prediction
+            prediction = await service.create_prediction(
+                model_id,
+                {"prompt": prompt},
+            )
+            prediction_id = prediction["id"]
+
+            # Record the prediction straight away so a retry can resume it
+            async with job_transaction(sessionmaker, job_id) as (_, job, _report):
+                job.provider_job_id = prediction_id
+
+            log.info("prediction_created", prediction_id=prediction_id)
+        else:
+            log.info("prediction_resumed", prediction_id=prediction_id)
 
         # Wait for completion (video generation can take longer)
         result_prediction = await service.wait_for_prediction(
@@ -71,39 +184,46 @@ async def run(db: AsyncSession, job_id: str) -> None:
         # Download output
         outputs = await service.normalize_file_outputs(result_prediction.get("output"))
         if not outputs:
-            job.status = JobStatus.FAILED
-            job.last_error = "Replicate output was empty"
-            log.warning("job_failed", error=job.last_error)
+            await mark_job_failed(sessionmaker, job_id, "Replicate output was empty")
+            log.warning("job_failed", error="Replicate output was empty")
             return
 
         output_bytes = outputs[0]
 
     except ReplicatePredictionError as exc:
-        job.status = JobStatus.FAILED
-        job.last_error = str(exc)
+        # Never resume a failed prediction; the next attempt starts a fresh one.
+        await mark_job_failed(sessionmaker, job_id, str(exc))
         log.warning("prediction_failed", error=str(exc))
         return
 
     except TimeoutError as exc:
-        job.status = JobStatus.FAILED
-        job.last_error = str(exc)
+        # The prediction may still finish, so a retry waits on it again.
+        await mark_job_failed(sessionmaker, job_id, str(exc), keep_prediction=True)
         log.warning("prediction_timeout", error=str(exc))
         return
 
     # Upload to GCS
-    gcs_path = gcs_object_key(report.id, AssetKind.VIDEO, "mp4")
-    await asyncio.to_thread(upload_bytes, gcs_path, output_bytes, content_type="video/mp4")
+    gcs_path = gcs_object_key(report_id, AssetKind.VIDEO, "mp4")
+    stored, uploaded = await upload_bytes_if_changed(
+        get_storage(), gcs_path, output_bytes, content_type="video/mp4"
+    )
+    renditions = await _upload_renditions(report_id, output_bytes, log)
 
     # Create/update asset record
-    await upsert_asset_ready(
-        db,
-        report_id=report.id,
-        author_id=report.author_id,
-        kind=AssetKind.VIDEO,
-        gcs_path=gcs_path,
-        mime_type="video/mp4",
-    )
+    async with job_transaction(sessionmaker, job_id) as (db, job, report):
+        await upsert_asset_ready(
+            db,
+            report_id=report.id,
+            author_id=report.author_id,
+            kind=AssetKind.VIDEO,
+            gcs_path=gcs_path,
+            mime_type="video/mp4",
+            size_bytes=stored.size,
+            crc32c=stored.crc32c,
+            sha256=sha256_hex(output_bytes),
+        )
+        await _record_renditions(db, report, renditions)
+        job.status = JobStatus.SUCCEEDED
+        job.last_error = None
 
-    job.status = JobStatus.SUCCEEDED
-    job.last_error = None
-    log.info("job_succeeded", gcs_path=gcs_path)
+    log.info("job_succeeded", gcs_path=gcs_path, uploaded=uploaded)
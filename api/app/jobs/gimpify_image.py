@@ -4,79 +4,260 @@ from __future__ import annotations
 
 import asyncio
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.enums import AssetKind, AssetStatus, JobStatus
 from app.core.logging import get_logger
-from app.jobs.utils import get_job_and_report
-from app.models.asset import Asset
+from app.jobs.utils import (
+    SessionFactory,
+    copy_output_asset,
+    find_derived_assets,
+    find_reusable_output,
+    job_fingerprint,
+    job_transaction,
+    mark_job_failed,
+    record_copied_asset,
+)
+from app.models.asset import MODEL_INPUT_VARIANT, ORIGINAL_VARIANT, Asset
+from app.models.report import Report
 from app.services.asset_service import upsert_asset_ready
-from app.services.gcs import signed_get_url, upload_bytes
+from app.services.image_processing import (
+    IMAGE_PROCESSING_ERRORS,
+    Thumbnail,
+    prepare_model_input,
+    render_thumbnails,
+    run_in_process,
+)
 from app.services.replicate_service import ReplicatePredictionError, ReplicateService
+from app.services.storage import ObjectInfo, get_storage, upload_bytes_if_changed
+from app.utils.hashing import sha256_hex
 from app.utils.storage_paths import gcs_object_key, mime_to_ext
 
 logger = get_logger(__name__)
 
+GIMPIFY_PROMPT = (
+    "Make this image gimpish, surreal, high-contrast, British football satire, "
+    "keep subject identity, preserve key details."
+)
 
-async def run(db: AsyncSession, job_id: str) -> None:
-    """Run the gimpify image job."""
-    job, report = await get_job_and_report(db, job_id)
-    log = logger.bind(job_id=job_id, report_id=report.id)
 
-    job.status = JobStatus.RUNNING
-    job.attempts += 1
-    await db.flush()
+async def _model_input_path(
+    sessionmaker: SessionFactory,
+    job_id: str,
+    report_id: str,
+    original_path: str,
+    data: bytes,
+    log,
+) -> str:
+    """Store a downscaled, EXIF-free copy of the original for Replicate.
 
-    # Find the original image asset
-    result = await db.execute(
-        select(Asset).where(
-            Asset.report_id == report.id,
-            Asset.kind == AssetKind.GIMP_ORIGINAL,
-            Asset.status == AssetStatus.READY,
+    Phone photos are often several MB; the model works at a fraction of that
+    resolution, so sending the smaller copy shortens its download. Falls back
+    to the original when the image cannot be decoded or the worker dies.
+    """
+    storage = get_storage()
+    try:
+        prepared = await run_in_process(
+            prepare_model_input, data, max_side=settings.GIMP_INPUT_MAX_SIDE
         )
+    except IMAGE_PROCESSING_ERRORS as exc:
+        log.warning("model_input_preprocess_failed", error=str(exc))
+        return original_path
+
+    mime_type = "image/jpeg"
+    gcs_path = gcs_object_key(
+        report_id, AssetKind.GIMP_ORIGINAL, mime_to_ext(mime_type), MODEL_INPUT_VARIANT
     )
-    original = result.scalar_one_or_none()
-    if original is None:
-        job.status = JobStatus.FAILED
-        job.last_error = "Missing gimp_original asset"
-        log.warning("job_failed", error=job.last_error)
-        return
+    stored, _ = await upload_bytes_if_changed(storage, gcs_path, prepared, content_type=mime_type)
+    async with job_transaction(sessionmaker, job_id) as (db, _job, report):
+        await upsert_asset_ready(
+            db,
+            report_id=report.id,
+            author_id=report.author_id,
+            kind=AssetKind.GIMP_ORIGINAL,
+            gcs_path=gcs_path,
+            mime_type=mime_type,
+            size_bytes=stored.size,
+            crc32c=stored.crc32c,
+            sha256=sha256_hex(prepared),
+            variant=MODEL_INPUT_VARIANT,
+        )
+    log.info("model_input_prepared", original_bytes=len(data), input_bytes=len(prepared))
+    return gcs_path
 
-    # Generate signed URL for the original image
-    signed_url = await asyncio.to_thread(signed_get_url, original.gcs_path, expires_s=3600)
 
-    # Validate model configuration
-    model_id = settings.replicate_gimp_identifier
-    if not model_id:
-        job.status = JobStatus.FAILED
-        job.last_error = "REPLICATE_GIMP_MODEL is not configured"
-        log.warning("job_failed", error=job.last_error)
-        return
+async def _upload_thumbnails(
+    report_id: str, image_bytes: bytes, log
+) -> list[tuple[Thumbnail, str, ObjectInfo]]:
+    """Render and store the display thumbnails of a gimpified image.
 
-    prompt = (
-        "Make this image gimpish, surreal, high-contrast, British football satire, "
-        "keep subject identity, preserve key details."
+    Thumbnails are an optimisation for the web UI, so a failure is logged
+    and the job still succeeds with just the full-size image.
+    """
+    try:
+        thumbnails = await run_in_process(
+            render_thumbnails,
+            image_bytes,
+            widths=settings.THUMBNAIL_WIDTHS,
+            formats=settings.THUMBNAIL_FORMATS,
+        )
+    except IMAGE_PROCESSING_ERRORS as exc:
+        log.warning("thumbnails_failed", error=str(exc))
+        return []
+
+    storage = get_storage()
+    paths = [
+        gcs_object_key(report_id, AssetKind.GIMPIFIED_IMAGE, thumb.format, thumb.variant)
+        for thumb in thumbnails
+    ]
+    results = await asyncio.gather(
+        *(
+            upload_bytes_if_changed(storage, path, thumb.data, content_type=thumb.mime_type)
+            for thumb, path in zip(thumbnails, paths, strict=True)
+        )
+    )
+    log.info(
+        "thumbnails_stored",
+        variants=[thumb.variant for thumb in thumbnails],
+        total_bytes=sum(len(thumb.data) for thumb in thumbnails),
     )
+    return [
+        (thumb, path, stored)
+        for thumb, path, (stored, _) in zip(thumbnails, paths, results, strict=True)
+    ]
+
+
+async def _record_thumbnails(
+    db: AsyncSession, report: Report, uploaded: list[tuple[Thumbnail, str, ObjectInfo]]
+) -> None:
+    for thumb, gcs_path, stored in uploaded:
+        await upsert_asset_ready(
+            db,
+            report_id=report.id,
+            author_id=report.author_id,
+            kind=AssetKind.GIMPIFIED_IMAGE,
+            gcs_path=gcs_path,
+            mime_type=thumb.mime_type,
+            size_bytes=stored.size,
+            crc32c=stored.crc32c,
+            sha256=sha256_hex(thumb.data),
+            variant=thumb.variant,
+            width=thumb.width,
+            height=thumb.height,
+        )
+
+
+async def run(sessionmaker: SessionFactory, job_id: str) -> None:
+    """Run the gimpify image job.
+
+    The job runs in phases so no DB connection is held while waiting on
+    Replicate or storage: read inputs, hash the stored original and look for
+    reusable output (short transactions around the download), predict and
+    upload (no session), then record the result (one transaction).
+    """
+    log = logger.bind(job_id=job_id)
+
+    async with job_transaction(sessionmaker, job_id) as (db, job, report):
+        log = log.bind(report_id=report.id)
+        report_id = report.id
+
+        # Find the original image asset
+        result = await db.execute(
+            select(Asset).where(
+                Asset.report_id == report.id,
+                Asset.kind == AssetKind.GIMP_ORIGINAL,
+                Asset.variant == ORIGINAL_VARIANT,
+                Asset.status == AssetStatus.READY,
+            )
+        )
+        original = result.scalar_one_or_none()
+        if original is None:
+            job.status = JobStatus.FAILED
+            job.last_error = "Missing gimp_original asset"
+            log.warning("job_failed", error=job.last_error)
+            return
+
+        # Validate model configuration
+        model_id = settings.replicate_gimp_identifier
+        if not model_id:
+            job.status = JobStatus.FAILED
+            job.last_error = "REPLICATE_GIMP_MODEL is not configured"
+            log.warning("job_failed", error=job.last_error)
+            return
+
+        prompt = GIMPIFY_PROMPT
+        original_path = original.gcs_path
+        original_id = original.id
+
+    # Fingerprint the bytes actually stored, never a client-supplied hash.
+    original_bytes = await get_storage().download_bytes(original_path)
+    original_sha256 = sha256_hex(original_bytes)
+    fingerprint = job_fingerprint(model_id, prompt, original_sha256)
+
+    async with job_transaction(sessionmaker, job_id) as (db, job, report):
+        # attach only stats the upload; the hash is recorded here, where the
+        # bytes have been read anyway.
+        await db.execute(
+            update(Asset).where(Asset.id == original_id).values(sha256=original_sha256)
+        )
+
+        # Look for an identical earlier prediction whose output we can reuse
+        reusable = await find_reusable_output(
+            db, job, fingerprint, AssetKind.GIMPIFIED_IMAGE, author_id=report.author_id
+        )
+        derived = await find_derived_assets(db, reusable[1]) if reusable is not None else []
+
+        # A previous attempt with the same inputs may have left a prediction we can wait on
+        prediction_id = job.provider_job_id if job.idempotency_key == fingerprint else None
+        job.idempotency_key = fingerprint
+
+    if reusable is not None:
+        previous, source = reusable
+        # The thumbnails are copied like the image itself, not re-rendered.
+        gcs_path, *derived_paths = await asyncio.gather(
+            copy_output_asset(source, report_id),
+            *(copy_output_asset(asset, report_id) for asset in derived),
+        )
+        async with job_transaction(sessionmaker, job_id) as (db, job, report):
+            await record_copied_asset(db, report, source, gcs_path)
+            for asset, asset_path in zip(derived, derived_paths, strict=True):
+                await record_copied_asset(db, report, asset, asset_path)
+            job.provider_job_id = previous.provider_job_id
+            job.status = JobStatus.SUCCEEDED
+            job.last_error = None
+        log.info("job_reused_output", source_job_id=previous.id, gcs_path=gcs_path)
+        return
 
     service = ReplicateService()
 
     try:
-        # Create prediction
-        prediction = await service.create_prediction(
-            model_id,
-            {
-                "prompt": prompt,
-                "image_input": [signed_url],
-                "output_format": "jpg",
-            },
-        )
-        prediction_id = prediction["id"]
-        job.provider_job_id = prediction_id
-        await db.flush()
+        if prediction_id is None:
+            # Generate signed URL for the preprocessed copy of the original image
+            input_path = await _model_input_path(
+                sessionmaker, job_id, report_id, original_path, original_bytes, log
+            )
+            signed_url = await get_storage().signed_get_url(input_path, expires_s=3600)
+
+            # Create prediction
+            prediction = await service.create_prediction(
+                model_id,
+                {
+                    "prompt": prompt,
+                    "image_input": [signed_url],
+                    "output_format": "jpg",
+                },
+            )
+            prediction_id = prediction["id"]
+
+            # Record the prediction straight away so a retry can resume it
+            async with job_transaction(sessionmaker, job_id) as (_, job, _report):
+                job.provider_job_id = prediction_id
 
-        log.info("prediction_created", prediction_id=prediction_id)
+            log.info("prediction_created", prediction_id=prediction_id)
+        else:
+            log.info("prediction_resumed", prediction_id=prediction_id)
 
         # Wait for completion
         result_prediction = await service.wait_for_prediction(
@@ -86,42 +267,49 @@ async def run(db: AsyncSession, job_id: str) -> None:
         # Download output
         outputs = await service.normalize_file_outputs(result_prediction.get("output"))
         if not outputs:
-            job.status = JobStatus.FAILED
-            job.last_error = "Replicate output was empty"
-            log.warning("job_failed", error=job.last_error)
+            await mark_job_failed(sessionmaker, job_id, "Replicate output was empty")
+            log.warning("job_failed", error="Replicate output was empty")
             return
 
         output_bytes = outputs[0]
 
     except ReplicatePredictionError as exc:
-        job.status = JobStatus.FAILED
-        job.last_error = str(exc)
+        # Never resume a failed prediction; the next attempt starts a fresh one.
+        await mark_job_failed(sessionmaker, job_id, str(exc))
         log.warning("prediction_failed", error=str(exc))
         return
 
     except TimeoutError as exc:
-        job.status = JobStatus.FAILED
-        job.last_error = str(exc)
+        # The prediction may still finish, so a retry waits on it again.
+        await mark_job_failed(sessionmaker, job_id, str(exc), keep_prediction=True)
         log.warning("prediction_timeout", error=str(exc))
         return
 
     # Upload to GCS
     mime_type = "image/jpeg"
     ext = mime_to_ext(mime_type)
-    gcs_path = gcs_object_key(report.id, AssetKind.GIMPIFIED_IMAGE, ext)
+    gcs_path = gcs_object_key(report_id, AssetKind.GIMPIFIED_IMAGE, ext)
 
-    await asyncio.to_thread(upload_bytes, gcs_path, output_bytes, content_type=mime_type)
+    stored, uploaded = await upload_bytes_if_changed(
+        get_storage(), gcs_path, output_bytes, content_type=mime_type
+    )
+    thumbnails = await _upload_thumbnails(report_id, output_bytes, log)
 
     # Create/update asset record
-    await upsert_asset_ready(
-        db,
-        report_id=report.id,
-        author_id=report.author_id,
-        kind=AssetKind.GIMPIFIED_IMAGE,
-        gcs_path=gcs_path,
-        mime_type=mime_type,
-    )
+    async with job_transaction(sessionmaker, job_id) as (db, job, report):
+        await upsert_asset_ready(
+            db,
+            report_id=report.id,
+            author_id=report.author_id,
+            kind=AssetKind.GIMPIFIED_IMAGE,
+            gcs_path=gcs_path,
+            mime_type=mime_type,
+            size_bytes=stored.size,
+            crc32c=stored.crc32c,
+            sha256=sha256_hex(output_bytes),
+        )
+        await _record_thumbnails(db, report, thumbnails)
+        job.status = JobStatus.SUCCEEDED
+        job.last_error = None
 
-    job.status = JobStatus.SUCCEEDED
-    job.last_error = None
-    log.info("job_succeeded", gcs_path=gcs_path)
+    log.info("job_succeeded", gcs_path=gcs_path, uploaded=uploaded)
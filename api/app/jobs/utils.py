@@ -1,9 +1,21 @@
+import hashlib
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.enums import AssetKind, AssetStatus, JobStatus
 from app.core.exceptions import NotFoundError
+from app.models.asset import ORIGINAL_VARIANT, Asset
 from app.models.job import Job
 from app.models.report import Report
+from app.services.asset_service import upsert_asset_ready
+from app.services.storage import get_storage
+from app.utils.storage_paths import gcs_object_key
+
+SessionFactory = async_sessionmaker[AsyncSession]
 
 
 async def get_job_and_report(db: AsyncSession, job_id: str) -> tuple[Job, Report]:
@@ -17,4 +29,145 @@ async def get_job_and_report(db: AsyncSession, job_id: str) -> tuple[Job, Report
     return job, report
 
 
-__all__ = ["get_job_and_report"]
+def job_fingerprint(*parts: str | None) -> str:
+    """Hash everything that determines a job's output (model, prompt, input hash)."""
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+async def find_succeeded_job(
+    db: AsyncSession, job: Job, fingerprint: str, *, author_id: str
+) -> Job | None:
+    """Find another job of the same type that already succeeded with the same inputs.
+
+    Only the same author's reports are searched, so a fingerprint can never
+    pull another author's output into this report.
+    """
+    result = await db.execute(
+        select(Job)
+        .join(Report, Job.report_id == Report.id)
+        .where(
+            Job.type == job.type,
+            Job.idempotency_key == fingerprint,
+            Job.status == JobStatus.SUCCEEDED,
+            Job.id != job.id,
+            Report.author_id == author_id,
+        )
+        .order_by(Job.updated_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def find_reusable_output(
+    db: AsyncSession, job: Job, fingerprint: str, kind: AssetKind, *, author_id: str
+) -> tuple[Job, Asset] | None:
+    """Find the author's succeeded job with the same fingerprint and its ready output asset."""
+    previous = await find_succeeded_job(db, job, fingerprint, author_id=author_id)
+    if previous is None:
+        return None
+    result = await db.execute(
+        select(Asset).where(
+            Asset.report_id == previous.report_id,
+            Asset.kind == kind,
+            Asset.variant == ORIGINAL_VARIANT,
+            Asset.status == AssetStatus.READY,
+        )
+    )
+    source = result.scalar_one_or_none()
+    if source is None:
+        return None
+    return previous, source
+
+
+async def find_derived_assets(db: AsyncSession, source: Asset) -> list[Asset]:
+    """Ready assets derived from ``source``: the same report and kind, other variants.
+
+    These are the thumbnails of an image or the renditions of a video, which a
+    job reusing ``source`` copies rather than renders again.
+    """
+    result = await db.execute(
+        select(Asset).where(
+            Asset.report_id == source.report_id,
+            Asset.kind == source.kind,
+            Asset.variant != source.variant,
+            Asset.status == AssetStatus.READY,
+        )
+    )
+    return list(result.scalars())
+
+
+async def record_copied_asset(
+    db: AsyncSession, report: Report, source: Asset, gcs_path: str
+) -> None:
+    """Record ``report``'s copy of ``source`` (made by ``copy_output_asset``)."""
+    await upsert_asset_ready(
+        db,
+        report_id=report.id,
+        author_id=report.author_id,
+        kind=source.kind,
+        gcs_path=gcs_path,
+        mime_type=source.mime_type,
+        size_bytes=source.size_bytes,
+        crc32c=source.crc32c,
+        sha256=source.sha256,
+        variant=source.variant,
+        width=source.width,
+        height=source.height,
+    )
+
+
+async def copy_output_asset(source: Asset, report_id: str) -> str:
+    """Copy ``source``'s object to ``report_id``'s key server-side; return the new path."""
+    ext = source.gcs_path.rsplit(".", 1)[-1]
+    variant = None if source.variant == ORIGINAL_VARIANT else source.variant
+    gcs_path = gcs_object_key(report_id, source.kind, ext, variant)
+    if gcs_path != source.gcs_path:
+        await get_storage().copy(source.gcs_path, gcs_path)
+    return gcs_path
+
+
+@asynccontextmanager
+async def job_transaction(
+    sessionmaker: SessionFactory, job_id: str
+) -> AsyncIterator[tuple[AsyncSession, Job, Report]]:
+    """Run one short transaction on a job and its report, committing on exit.
+
+    Handlers open one of these per phase and never hold it across provider
+    calls, so a pooled connection is only checked out while doing DB work.
+    """
+    async with sessionmaker() as db:
+        job, report = await get_job_and_report(db, job_id)
+        yield db, job, report
+        await db.commit()
+
+
+async def mark_job_failed(
+    sessionmaker: SessionFactory,
+    job_id: str,
+    error: str,
+    *,
+    keep_prediction: bool = False,
+) -> None:
+    """Fail the job, forgetting its prediction unless ``keep_prediction``.
+
+    Only a timed-out prediction is worth resuming; after any other failure the
+    prediction is dead (or its output has expired), so the next attempt must
+    start a fresh one.
+    """
+    async with job_transaction(sessionmaker, job_id) as (_, job, _report):
+        job.status = JobStatus.FAILED
+        job.last_error = error
+        if not keep_prediction:
+            job.idempotency_key = None
+
+
+__all__ = [
+    "SessionFactory",
+    "get_job_and_report",
+    "job_fingerprint",
+    "find_succeeded_job",
+    "find_reusable_output",
+    "copy_output_asset",
+    "job_transaction",
+    "mark_job_failed",
+]
@@ -1,27 +1,49 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 
+from app.api.compression import CompressionMiddleware
 from app.api.v1.assets import router as assets_router
 from app.api.v1.jobs import router as jobs_router
 from app.api.v1.reports import router as reports_router
-from app.db.session import close_db, init_db
+from app.api.v1.storage import router as storage_router
+from app.core.config import settings
+from app.db.session import close_db, init_db, pool_stats
+from app.services.storage import close_storage
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db(app)
     yield
+    await close_storage()
     await close_db(app)
 
 
 app = FastAPI(title="Royal London Gimpish API", lifespan=lifespan)
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+    )
+
 app.include_router(reports_router)
 app.include_router(assets_router)
 app.include_router(jobs_router)
+app.include_router(storage_router)
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def health_db(request: Request):
+    engine = getattr(request.app.state, "db_engine", None)
+    if engine is None:
+        return {"status": "unavailable"}
+    return {"status": "ok", "pool": pool_stats(engine)}
@@ -2,17 +2,28 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Index, String, Text
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
 from app.core.enums import AssetKind, AssetStatus
 from app.db.base import Base, sql_enum
 
+# The uploaded or generated file itself; derived copies get their own variant.
+ORIGINAL_VARIANT = "original"
+# Downscaled, EXIF-free JPEG of the gimp original that is sent to Replicate.
+MODEL_INPUT_VARIANT = "model_input"
+# Resized renditions for display are named thumb_<width>_<format>.
+THUMBNAIL_VARIANT_PREFIX = "thumb_"
+# Post-processed video renditions (moov atom first, poster frame, low bitrate).
+FASTSTART_VARIANT = "faststart"
+POSTER_VARIANT = "poster"
+MOBILE_VARIANT = "mobile"
+
 
 class Asset(Base):
     __tablename__ = "assets"
-    __table_args__ = (Index("ix_assets_report_id_kind", "report_id", "kind"),)
+    __table_args__ = (Index("ix_assets_report_id_kind_variant", "report_id", "kind", "variant"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     report_id: Mapped[str] = mapped_column(
@@ -25,8 +36,19 @@ class Asset(Base):
         sql_enum(AssetKind, name="asset_kind"),
         nullable=False,
     )
+    variant: Mapped[str] = mapped_column(
+        String(32),
+        nullable=False,
+        default=ORIGINAL_VARIANT,
+        server_default=ORIGINAL_VARIANT,
+    )
     gcs_path: Mapped[str] = mapped_column(Text, nullable=False)
     mime_type: Mapped[str | None] = mapped_column(String(255))
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger)
+    crc32c: Mapped[str | None] = mapped_column(String(16))
+    sha256: Mapped[str | None] = mapped_column(String(64))
+    width: Mapped[int | None] = mapped_column(Integer)
+    height: Mapped[int | None] = mapped_column(Integer)
     status: Mapped[AssetStatus] = mapped_column(
         sql_enum(AssetStatus, name="asset_status"),
         nullable=False,
@@ -5,6 +5,7 @@ from datetime import datetime
 from sqlalchemy import (
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -20,7 +21,17 @@ from app.db.base import Base, sql_enum
 
 class Job(Base):
     __tablename__ = "jobs"
-    __table_args__ = (UniqueConstraint("report_id", "type", name="uq_jobs_report_id_type"),)
+    __table_args__ = (
+        UniqueConstraint("report_id", "type", name="uq_jobs_report_id_type"),
+        Index("ix_jobs_type_idempotency_key", "type", "idempotency_key"),
+        # Backs the Postgres queue's "next queued job" poll.
+        Index(
+            "ix_jobs_queued",
+            text("priority DESC"),
+            "created_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     report_id: Mapped[str] = mapped_column(
@@ -37,6 +48,11 @@ class Job(Base):
         sql_enum(JobStatus, name="job_status"),
         nullable=False,
     )
+    priority: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default=text("0"),
+    )
     attempts: Mapped[int] = mapped_column(
         Integer,
         nullable=False,
@@ -45,6 +61,7 @@ class Job(Base):
     last_error: Mapped[str | None] = mapped_column(Text)
     idempotency_key: Mapped[str | None] = mapped_column(String(255))
     provider_job_id: Mapped[str | None] = mapped_column(String(255))
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
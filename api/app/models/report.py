@@ -4,7 +4,7 @@ from datetime import date as PyDate
 from datetime import datetime
 
 from sqlalchemy import Date, DateTime, Index, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, query_expression
 from sqlalchemy.sql import func
 
 from app.core.enums import ReportStatus
@@ -13,7 +13,11 @@ from app.db.base import Base, sql_enum
 
 class Report(Base):
     __tablename__ = "reports"
-    __table_args__ = (Index("ix_reports_status_date", "status", "date"),)
+    __table_args__ = (
+        Index("ix_reports_status_date", "status", "date"),
+        # Lets per-author status counts run as an index-only scan.
+        Index("ix_reports_author_id_status", "author_id", "status"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     author_id: Mapped[str] = mapped_column(String, nullable=False)
@@ -37,3 +41,5 @@ class Report(Base):
         onupdate=func.now(),
         nullable=False,
     )
+    # Only populated by queries that ask for it (see report_service.list_reports).
+    excerpt: Mapped[str | None] = query_expression()
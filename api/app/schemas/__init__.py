@@ -9,10 +9,17 @@ from app.schemas.asset import (
 from app.schemas.extract_moments import ExtractMomentsOut
 from app.schemas.job import JobResponse
 from app.schemas.report import (
+    ReportBatchSubmitRequest,
+    ReportBatchSubmitResponse,
+    ReportBatchSubmitResult,
     ReportCreate,
     ReportDetail,
+    ReportExportRow,
+    ReportImportError,
+    ReportImportResponse,
     ReportListItem,
     ReportResponse,
+    ReportStats,
     ReportUpdate,
 )
 
@@ -25,9 +32,16 @@ __all__ = [
     "AssetUploadUrlResponse",
     "ExtractMomentsOut",
     "JobResponse",
+    "ReportBatchSubmitRequest",
+    "ReportBatchSubmitResponse",
+    "ReportBatchSubmitResult",
     "ReportCreate",
     "ReportDetail",
+    "ReportExportRow",
+    "ReportImportError",
+    "ReportImportResponse",
     "ReportListItem",
     "ReportResponse",
+    "ReportStats",
     "ReportUpdate",
 ]
@@ -5,16 +5,25 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.core.enums import AssetKind, AssetStatus
+from app.models.asset import ORIGINAL_VARIANT
 
 
 class AssetUploadUrlRequest(BaseModel):
     kind: AssetKind
     mime_type: str = Field(..., min_length=1, max_length=255)
+    size_bytes: int | None = Field(None, ge=0)
+    crc32c: str | None = Field(None, max_length=16)
+    resumable: bool | None = None
 
 
 class AssetUploadUrlResponse(BaseModel):
     gcs_path: str
     upload_url: str | None = None
+    upload_method: str = "PUT"
+    upload_headers: dict[str, str] = Field(default_factory=dict)
+    resumable: bool = False
+    expires_in_s: int | None = None
+    already_uploaded: bool = False
 
 
 class AssetAttachRequest(BaseModel):
@@ -22,23 +31,40 @@ class AssetAttachRequest(BaseModel):
     gcs_path: str = Field(..., min_length=1)
     mime_type: str | None = Field(None, max_length=255)
     size_bytes: int | None = Field(None, ge=0)
+    crc32c: str | None = Field(None, max_length=16)
 
 
 class AssetReadUrlRequest(BaseModel):
     kind: AssetKind
+    variant: str = Field(ORIGINAL_VARIANT, max_length=32)
+    width: int | None = Field(
+        None, gt=0, description="Display width; picks the smallest thumbnail at least this wide"
+    )
+    mime_types: list[str] | None = Field(
+        None, description="Thumbnail formats the client can show, in order of preference"
+    )
 
 
 class AssetReadUrlResponse(BaseModel):
     gcs_path: str
     url: str | None = None
+    expires_in_s: int | None = None
+    width: int | None = None
+    mime_type: str | None = None
 
 
 class AssetResponse(BaseModel):
     id: str
     report_id: str
     kind: AssetKind
+    variant: str
     gcs_path: str
     mime_type: str | None
+    size_bytes: int | None
+    crc32c: str | None
+    sha256: str | None
+    width: int | None = None
+    height: int | None = None
     status: AssetStatus
     created_at: datetime
     updated_at: datetime
@@ -12,4 +12,12 @@ class ExtractMomentsOut(BaseModel):
     )
 
 
-__all__ = ["ExtractMomentsOut"]
+class ExtractMomentsBatchItem(ExtractMomentsOut):
+    index: int = Field(description="Index of the report this result belongs to.")
+
+
+class ExtractMomentsBatchOut(BaseModel):
+    results: list[ExtractMomentsBatchItem]
+
+
+__all__ = ["ExtractMomentsOut", "ExtractMomentsBatchItem", "ExtractMomentsBatchOut"]
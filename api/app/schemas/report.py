@@ -5,7 +5,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.core.enums import ReportStatus
+from app.core.enums import AssetKind, ReportStatus
 from app.schemas.asset import AssetResponse
 from app.schemas.job import JobResponse
 
@@ -37,14 +37,72 @@ class ReportResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class ReportListItem(ReportResponse):
-    pass
+class ReportListItem(BaseModel):
+    """Summary row for list pages: no ``content``, just a short excerpt of it."""
+
+    id: str
+    author_id: str
+    date: Date
+    opponent: str | None
+    status: ReportStatus
+    gimp_name: str | None
+    champagne_moment: str | None
+    excerpt: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ReportDetail(ReportResponse):
     assets: list[AssetResponse]
     jobs: list[JobResponse]
 
+    @classmethod
+    def from_orm_parts(cls, report: object, assets: list, jobs: list) -> ReportDetail:
+        """Build the detail in a single validation pass straight from ORM rows."""
+        fields = {name: getattr(report, name) for name in ReportResponse.model_fields}
+        return cls.model_validate({**fields, "assets": assets, "jobs": jobs})
+
+
+class ReportExportRow(ReportResponse):
+    asset_urls: dict[AssetKind, str] | None = None
+
+
+class ReportStats(BaseModel):
+    total: int
+    counts: dict[ReportStatus, int]
+
+
+BATCH_SUBMIT_MAX_REPORTS = 100
+
+
+class ReportBatchSubmitRequest(BaseModel):
+    report_ids: list[str] = Field(..., min_length=1, max_length=BATCH_SUBMIT_MAX_REPORTS)
+
+
+class ReportBatchSubmitResult(BaseModel):
+    report_id: str
+    status_code: int
+    error: str | None = None
+    report: ReportResponse | None = None
+    jobs: list[JobResponse] = Field(default_factory=list)
+
+
+class ReportBatchSubmitResponse(BaseModel):
+    results: list[ReportBatchSubmitResult]
+
+
+class ReportImportError(BaseModel):
+    row: int
+    error: str
+
+
+class ReportImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ReportImportError]
+
 
 __all__ = [
     "ReportCreate",
@@ -52,4 +110,11 @@ __all__ = [
     "ReportResponse",
     "ReportListItem",
     "ReportDetail",
+    "ReportStats",
+    "ReportExportRow",
+    "ReportBatchSubmitRequest",
+    "ReportBatchSubmitResult",
+    "ReportBatchSubmitResponse",
+    "ReportImportError",
+    "ReportImportResponse",
 ]
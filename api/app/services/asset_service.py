@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import AssetKind, AssetStatus
 from app.core.exceptions import ForbiddenError, NotFoundError
-from app.models.asset import Asset
+from app.models.asset import ORIGINAL_VARIANT, THUMBNAIL_VARIANT_PREFIX, Asset
 from app.models.report import Report
 
 
@@ -29,12 +29,21 @@ async def upsert_asset_ready(
     kind: AssetKind,
     gcs_path: str,
     mime_type: str | None,
+    size_bytes: int | None = None,
+    crc32c: str | None = None,
+    sha256: str | None = None,
+    *,
+    variant: str = ORIGINAL_VARIANT,
+    width: int | None = None,
+    height: int | None = None,
 ) -> Asset:
     report = await _get_report(db, report_id)
     _require_author(report, author_id)
 
     existing = await db.execute(
-        select(Asset).where(Asset.report_id == report_id, Asset.kind == kind)
+        select(Asset).where(
+            Asset.report_id == report_id, Asset.kind == kind, Asset.variant == variant
+        )
     )
     asset = existing.scalar_one_or_none()
     if asset is None:
@@ -42,19 +51,74 @@ async def upsert_asset_ready(
             id=uuid4().hex,
             report_id=report_id,
             kind=kind,
+            variant=variant,
             gcs_path=gcs_path,
             mime_type=mime_type,
+            size_bytes=size_bytes,
+            crc32c=crc32c,
+            sha256=sha256,
+            width=width,
+            height=height,
             status=AssetStatus.READY,
         )
         db.add(asset)
     else:
         asset.gcs_path = gcs_path
         asset.mime_type = mime_type
+        asset.size_bytes = size_bytes
+        asset.crc32c = crc32c
+        asset.sha256 = sha256
+        asset.width = width
+        asset.height = height
         asset.status = AssetStatus.READY
     await db.flush()
     return asset
 
 
+def pick_asset(
+    assets: list[Asset],
+    kind: AssetKind,
+    *,
+    variant: str = ORIGINAL_VARIANT,
+    width: int | None = None,
+    mime_types: list[str] | None = None,
+) -> Asset | None:
+    """Choose the asset to serve for ``kind``.
+
+    With a ``width``, prefer the smallest ready thumbnail at least that wide
+    (else the widest one) in the client's preferred format, falling back to
+    ``variant`` when there are no thumbnails. Without ``mime_types`` only
+    WebP thumbnails are considered, as every supported browser shows them.
+    """
+    fallback = next(
+        (asset for asset in assets if asset.kind == kind and asset.variant == variant), None
+    )
+    if width is None:
+        return fallback
+    accepted = mime_types or ["image/webp"]
+    thumbnails = [
+        asset
+        for asset in assets
+        if asset.kind == kind
+        and asset.status == AssetStatus.READY
+        and asset.variant.startswith(THUMBNAIL_VARIANT_PREFIX)
+        and asset.width is not None
+        and asset.mime_type in accepted
+    ]
+    if not thumbnails:
+        return fallback
+
+    def rank(asset: Asset) -> tuple[bool, int, int]:
+        wide_enough = asset.width >= width
+        return (
+            not wide_enough,
+            asset.width if wide_enough else -asset.width,
+            accepted.index(asset.mime_type),
+        )
+
+    return min(thumbnails, key=rank)
+
+
 async def list_assets(db: AsyncSession, report_id: str, author_id: str) -> list[Asset]:
     report = await _get_report(db, report_id)
     _require_author(report, author_id)
@@ -1,53 +1,456 @@
-from datetime import timedelta
-from typing import BinaryIO
+"""Async Google Cloud Storage client built on the GCS JSON API.
 
-from google.cloud import storage
+All transfers share one pooled ``httpx.AsyncClient`` and a semaphore that caps
+the number of concurrent uploads/downloads, so large objects never tie up
+executor threads and callers get back-pressure instead of unbounded fan-out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any, BinaryIO
+from urllib.parse import quote
+
+import google.auth
+import httpx
+from google.auth.credentials import Credentials, Signing
+from google.auth.transport.requests import Request as AuthRequest
 
 from app.core.config import settings
+from app.core.logging import get_logger
+
+GCS_API_BASE = "https://storage.googleapis.com"
+GCS_SIGNING_HOST = "storage.googleapis.com"
+IAM_CREDENTIALS_API_BASE = "https://iamcredentials.googleapis.com/v1"
+_SCOPES = ["https://www.googleapis.com/auth/devstorage.read_write"]
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_MAX_ATTEMPTS = 3
+# Resumable upload chunks must be a multiple of 256 KiB.
+_CHUNK_ALIGNMENT = 256 * 1024
+
+logger = get_logger(__name__)
 
-_client: storage.Client | None = None
+_http: httpx.AsyncClient | None = None
+_semaphore: asyncio.Semaphore | None = None
+_credentials: Credentials | None = None
+_credentials_lock: asyncio.Lock | None = None
 
 
-def _get_client() -> storage.Client:
-    global _client
-    if _client is None:
-        _client = storage.Client()
-    return _client
+def _api_base() -> str:
+    return (settings.GCS_EMULATOR_HOST or GCS_API_BASE).rstrip("/")
 
 
-def _get_bucket() -> storage.Bucket:
+def _get_bucket_name() -> str:
     if not settings.GCS_BUCKET:
         raise RuntimeError("GCS_BUCKET is not configured")
-    client = _get_client()
-    return client.bucket(settings.GCS_BUCKET)
+    return settings.GCS_BUCKET
+
+
+def _get_http() -> httpx.AsyncClient:
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.GCS_TIMEOUT_S, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.GCS_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=settings.GCS_MAX_CONCURRENCY,
+            ),
+        )
+    return _http
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.GCS_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def _get_credentials() -> Credentials:
+    """Return application default credentials, refreshing the token if needed.
+
+    The refresh uses google-auth's blocking transport, so it runs in a thread;
+    it only happens roughly once an hour.
+    """
+    global _credentials, _credentials_lock
+    if _credentials_lock is None:
+        _credentials_lock = asyncio.Lock()
+    async with _credentials_lock:
+        if _credentials is None:
+            _credentials, _ = await asyncio.to_thread(google.auth.default, scopes=_SCOPES)
+        if not _credentials.valid:
+            await asyncio.to_thread(_credentials.refresh, AuthRequest())
+        return _credentials
+
+
+async def _auth_headers() -> dict[str, str]:
+    if settings.GCS_EMULATOR_HOST:
+        return {}
+    credentials = await _get_credentials()
+    return {"Authorization": f"Bearer {credentials.token}"}
+
+
+def _object_url(gcs_path: str) -> str:
+    bucket = quote(_get_bucket_name(), safe="")
+    return f"{_api_base()}/storage/v1/b/{bucket}/o/{quote(gcs_path, safe='')}"
+
+
+def _upload_url() -> str:
+    bucket = quote(_get_bucket_name(), safe="")
+    return f"{_api_base()}/upload/storage/v1/b/{bucket}/o"
 
 
-def upload_bytes(
+def _emulator_object_url(gcs_path: str) -> str:
+    # Emulators such as fake-gcs-server accept unsigned XML-style object URLs.
+    return f"{_api_base()}/{_get_bucket_name()}/{quote(gcs_path)}"
+
+
+async def _request(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    retry: bool = True,
+    **kwargs,
+) -> httpx.Response:
+    """Send an authenticated request, retrying transient failures."""
+    max_attempts = _MAX_ATTEMPTS if retry else 1
+    client = _get_http()
+    attempt = 1
+    while True:
+        request_headers = {**(headers or {}), **(await _auth_headers())}
+        try:
+            response = await client.request(method, url, headers=request_headers, **kwargs)
+        except httpx.TransportError as exc:
+            if attempt >= max_attempts:
+                raise
+            logger.warning("gcs_request_retry", method=method, attempt=attempt, error=str(exc))
+        else:
+            if response.status_code not in _RETRYABLE_STATUS or attempt >= max_attempts:
+                return response
+            logger.warning(
+                "gcs_request_retry",
+                method=method,
+                attempt=attempt,
+                status_code=response.status_code,
+            )
+        await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+        attempt += 1
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    # 308 is how resumable uploads acknowledge a non-final chunk.
+    if response.status_code != 308:
+        response.raise_for_status()
+
+
+async def upload_bytes(
     gcs_path: str,
     data: bytes,
     *,
     content_type: str | None = None,
 ) -> None:
-    bucket = _get_bucket()
-    blob = bucket.blob(gcs_path)
-    blob.upload_from_string(data, content_type=content_type)
+    async with _get_semaphore():
+        response = await _request(
+            "POST",
+            _upload_url(),
+            params={"uploadType": "media", "name": gcs_path},
+            headers={"Content-Type": content_type or "application/octet-stream"},
+            content=data,
+        )
+    _raise_for_status(response)
 
 
-def upload_fileobj(
+async def _start_resumable_session(
+    gcs_path: str,
+    *,
+    content_type: str | None,
+    size: int | None = None,
+    origin: str | None = None,
+) -> str:
+    headers = {"X-Upload-Content-Type": content_type or "application/octet-stream"}
+    if size is not None:
+        headers["X-Upload-Content-Length"] = str(size)
+    if origin:
+        headers["Origin"] = origin
+    response = await _request(
+        "POST",
+        _upload_url(),
+        params={"uploadType": "resumable", "name": gcs_path},
+        headers=headers,
+        json={"contentType": content_type} if content_type else {},
+    )
+    _raise_for_status(response)
+    return response.headers["Location"]
+
+
+def _persisted_bytes(response: httpx.Response) -> int:
+    """How many bytes a resumable session holds, from a 308's ``Range: bytes=0-N``."""
+    committed = response.headers.get("Range")
+    if not committed:
+        return 0
+    return int(committed.rpartition("-")[2]) + 1
+
+
+async def upload_fileobj(
     gcs_path: str,
     fileobj: BinaryIO,
     *,
     content_type: str | None = None,
 ) -> None:
-    bucket = _get_bucket()
-    blob = bucket.blob(gcs_path)
-    blob.upload_from_file(fileobj, content_type=content_type)
+    """Stream a file-like object to GCS using a chunked resumable upload.
+
+    At most two chunks are held in memory regardless of the object size, and
+    reads run in a thread so a slow file never blocks the event loop. GCS may
+    persist only part of a chunk; the next request resumes from the ``Range``
+    it reported.
+    """
+    chunk_size = max(
+        _CHUNK_ALIGNMENT,
+        settings.GCS_UPLOAD_CHUNK_SIZE // _CHUNK_ALIGNMENT * _CHUNK_ALIGNMENT,
+    )
+    async with _get_semaphore():
+        session_url = await _start_resumable_session(gcs_path, content_type=content_type)
+        # ``buffer`` holds the bytes from ``offset`` on that GCS has not persisted yet.
+        offset = 0
+        buffer = b""
+        eof = False
+        while True:
+            # Read past the chunk being sent so we know whether it is the last one.
+            while not eof and len(buffer) <= chunk_size:
+                data = await asyncio.to_thread(fileobj.read, chunk_size)
+                buffer += data
+                eof = not data
+            chunk = buffer[:chunk_size]
+            last = eof and len(buffer) <= chunk_size
+            end = offset + len(chunk)
+            if not last:
+                content_range = f"bytes {offset}-{end - 1}/*"
+            elif chunk:
+                content_range = f"bytes {offset}-{end - 1}/{end}"
+            else:
+                content_range = f"bytes */{end}"
+            response = await _request(
+                "PUT",
+                session_url,
+                retry=False,
+                headers={"Content-Range": content_range},
+                content=chunk,
+            )
+            _raise_for_status(response)
+            if response.status_code != 308:
+                return
+            persisted = _persisted_bytes(response)
+            if persisted <= offset:
+                raise RuntimeError(f"GCS persisted no bytes of {gcs_path} past offset {offset}")
+            buffer = buffer[persisted - offset :]
+            offset = persisted
+
+
+async def download_bytes(gcs_path: str) -> bytes:
+    async with _get_semaphore():
+        response = await _request("GET", _object_url(gcs_path), params={"alt": "media"})
+    _raise_for_status(response)
+    return response.content
+
+
+async def get_metadata(gcs_path: str) -> dict[str, Any] | None:
+    """Return the object's JSON API resource (size, crc32c, ...), or None if missing."""
+    response = await _request("GET", _object_url(gcs_path))
+    if response.status_code == 404:
+        return None
+    _raise_for_status(response)
+    return response.json()
+
+
+async def copy_object(source_path: str, dest_path: str) -> None:
+    """Copy an object within the bucket server-side, without downloading it."""
+    bucket = quote(_get_bucket_name(), safe="")
+    url = (
+        f"{_api_base()}/storage/v1/b/{bucket}/o/{quote(source_path, safe='')}"
+        f"/rewriteTo/b/{bucket}/o/{quote(dest_path, safe='')}"
+    )
+    params: dict[str, str] = {}
+    async with _get_semaphore():
+        while True:
+            response = await _request("POST", url, params=params)
+            _raise_for_status(response)
+            body = response.json()
+            if body.get("done"):
+                return
+            params = {"rewriteToken": body["rewriteToken"]}
+
+
+async def iter_download(gcs_path: str, *, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Stream an object's bytes without buffering the whole object."""
+    async with _get_semaphore():
+        client = _get_http()
+        async with client.stream(
+            "GET",
+            _object_url(gcs_path),
+            params={"alt": "media"},
+            headers=await _auth_headers(),
+        ) as response:
+            _raise_for_status(response)
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
+
+async def download_to_fileobj(gcs_path: str, fileobj: BinaryIO) -> int:
+    size = 0
+    async for chunk in iter_download(gcs_path):
+        fileobj.write(chunk)
+        size += len(chunk)
+    return size
+
+
+async def _get_signer() -> tuple[str, Callable[[bytes], Awaitable[bytes]]]:
+    """Return the signing identity and a function that signs with it.
+
+    Service-account key credentials sign locally. Credentials without a private
+    key (GKE workload identity, Compute Engine) sign through the IAM API.
+    """
+    credentials = await _get_credentials()
+    if isinstance(credentials, Signing):
+
+        async def sign_locally(payload: bytes) -> bytes:
+            return credentials.sign_bytes(payload)
+
+        return credentials.signer_email, sign_locally
+
+    email = settings.GCS_SIGNER_EMAIL or getattr(credentials, "service_account_email", None)
+    if not email or email == "default":
+        raise RuntimeError("GCS_SIGNER_EMAIL is required to sign URLs with these credentials")
+
+    async def sign_with_iam(payload: bytes) -> bytes:
+        response = await _request(
+            "POST",
+            f"{IAM_CREDENTIALS_API_BASE}/projects/-/serviceAccounts/{email}:signBlob",
+            json={"payload": base64.b64encode(payload).decode()},
+        )
+        response.raise_for_status()
+        return base64.b64decode(response.json()["signedBlob"])
+
+    return email, sign_with_iam
+
+
+async def _generate_signed_url(
+    gcs_path: str,
+    *,
+    method: str,
+    expires_s: int,
+    content_type: str | None = None,
+) -> str:
+    """Build a V4 signed URL for the XML API.
+
+    See https://cloud.google.com/storage/docs/access-control/signing-urls-manually
+    """
+    if settings.GCS_EMULATOR_HOST:
+        return _emulator_object_url(gcs_path)
+
+    bucket = _get_bucket_name()
+    email, sign = await _get_signer()
+
+    now = datetime.now(UTC)
+    timestamp = now.strftime("%Y%m%dT%H%M%SZ")
+    scope = f"{now:%Y%m%d}/auto/storage/goog4_request"
+
+    headers = {"host": GCS_SIGNING_HOST}
+    if content_type:
+        headers["content-type"] = content_type
+    canonical_headers = "".join(f"{name}:{headers[name]}\n" for name in sorted(headers))
+    signed_headers = ";".join(sorted(headers))
+
+    query = {
+        "X-Goog-Algorithm": "GOOG4-RSA-SHA256",
+        "X-Goog-Credential": f"{email}/{scope}",
+        "X-Goog-Date": timestamp,
+        "X-Goog-Expires": str(expires_s),
+        "X-Goog-SignedHeaders": signed_headers,
+    }
+    canonical_query = "&".join(
+        f"{quote(key, safe='')}={quote(value, safe='')}" for key, value in sorted(query.items())
+    )
+    canonical_uri = f"/{bucket}/{quote(gcs_path, safe='/')}"
+    canonical_request = "\n".join(
+        [
+            method,
+            canonical_uri,
+            canonical_query,
+            canonical_headers,
+            signed_headers,
+            "UNSIGNED-PAYLOAD",
+        ]
+    )
+    string_to_sign = "\n".join(
+        [
+            "GOOG4-RSA-SHA256",
+            timestamp,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    signature = (await sign(string_to_sign.encode())).hex()
+    return (
+        f"https://{GCS_SIGNING_HOST}{canonical_uri}?{canonical_query}&X-Goog-Signature={signature}"
+    )
+
+
+async def signed_get_url(gcs_path: str, *, expires_s: int = 3600) -> str:
+    return await _generate_signed_url(gcs_path, method="GET", expires_s=expires_s)
+
+
+async def signed_put_url(gcs_path: str, *, content_type: str, expires_s: int = 900) -> str:
+    """Return a V4 signed URL the client can PUT the object bytes to directly.
+
+    The uploader must send the same ``Content-Type`` header that was signed.
+    """
+    return await _generate_signed_url(
+        gcs_path, method="PUT", expires_s=expires_s, content_type=content_type
+    )
+
+
+async def create_resumable_upload_url(
+    gcs_path: str,
+    *,
+    content_type: str,
+    size: int | None = None,
+    origin: str | None = None,
+) -> str:
+    """Start a resumable upload session and return its session URL.
+
+    The session URL itself authorizes the upload, so the client can PUT the
+    bytes (whole or in ``Content-Range`` chunks) without further credentials.
+    ``origin`` must match the browser origin for CORS to allow the upload.
+    """
+    return await _start_resumable_session(
+        gcs_path, content_type=content_type, size=size, origin=origin
+    )
 
 
-def signed_get_url(gcs_path: str, *, expires_s: int = 3600) -> str:
-    bucket = _get_bucket()
-    blob = bucket.blob(gcs_path)
-    return blob.generate_signed_url(expiration=timedelta(seconds=expires_s), method="GET")
+async def close() -> None:
+    """Close the shared HTTP client; call on application/worker shutdown."""
+    global _http, _semaphore
+    if _http is not None:
+        await _http.aclose()
+    _http = None
+    _semaphore = None
 
 
-__all__ = ["upload_bytes", "upload_fileobj", "signed_get_url"]
+__all__ = [
+    "upload_bytes",
+    "upload_fileobj",
+    "download_bytes",
+    "download_to_fileobj",
+    "get_metadata",
+    "copy_object",
+    "iter_download",
+    "signed_get_url",
+    "signed_put_url",
+    "create_resumable_upload_url",
+    "close",
+]
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import re
+import time
+
 from google import genai
 
 from app.core.config import settings
-from app.schemas.extract_moments import ExtractMomentsOut
+from app.core.logging import get_logger
+from app.schemas.extract_moments import ExtractMomentsBatchOut, ExtractMomentsOut
+
+logger = get_logger(__name__)
 
 _client: genai.Client | None = None
+_batcher: ExtractionBatcher | None = None
+
+
+# Built once at import; the schemas never change at runtime.
+_EXTRACT_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_json_schema": ExtractMomentsOut.model_json_schema(),
+}
+_BATCH_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_json_schema": ExtractMomentsBatchOut.model_json_schema(),
+}
 
 
 def _get_client() -> genai.Client:
@@ -15,11 +34,71 @@ def _get_client() -> genai.Client:
     return _client
 
 
+def warm_up() -> None:
+    """Create the client and open its connection before the first job needs it.
+
+    Fetching the model's metadata does the TLS handshake and auth without
+    spending any generation quota.
+    """
+    started = time.perf_counter()
+    _get_client().models.get(model=settings.GEMINI_EXTRACT_MODEL)
+    logger.info("gemini_warmed_up", latency_ms=round((time.perf_counter() - started) * 1000))
+
+
+_FIELDS = (
+    "- gimp_name: who is 'gimp of the day' (if explicitly implied)\n"
+    "- champagne_moment: the best moment as a short excerpt\n\n"
+)
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_KEY_TERMS = re.compile(
+    r"gimp|champagne|motm|man of the match|player of the match|moment",
+    re.IGNORECASE,
+)
+_GAP = "\n[...]\n"
+
+
+def trim_report(report_text: str, max_chars: int) -> str:
+    """Cut ``report_text`` down to about ``max_chars``, keeping the useful bits.
+
+    Sentences mentioning the key terms go in first, then the rest in reading
+    order until the budget runs out. The kept sentences stay in their
+    original order, with ``[...]`` where text was dropped.
+    """
+    if len(report_text) <= max_chars:
+        return report_text
+    sentences = [s for s in _SENTENCE_END.split(report_text) if s.strip()]
+    ranked = sorted(range(len(sentences)), key=lambda i: (not _KEY_TERMS.search(sentences[i]), i))
+    kept: set[int] = set()
+    used = 0
+    for index in ranked:
+        cost = len(sentences[index]) + len(_GAP)
+        if used + cost > max_chars:
+            continue
+        kept.add(index)
+        used += cost
+    if not kept:
+        return report_text[:max_chars]
+
+    parts: list[str] = []
+    previous = -1
+    for index in sorted(kept):
+        if parts and index != previous + 1:
+            parts.append(_GAP)
+        elif parts:
+            parts.append(" ")
+        parts.append(sentences[index].strip())
+        previous = index
+    if previous != len(sentences) - 1:
+        parts.append(_GAP)
+    return "".join(parts)
+
+
 def build_prompt(report_text: str) -> str:
     return (
         "Extract the following fields from this 5-a-side match report.\n"
-        "- gimp_name: who is 'gimp of the day' (if explicitly implied)\n"
-        "- champagne_moment: the best moment as a short excerpt\n\n"
+        f"{_FIELDS}"
         "Rules:\n"
         "- If a field is not present, return null for that field.\n"
         "- Output will be validated against the provided JSON schema.\n\n"
@@ -27,21 +106,176 @@ def build_prompt(report_text: str) -> str:
     )
 
 
-def extract_moments(report_text: str) -> ExtractMomentsOut:
-    client = _get_client()
-    prompt = build_prompt(report_text)
-    response = client.models.generate_content(
-        model=settings.GEMINI_EXTRACT_MODEL,
-        contents=prompt,
-        config={
-            "response_mime_type": "application/json",
-            "response_json_schema": ExtractMomentsOut.model_json_schema(),
-        },
+def build_batch_prompt(report_texts: list[str]) -> str:
+    reports = "".join(f"REPORT {index}:\n{text}\n\n" for index, text in enumerate(report_texts))
+    return (
+        "Extract the following fields from each of these 5-a-side match reports.\n"
+        f"{_FIELDS}"
+        "Rules:\n"
+        "- Return exactly one result per report, with that report's index.\n"
+        "- Treat each report on its own; never mix details between reports.\n"
+        "- If a field is not present, return null for that field.\n"
+        "- Output will be validated against the provided JSON schema.\n\n"
+        f"{reports}"
     )
-    text = getattr(response, "text", None)
+
+
+def _generate_json(
+    prompt: str, config: dict, *, timeout_s: float | None = None, **log_fields: object
+) -> str:
+    """Call Gemini and return the JSON text; every call is logged, however it ends.
+
+    ``outcome`` is ``ok``, ``empty``, ``error`` or ``timeout``. Callers time out
+    with ``asyncio.wait_for`` while this keeps running in its thread, so a call
+    that finishes after ``timeout_s`` (default ``GEMINI_REQUEST_TIMEOUT_S``) is
+    logged as a timeout too.
+    """
+    if timeout_s is None:
+        timeout_s = settings.GEMINI_REQUEST_TIMEOUT_S
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        response = _get_client().models.generate_content(
+            model=settings.GEMINI_EXTRACT_MODEL,
+            contents=prompt,
+            config=config,
+        )
+        text = getattr(response, "text", None)
+        outcome = "ok" if text else "empty"
+    except Exception as exc:
+        if isinstance(exc, TimeoutError) or "timeout" in type(exc).__name__.lower():
+            outcome = "timeout"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        if elapsed > timeout_s:
+            outcome = "timeout"
+        logger.info(
+            "gemini_request",
+            outcome=outcome,
+            prompt_chars=len(prompt),
+            latency_ms=round(elapsed * 1000),
+            **log_fields,
+        )
     if not text:
         raise ValueError("Gemini response was empty")
+    return text
+
+
+def extract_moments(report_text: str) -> ExtractMomentsOut:
+    trimmed = trim_report(report_text, settings.EXTRACT_PROMPT_MAX_CHARS)
+    text = _generate_json(
+        build_prompt(trimmed),
+        _EXTRACT_CONFIG,
+        reports=1,
+        input_chars=len(report_text),
+        trimmed_chars=len(report_text) - len(trimmed),
+    )
     return ExtractMomentsOut.model_validate_json(text)
 
 
-__all__ = ["extract_moments", "build_prompt"]
+def extract_moments_batch(report_texts: list[str]) -> list[ExtractMomentsOut | ValueError]:
+    """Extract several reports in one request; results line up with ``report_texts``.
+
+    A report the model skipped gets a ``ValueError`` in its slot so only that
+    job is retried. Each report is trimmed to the same budget as a single
+    extraction, so a batch costs at most ``EXTRACT_BATCH_MAX_SIZE`` of them.
+    The combined request takes longer than a single one, so it is judged
+    against ``EXTRACT_BATCH_TIMEOUT_S``.
+    """
+    trimmed = [trim_report(text, settings.EXTRACT_PROMPT_MAX_CHARS) for text in report_texts]
+    input_chars = sum(len(text) for text in report_texts)
+    text = _generate_json(
+        build_batch_prompt(trimmed),
+        _BATCH_CONFIG,
+        timeout_s=settings.EXTRACT_BATCH_TIMEOUT_S,
+        reports=len(report_texts),
+        input_chars=input_chars,
+        trimmed_chars=input_chars - sum(len(text) for text in trimmed),
+    )
+    by_index = {
+        item.index: item for item in ExtractMomentsBatchOut.model_validate_json(text).results
+    }
+    return [
+        ExtractMomentsOut.model_validate(by_index[index].model_dump(exclude={"index"}))
+        if index in by_index
+        else ValueError("Gemini batch response had no result for this report")
+        for index in range(len(report_texts))
+    ]
+
+
+class ExtractionBatcher:
+    """Collect concurrent extractions and send them to Gemini together.
+
+    A batch is sent once ``max_size`` reports are waiting or ``window_s`` after
+    the first one arrived, whichever comes first. It only helps when the worker
+    runs several jobs at once (``WORKER_CONCURRENCY``).
+    """
+
+    def __init__(self, *, max_size: int, window_s: float) -> None:
+        self.max_size = max_size
+        self.window_s = window_s
+        self._pending: list[tuple[str, asyncio.Future[ExtractMomentsOut]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, report_text: str) -> ExtractMomentsOut:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ExtractMomentsOut] = loop.create_future()
+        self._pending.append((report_text, future))
+        if len(self._pending) >= self.max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future[ExtractMomentsOut]]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            if len(texts) == 1:
+                results: list[ExtractMomentsOut | ValueError] = [
+                    await asyncio.to_thread(extract_moments, texts[0])
+                ]
+            else:
+                results = await asyncio.to_thread(extract_moments_batch, texts)
+        except Exception as exc:
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results, strict=True):
+            # The caller may have given up (timeout) while the batch was in flight.
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def get_batcher() -> ExtractionBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = ExtractionBatcher(
+            max_size=settings.EXTRACT_BATCH_MAX_SIZE, window_s=settings.EXTRACT_BATCH_WINDOW_S
+        )
+    return _batcher
+
+
+__all__ = [
+    "ExtractionBatcher",
+    "build_batch_prompt",
+    "build_prompt",
+    "extract_moments",
+    "extract_moments_batch",
+    "get_batcher",
+    "trim_report",
+    "warm_up",
+]
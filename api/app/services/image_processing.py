@@ -0,0 +1,162 @@
+"""CPU-bound image work, run in a process pool off the worker's event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import multiprocessing
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+
+from PIL import Image, ImageOps, features
+
+from app.core.config import settings
+from app.models.asset import THUMBNAIL_VARIANT_PREFIX
+
+try:
+    import pillow_heif
+except ImportError:  # pragma: no cover - optional dependency
+    pillow_heif = None
+else:
+    # Lets Image.open read iPhone HEIC uploads.
+    pillow_heif.register_heif_opener()
+
+_pool: ProcessPoolExecutor | None = None
+
+# What an undecodable or hostile image can raise through ``run_in_process``:
+# decode errors, Pillow's pixel-count guard, and a worker killed mid-task
+# (e.g. by the OOM killer).
+IMAGE_PROCESSING_ERRORS = (OSError, ValueError, Image.DecompressionBombError, BrokenProcessPool)
+
+_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", "image/avif", {"quality": 60}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": 85, "optimize": True}),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Thumbnail:
+    variant: str
+    format: str
+    mime_type: str
+    width: int
+    height: int
+    data: bytes
+
+
+def thumbnail_variant(width: int, fmt: str) -> str:
+    return f"{THUMBNAIL_VARIANT_PREFIX}{width}_{fmt}"
+
+
+def supported_formats(formats: Sequence[str]) -> list[str]:
+    """The requested thumbnail formats this Pillow build can encode."""
+    return [fmt for fmt in formats if fmt in _FORMATS and features.check(fmt)]
+
+
+def prepare_model_input(data: bytes, *, max_side: int, quality: int = 90) -> bytes:
+    """Re-encode an upload as an upright, EXIF-free JPEG no larger than ``max_side``.
+
+    Orientation from EXIF is applied to the pixels before the metadata is
+    dropped; transparent images are flattened onto white.
+    """
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        if "A" in image.getbands():
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        # No exif= argument, so none of the original metadata is written.
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def render_thumbnails(
+    data: bytes, *, widths: Sequence[int], formats: Sequence[str]
+) -> list[Thumbnail]:
+    """Encode ``data`` at each width (never upscaling) in each supported format.
+
+    Widths at or above the source width collapse into a single full-width
+    rendition, so small images still get one thumbnail per format.
+    """
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        if image.mode not in {"RGB", "RGBA"}:
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        targets = sorted({min(width, image.width) for width in widths})
+        thumbnails = []
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = (
+                image
+                if width == image.width
+                else image.resize((width, height), Image.Resampling.LANCZOS)
+            )
+            for fmt in supported_formats(formats):
+                pil_format, mime_type, options = _FORMATS[fmt]
+                frame = resized.convert("RGB") if pil_format == "JPEG" else resized
+                output = io.BytesIO()
+                frame.save(output, format=pil_format, **options)
+                thumbnails.append(
+                    Thumbnail(
+                        variant=thumbnail_variant(width, fmt),
+                        format=fmt,
+                        mime_type=mime_type,
+                        width=width,
+                        height=height,
+                        data=output.getvalue(),
+                    )
+                )
+    return thumbnails
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawn rather than fork: the worker has an event loop and open sockets.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_in_process[T](fn: Callable[..., T], *args: object, **kwargs: object) -> T:
+    """Run a picklable, module-level function in the shared process pool."""
+    global _pool
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+    except BrokenProcessPool:
+        # A broken pool rejects all further work; start a fresh one next time.
+        if _pool is pool:
+            _pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def close_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+__all__ = [
+    "IMAGE_PROCESSING_ERRORS",
+    "Thumbnail",
+    "close_process_pool",
+    "prepare_model_input",
+    "render_thumbnails",
+    "run_in_process",
+    "supported_formats",
+    "thumbnail_variant",
+]
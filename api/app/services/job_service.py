@@ -1,29 +1,60 @@
+from collections.abc import Sequence
+from datetime import timedelta
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, or_, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
 
+from app.core.config import settings
 from app.core.enums import JobStatus, JobType
 from app.models.job import Job
 
+JOBS_CHANNEL = "jobs"
+
+
+async def notify_job_queued(db: AsyncSession, job_type: JobType) -> None:
+    """Wake Postgres-queue workers; the notification is delivered on commit."""
+    if settings.QUEUE_BACKEND != "postgres":
+        return
+    await db.execute(select(func.pg_notify(JOBS_CHANNEL, job_type.value)))
+
+
+_RESUBMIT_FAILED_JOB = {
+    "status": JobStatus.QUEUED,
+    "attempts": 0,
+    "last_error": None,
+    "idempotency_key": None,
+    "provider_job_id": None,
+}
+
 
 async def ensure_job(
-    db: AsyncSession, report_id: str, job_type: JobType, idempotency_key: str | None = None
+    db: AsyncSession,
+    report_id: str,
+    job_type: JobType,
+    idempotency_key: str | None = None,
+    *,
+    priority: int = 0,
 ) -> Job:
-    stmt = (
-        insert(Job)
-        .values(
-            id=uuid4().hex,
-            report_id=report_id,
-            type=job_type,
-            status=JobStatus.QUEUED,
-            attempts=0,
-            idempotency_key=idempotency_key,
-        )
-        .on_conflict_do_nothing(index_elements=["report_id", "type"])
-        .returning(Job.id)
+    stmt = insert(Job).values(
+        id=uuid4().hex,
+        report_id=report_id,
+        type=job_type,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        priority=priority,
+        idempotency_key=idempotency_key,
     )
+    # Resubmitting requeues a failed job with a fresh attempt budget (and no
+    # stale prediction to resume); jobs that are queued, running or done are
+    # left alone.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["report_id", "type"],
+        set_={**_RESUBMIT_FAILED_JOB, "idempotency_key": stmt.excluded.idempotency_key},
+        where=Job.status == JobStatus.FAILED,
+    ).returning(Job.id)
     result = await db.execute(stmt)
     job_id = result.scalar_one_or_none()
     if job_id is None:
@@ -32,10 +63,145 @@ async def ensure_job(
         )
         return existing.scalar_one()
 
-    created = await db.execute(select(Job).where(Job.id == job_id))
+    await notify_job_queued(db, job_type)
+    created = await db.execute(
+        select(Job).where(Job.id == job_id).execution_options(populate_existing=True)
+    )
     return created.scalar_one()
 
 
+async def ensure_jobs(
+    db: AsyncSession, report_ids: Sequence[str], job_types: Sequence[JobType]
+) -> list[Job]:
+    """Bulk ``ensure_job``: one multi-row upsert for every report/type pair."""
+    if not report_ids:
+        return []
+    stmt = insert(Job).values(
+        [
+            {
+                "id": uuid4().hex,
+                "report_id": report_id,
+                "type": job_type,
+                "status": JobStatus.QUEUED,
+                "attempts": 0,
+            }
+            for report_id in report_ids
+            for job_type in job_types
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["report_id", "type"],
+        set_=_RESUBMIT_FAILED_JOB,
+        where=Job.status == JobStatus.FAILED,
+    ).returning(Job.type)
+    result = await db.execute(stmt)
+    for job_type in set(result.scalars().all()):
+        await notify_job_queued(db, job_type)
+
+    jobs = await db.execute(
+        select(Job)
+        .where(Job.report_id.in_(report_ids), Job.type.in_(job_types))
+        .execution_options(populate_existing=True)
+    )
+    return list(jobs.scalars().all())
+
+
+def _lease_expired() -> ColumnElement[bool]:
+    # A running job without a lease (claimed before leases existed, or by a
+    # path that never set one) has no live owner, so it counts as expired.
+    return or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < func.now())
+
+
+async def claim_job(db: AsyncSession, job_id: str, *, lease_s: int) -> Job | None:
+    """Atomically move a job to RUNNING and take a lease on it.
+
+    Only a queued job, or a running job whose lease has lapsed (its worker
+    died), can be claimed. Returns ``None`` when another worker holds the job
+    or it is already finished, so duplicate deliveries drop out in one query.
+    """
+    stmt = (
+        update(Job)
+        .where(
+            Job.id == job_id,
+            or_(
+                Job.status == JobStatus.QUEUED,
+                (Job.status == JobStatus.RUNNING) & _lease_expired(),
+            ),
+        )
+        .values(
+            status=JobStatus.RUNNING,
+            attempts=Job.attempts + 1,
+            lease_expires_at=func.now() + timedelta(seconds=lease_s),
+        )
+        .returning(Job)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def claim_next_job(db: AsyncSession, *, lease_s: int) -> Job | None:
+    """Claim the highest-priority queued job, skipping rows other workers hold.
+
+    Used by the Postgres queue backend, where the ``jobs`` table is the queue.
+    """
+    next_id = (
+        select(Job.id)
+        .where(Job.status == JobStatus.QUEUED)
+        .order_by(Job.priority.desc(), Job.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Job)
+        .where(Job.id == next_id)
+        .values(
+            status=JobStatus.RUNNING,
+            attempts=Job.attempts + 1,
+            lease_expires_at=func.now() + timedelta(seconds=lease_s),
+        )
+        .returning(Job)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def requeue_expired_jobs(db: AsyncSession) -> list[tuple[str, JobType]]:
+    """Put running jobs whose lease lapsed back in the queue; return their ``(id, type)``."""
+    result = await db.execute(
+        update(Job)
+        .where(Job.status == JobStatus.RUNNING, _lease_expired())
+        .values(status=JobStatus.QUEUED, lease_expires_at=None)
+        .returning(Job.id, Job.type)
+    )
+    return [(job_id, job_type) for job_id, job_type in result.tuples()]
+
+
+async def queue_depth(db: AsyncSession) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(Job).where(Job.status == JobStatus.QUEUED)
+    )
+    return result.scalar_one()
+
+
+async def extend_lease(db: AsyncSession, job_id: str, *, lease_s: int) -> bool:
+    """Push a running job's lease forward; ``False`` if the job is no longer running."""
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+        # Keep updated_at as is: a heartbeat is not a visible change (and would
+        # otherwise invalidate the report's ETag on every beat).
+        .values(
+            lease_expires_at=func.now() + timedelta(seconds=lease_s),
+            updated_at=Job.updated_at,
+        )
+        .returning(Job.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
 async def list_jobs(db: AsyncSession, report_id: str) -> list[Job]:
     result = await db.execute(select(Job).where(Job.report_id == report_id))
     return list(result.scalars().all())
@@ -0,0 +1,84 @@
+"""Deterministic pre-extraction for reports written to the usual template.
+
+Many authors label the fields explicitly ("Gimp of the day: Dave",
+"Champagne moment: ..."). When both labels are found unambiguously the
+Gemini call can be skipped.
+"""
+
+from __future__ import annotations
+
+import re
+
+from app.schemas.extract_moments import ExtractMomentsOut
+
+# Label, separator and value must share a line; ``\s`` would let a blank
+# label swallow the next line as its value.
+_SEPARATOR = r"[ \t]*[:=\-–—][ \t]*"
+
+_GIMP_RE = re.compile(
+    r"^[ \t*_#>-]*(?:the[ \t]+)?gimp(?:[ \t]+of[ \t]+the[ \t]+(?:day|match|week|game))?[ \t*_]*"
+    + _SEPARATOR
+    + r"(?P<value>.+)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_CHAMPAGNE_RE = re.compile(
+    r"^[ \t*_#>-]*(?:the[ \t]+)?champagne[ \t]+moment"
+    r"(?:[ \t]+of[ \t]+the[ \t]+(?:day|match|week|game))?[ \t*_]*" + _SEPARATOR + r"(?P<value>.+)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Either label anywhere in a value means two fields ran together.
+_LABEL_RE = re.compile(r"\b(?:gimp|champagne[ \t]+moment)\b[ \t*_]*[:=\-–—]", re.IGNORECASE)
+
+# A name longer than this is more likely a sentence than a name.
+MAX_NAME_WORDS = 4
+# Report.gimp_name and Report.champagne_moment are String(255).
+MAX_VALUE_LENGTH = 255
+
+_PLACEHOLDERS = frozenset({"n/a", "na", "none", "nobody", "nil", "tbc", "tbd", "unknown"})
+# Lower-case words allowed inside a name ("Robin van Persie").
+_NAME_PARTICLES = frozenset({"da", "de", "del", "der", "di", "la", "le", "van", "von"})
+
+
+def _clean(value: str) -> str:
+    return value.strip().strip("*_\"'“”").strip().rstrip(".!,;")
+
+
+def _is_value(value: str) -> bool:
+    return (
+        any(char.isalnum() for char in value)
+        and value.lower() not in _PLACEHOLDERS
+        and len(value) <= MAX_VALUE_LENGTH
+        and not _LABEL_RE.search(value)
+    )
+
+
+def _is_name(value: str) -> bool:
+    # "The gimp - Dave was dreadful" is a sentence, not a label.
+    words = value.split()
+    return len(words) <= MAX_NAME_WORDS and all(
+        word[0].isupper() or word in _NAME_PARTICLES for word in words
+    )
+
+
+def _single_match(pattern: re.Pattern[str], text: str) -> str | None:
+    """Return the labelled value if the label appears exactly once (or always agrees)."""
+    values = {_clean(match["value"]) for match in pattern.finditer(text)}
+    values.discard("")
+    if len(values) != 1:
+        return None
+    value = values.pop()
+    return value if _is_value(value) else None
+
+
+def extract_moments_locally(report_text: str) -> ExtractMomentsOut | None:
+    """Both fields from explicit labels, or ``None`` when Gemini is still needed."""
+    gimp_name = _single_match(_GIMP_RE, report_text)
+    if gimp_name is None or not _is_name(gimp_name):
+        return None
+    champagne_moment = _single_match(_CHAMPAGNE_RE, report_text)
+    if champagne_moment is None:
+        return None
+    return ExtractMomentsOut(gimp_name=gimp_name, champagne_moment=champagne_moment)
+
+
+__all__ = ["extract_moments_locally"]
@@ -6,6 +6,9 @@ from app.core.config import settings
 
 
 async def enqueue_job(job_id: str, job_type: str, *, queue: str = "jobs") -> None:
+    if settings.QUEUE_BACKEND == "postgres":
+        # The queued row in ``jobs`` is the message; workers poll the table.
+        return
     redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
     try:
         payload = json.dumps({"job_id": job_id, "job_type": job_type})
@@ -14,4 +17,18 @@ async def enqueue_job(job_id: str, job_type: str, *, queue: str = "jobs") -> Non
         await redis.aclose()
 
 
-__all__ = ["enqueue_job"]
+async def enqueue_jobs(jobs: list[tuple[str, str]], *, queue: str = "jobs") -> None:
+    """Enqueue many ``(job_id, job_type)`` pairs with a single RPUSH."""
+    if not jobs or settings.QUEUE_BACKEND == "postgres":
+        return
+    redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        payloads = [
+            json.dumps({"job_id": job_id, "job_type": job_type}) for job_id, job_type in jobs
+        ]
+        await redis.rpush(queue, *payloads)
+    finally:
+        await redis.aclose()
+
+
+__all__ = ["enqueue_job", "enqueue_jobs"]
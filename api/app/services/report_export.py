@@ -0,0 +1,106 @@
+"""Streaming report export (NDJSON or CSV) with flat memory use."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.enums import AssetKind
+from app.models.asset import Asset
+from app.schemas.report import ReportExportRow, ReportResponse
+from app.services import report_service
+from app.services.storage import get_storage, is_configured
+
+ExportFormat = Literal["ndjson", "csv"]
+
+CSV_COLUMNS = list(ReportResponse.model_fields)
+
+
+async def _asset_urls(assets: list[Asset]) -> dict[str, dict[AssetKind, str]]:
+    urls: dict[str, dict[AssetKind, str]] = {}
+    if not is_configured():
+        return urls
+    storage = get_storage()
+    # Sign the whole batch at once: with IAM signing each URL is a round trip.
+    signed = await asyncio.gather(
+        *(
+            storage.signed_get_url(asset.gcs_path, expires_s=settings.GCS_READ_URL_TTL_S)
+            for asset in assets
+        )
+    )
+    for asset, url in zip(assets, signed, strict=True):
+        urls.setdefault(asset.report_id, {})[asset.kind] = url
+    return urls
+
+
+async def _rows(
+    db: AsyncSession, author_id: str, include_asset_urls: bool
+) -> AsyncIterator[list[ReportExportRow]]:
+    async for batch in report_service.iter_report_batches(
+        db, author_id, batch_size=settings.REPORT_EXPORT_BATCH_SIZE
+    ):
+        urls: dict[str, dict[AssetKind, str]] = {}
+        if include_asset_urls:
+            assets = await report_service.assets_for_reports(db, [r.id for r in batch])
+            urls = await _asset_urls(assets)
+        yield [
+            ReportExportRow.model_validate(
+                {
+                    **{name: getattr(report, name) for name in CSV_COLUMNS},
+                    "asset_urls": urls.get(report.id, {}) if include_asset_urls else None,
+                }
+            )
+            for report in batch
+        ]
+
+
+def _encode_csv(rows: list[ReportExportRow], include_asset_urls: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = row.model_dump(mode="json")
+        line = [values[name] for name in CSV_COLUMNS]
+        if include_asset_urls:
+            line += [(row.asset_urls or {}).get(kind, "") for kind in AssetKind]
+        writer.writerow(line)
+    return buffer.getvalue().encode()
+
+
+def csv_header(include_asset_urls: bool) -> bytes:
+    columns = list(CSV_COLUMNS)
+    if include_asset_urls:
+        columns += [f"{kind.value}_url" for kind in AssetKind]
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue().encode()
+
+
+async def export_reports(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    author_id: str,
+    fmt: ExportFormat,
+    *,
+    include_asset_urls: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yield the author's reports encoded as ``fmt``, one chunk per DB batch.
+
+    The session is opened here rather than taken from a request dependency,
+    because the body is produced after the endpoint has returned.
+    """
+    if fmt == "csv":
+        yield csv_header(include_asset_urls)
+    async with sessionmaker() as db:
+        async for rows in _rows(db, author_id, include_asset_urls):
+            if fmt == "csv":
+                yield _encode_csv(rows, include_asset_urls)
+            else:
+                yield b"".join(row.model_dump_json().encode() + b"\n" for row in rows)
+
+
+__all__ = ["ExportFormat", "csv_header", "export_reports"]
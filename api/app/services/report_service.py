@@ -1,16 +1,45 @@
+from collections.abc import AsyncIterator, Sequence
 from datetime import date
 from uuid import uuid4
 
-from sqlalchemy import Select, select
+from pydantic import ValidationError
+from sqlalchemy import Select, case, exists, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, with_expression
 
 from app.core.enums import AssetKind, AssetStatus, JobType, ReportStatus
 from app.core.exceptions import BadRequestError, ConflictError, ForbiddenError, NotFoundError
-from app.models.asset import Asset
+from app.models.asset import ORIGINAL_VARIANT, Asset
 from app.models.job import Job
 from app.models.report import Report
 from app.schemas.report import ReportCreate, ReportUpdate
-from app.services.job_service import ensure_job
+from app.services.job_service import ensure_job, ensure_jobs
+
+EXCERPT_CHARS = 160
+
+# asyncpg (the Postgres wire protocol) allows at most 32767 bind parameters
+# per statement.
+MAX_BIND_PARAMS = 32767
+
+# Columns a list page needs; ``content`` stays in the database.
+SUMMARY_FIELDS = (
+    "id",
+    "author_id",
+    "date",
+    "opponent",
+    "status",
+    "gimp_name",
+    "champagne_moment",
+    "created_at",
+    "updated_at",
+    "excerpt",
+)
+
+_EXCERPT = case(
+    (func.length(Report.content) > EXCERPT_CHARS, func.left(Report.content, EXCERPT_CHARS) + "…"),
+    else_=Report.content,
+)
 
 
 async def _get_report(db: AsyncSession, report_id: str) -> Report:
@@ -40,6 +69,70 @@ async def create_report(db: AsyncSession, author_id: str, data: ReportCreate) ->
     return report
 
 
+async def create_reports(db: AsyncSession, author_id: str, items: Sequence[ReportCreate]) -> int:
+    """Insert many draft reports with multi-row INSERTs.
+
+    Rows are split so no statement binds more than ``MAX_BIND_PARAMS``
+    parameters, whatever batch size the caller uses.
+    """
+    rows = [
+        {
+            "id": uuid4().hex,
+            "author_id": author_id,
+            "date": item.date,
+            "opponent": item.opponent,
+            "content": item.content,
+            "status": ReportStatus.DRAFT,
+        }
+        for item in items
+    ]
+    if not rows:
+        return 0
+    rows_per_insert = MAX_BIND_PARAMS // len(rows[0])
+    for start in range(0, len(rows), rows_per_insert):
+        await db.execute(insert(Report).values(rows[start : start + rows_per_insert]))
+    return len(rows)
+
+
+async def import_reports(
+    db: AsyncSession,
+    author_id: str,
+    records: AsyncIterator[tuple[int, dict | ValueError]],
+    *,
+    batch_size: int = 500,
+) -> tuple[int, list[tuple[int, str]]]:
+    """Validate streamed records and insert them in committed batches.
+
+    Returns the number imported and ``(row, error)`` for every rejected row.
+    Each batch is committed as it fills, so memory stays bounded by
+    ``batch_size`` however large the input is.
+    """
+    imported = 0
+    errors: list[tuple[int, str]] = []
+    batch: list[ReportCreate] = []
+    async for row, record in records:
+        if isinstance(record, ValueError):
+            errors.append((row, str(record)))
+            continue
+        try:
+            batch.append(ReportCreate.model_validate(record))
+        except ValidationError as exc:
+            errors.append((row, "; ".join(_format_error(error) for error in exc.errors())))
+            continue
+        if len(batch) >= batch_size:
+            imported += await create_reports(db, author_id, batch)
+            await db.commit()
+            batch.clear()
+    imported += await create_reports(db, author_id, batch)
+    await db.commit()
+    return imported, errors
+
+
+def _format_error(error: dict) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
 async def update_report(
     db: AsyncSession, report_id: str, author_id: str, patch: ReportUpdate
 ) -> Report:
@@ -64,8 +157,16 @@ async def list_reports(
     opponent: str | None = None,
     limit: int = 50,
     offset: int = 0,
+    fields: Sequence[str] | None = None,
 ) -> list[Report]:
-    stmt: Select[tuple[Report]] = select(Report).where(Report.author_id == author_id)
+    """List an author's reports as summaries, loading only ``fields`` (default: all)."""
+    fields = SUMMARY_FIELDS if fields is None else fields
+    columns = [getattr(Report, name) for name in fields if name != "excerpt"]
+    stmt: Select[tuple[Report]] = (
+        select(Report).where(Report.author_id == author_id).options(load_only(*columns))
+    )
+    if "excerpt" in fields:
+        stmt = stmt.options(with_expression(Report.excerpt, _EXCERPT))
     if status is not None:
         stmt = stmt.where(Report.status == status)
     if date_from is not None:
@@ -79,12 +180,88 @@ async def list_reports(
     return list(result.scalars().all())
 
 
+async def iter_report_batches(
+    db: AsyncSession, author_id: str, *, batch_size: int = 500
+) -> AsyncIterator[list[Report]]:
+    """Stream all of an author's reports from a server-side cursor in batches.
+
+    Rows are fetched ``batch_size`` at a time and dropped from the session
+    after each batch, so memory stays flat however many reports there are.
+    """
+    result = await db.stream_scalars(
+        select(Report)
+        .where(Report.author_id == author_id)
+        .order_by(Report.date, Report.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for batch in result.partitions():
+        yield list(batch)
+        db.expunge_all()
+
+
+async def assets_for_reports(db: AsyncSession, report_ids: Sequence[str]) -> list[Asset]:
+    result = await db.execute(
+        select(Asset).where(
+            Asset.report_id.in_(report_ids),
+            Asset.variant == ORIGINAL_VARIANT,
+            Asset.status == AssetStatus.READY,
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def count_reports_by_status(db: AsyncSession, author_id: str) -> dict[ReportStatus, int]:
+    """Per-status report counts for one author, zero-filled for missing statuses."""
+    result = await db.execute(
+        select(Report.status, func.count())
+        .where(Report.author_id == author_id)
+        .group_by(Report.status)
+    )
+    counts = dict.fromkeys(ReportStatus, 0)
+    counts.update(result.tuples().all())
+    return counts
+
+
 async def get_report(db: AsyncSession, report_id: str, author_id: str) -> Report:
     report = await _get_report(db, report_id)
     _require_author(report, author_id)
     return report
 
 
+async def report_version(db: AsyncSession, report_id: str, author_id: str) -> tuple:
+    """Cheap fingerprint of a report and its assets and jobs, for ETags.
+
+    One aggregate query hashing every asset and job row's ``(id, status,
+    updated_at)``. ``updated_at`` is the writing transaction's start time, so a
+    max/count summary could miss a commit from a transaction that started
+    earlier; a per-row digest changes whenever any row does (including inserts
+    and deletes). Raises like ``get_report`` for unknown or foreign reports.
+    """
+
+    def digest(model) -> Select:
+        row = func.concat(model.id, "|", model.status, "|", model.updated_at)
+        return select(
+            func.md5(func.string_agg(row, aggregate_order_by(literal_column("','"), model.id)))
+        ).where(model.report_id == report_id)
+
+    result = await db.execute(
+        select(
+            Report.author_id,
+            Report.updated_at,
+            Report.status,
+            digest(Asset).scalar_subquery(),
+            digest(Job).scalar_subquery(),
+        ).where(Report.id == report_id)
+    )
+    row = result.first()
+    if row is None:
+        raise NotFoundError("Report not found")
+    owner, *version = row
+    if owner != author_id:
+        raise ForbiddenError("Not allowed to access this report")
+    return tuple(version)
+
+
 async def submit_report(
     db: AsyncSession, report_id: str, author_id: str
 ) -> tuple[Report, list[Job]]:
@@ -98,6 +275,7 @@ async def submit_report(
         select(Asset).where(
             Asset.report_id == report_id,
             Asset.kind == AssetKind.GIMP_ORIGINAL,
+            Asset.variant == ORIGINAL_VARIANT,
             Asset.status == AssetStatus.READY,
         )
     )
@@ -114,6 +292,58 @@ async def submit_report(
     return report, [job_extract, job_gimpify, job_video]
 
 
+SUBMIT_JOB_TYPES = (JobType.EXTRACT_MOMENTS, JobType.GIMPIFY_IMAGE, JobType.GENERATE_VIDEO)
+
+
+async def submit_reports(
+    db: AsyncSession, report_ids: list[str], author_id: str
+) -> tuple[dict[str, Report | Exception], list[Job]]:
+    """Submit many reports at once with the same rules as ``submit_report``.
+
+    Returns each report id mapped to its (updated) report or the error that
+    stopped it, plus the jobs of every submitted report. Checks run in one
+    query and the jobs are created with one multi-row upsert.
+    """
+    has_original = (
+        exists()
+        .where(
+            Asset.report_id == Report.id,
+            Asset.kind == AssetKind.GIMP_ORIGINAL,
+            Asset.variant == ORIGINAL_VARIANT,
+            Asset.status == AssetStatus.READY,
+        )
+        .label("has_original")
+    )
+    result = await db.execute(select(Report, has_original).where(Report.id.in_(report_ids)))
+    found = {report.id: (report, ready) for report, ready in result.tuples()}
+
+    outcomes: dict[str, Report | Exception] = {}
+    for report_id in report_ids:
+        if report_id not in found:
+            outcomes[report_id] = NotFoundError("Report not found")
+            continue
+        report, ready = found[report_id]
+        if report.author_id != author_id:
+            outcomes[report_id] = ForbiddenError("Not allowed to access this report")
+        elif report.status in {ReportStatus.PUBLISHED, ReportStatus.ARCHIVED}:
+            outcomes[report_id] = ConflictError("Cannot submit a published or archived report")
+        elif not ready:
+            outcomes[report_id] = BadRequestError(
+                "gimp_original asset must be uploaded before submit"
+            )
+        else:
+            if report.status in {ReportStatus.DRAFT, ReportStatus.FAILED}:
+                report.status = ReportStatus.PROCESSING
+            outcomes[report_id] = report
+
+    submitted = [
+        report_id for report_id, outcome in outcomes.items() if isinstance(outcome, Report)
+    ]
+    jobs = await ensure_jobs(db, submitted, SUBMIT_JOB_TYPES)
+    await db.flush()
+    return outcomes, jobs
+
+
 async def list_jobs(db: AsyncSession, report_id: str, author_id: str) -> list[Job]:
     report = await _get_report(db, report_id)
     _require_author(report, author_id)
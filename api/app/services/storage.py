@@ -0,0 +1,448 @@
+"""Pluggable object storage backends.
+
+``get_storage()`` returns the backend selected by ``STORAGE_BACKEND``:
+
+- ``gcs``: Google Cloud Storage (production).
+- ``local``: files under ``LOCAL_STORAGE_ROOT``, with URLs served by the
+  ``/v1/storage`` routes, for running the pipeline offline.
+- ``memory``: a process-local dict, for tests and benchmarks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import os
+import shutil
+import time
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Protocol
+from urllib.parse import quote, urlencode
+from uuid import uuid4
+
+from app.core.config import settings
+from app.services import gcs
+from app.utils.hashing import crc32c_b64, file_crc32c_b64
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectInfo:
+    size: int
+    crc32c: str | None
+    content_type: str | None = None
+
+
+class StorageBackend(Protocol):
+    async def upload_bytes(
+        self, path: str, data: bytes, *, content_type: str | None = None
+    ) -> None: ...
+
+    async def upload_fileobj(
+        self, path: str, fileobj: BinaryIO, *, content_type: str | None = None
+    ) -> None: ...
+
+    async def download_bytes(self, path: str) -> bytes: ...
+
+    async def download_to_fileobj(self, path: str, fileobj: BinaryIO) -> int: ...
+
+    async def stat(self, path: str) -> ObjectInfo | None: ...
+
+    async def copy(self, source_path: str, dest_path: str) -> None: ...
+
+    async def signed_get_url(self, path: str, *, expires_s: int = 3600) -> str: ...
+
+    async def signed_put_url(
+        self, path: str, *, content_type: str, expires_s: int = 900
+    ) -> str: ...
+
+    async def create_resumable_upload_url(
+        self,
+        path: str,
+        *,
+        content_type: str,
+        size: int | None = None,
+        origin: str | None = None,
+    ) -> str: ...
+
+    async def close(self) -> None: ...
+
+
+class GcsStorage:
+    """Storage backed by the async GCS client in ``app.services.gcs``."""
+
+    async def upload_bytes(
+        self, path: str, data: bytes, *, content_type: str | None = None
+    ) -> None:
+        await gcs.upload_bytes(path, data, content_type=content_type)
+
+    async def upload_fileobj(
+        self, path: str, fileobj: BinaryIO, *, content_type: str | None = None
+    ) -> None:
+        await gcs.upload_fileobj(path, fileobj, content_type=content_type)
+
+    async def download_bytes(self, path: str) -> bytes:
+        return await gcs.download_bytes(path)
+
+    async def download_to_fileobj(self, path: str, fileobj: BinaryIO) -> int:
+        return await gcs.download_to_fileobj(path, fileobj)
+
+    async def stat(self, path: str) -> ObjectInfo | None:
+        metadata = await gcs.get_metadata(path)
+        if metadata is None:
+            return None
+        return ObjectInfo(
+            size=int(metadata["size"]),
+            crc32c=metadata.get("crc32c"),
+            content_type=metadata.get("contentType"),
+        )
+
+    async def copy(self, source_path: str, dest_path: str) -> None:
+        await gcs.copy_object(source_path, dest_path)
+
+    async def signed_get_url(self, path: str, *, expires_s: int = 3600) -> str:
+        return await gcs.signed_get_url(path, expires_s=expires_s)
+
+    async def signed_put_url(self, path: str, *, content_type: str, expires_s: int = 900) -> str:
+        return await gcs.signed_put_url(path, content_type=content_type, expires_s=expires_s)
+
+    async def create_resumable_upload_url(
+        self,
+        path: str,
+        *,
+        content_type: str,
+        size: int | None = None,
+        origin: str | None = None,
+    ) -> str:
+        return await gcs.create_resumable_upload_url(
+            path, content_type=content_type, size=size, origin=origin
+        )
+
+    async def close(self) -> None:
+        await gcs.close()
+
+
+def sign_local_url(method: str, path: str, expires_at: int) -> str:
+    message = f"{method}\n{path}\n{expires_at}".encode()
+    key = settings.LOCAL_STORAGE_SIGNING_KEY.encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
+def verify_local_url(method: str, path: str, expires_at: int, signature: str) -> bool:
+    if expires_at < time.time():
+        return False
+    return hmac.compare_digest(sign_local_url(method, path, expires_at), signature)
+
+
+_STREAM_WRITE_BYTES = 1 << 20
+
+
+class LocalStorage:
+    """Storage on the local filesystem.
+
+    Writes go to a temporary file in the destination directory and are moved
+    into place with ``os.replace``, so readers never see partial objects.
+    Copies to real files use ``os.sendfile`` to stay in the kernel.
+    """
+
+    def __init__(self, root: str | Path, *, base_url: str) -> None:
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def resolve(self, path: str) -> Path:
+        resolved = (self.root / path).resolve()
+        if not resolved.is_relative_to(self.root):
+            raise ValueError(f"Storage path escapes the storage root: {path}")
+        return resolved
+
+    def _temp_path(self, target: Path) -> Path:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return target.with_name(f".{target.name}.{uuid4().hex}.tmp")
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        target = self.resolve(path)
+        temp = self._temp_path(target)
+        try:
+            temp.write_bytes(data)
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
+
+    def _copy_atomic(self, path: str, fileobj: BinaryIO) -> None:
+        target = self.resolve(path)
+        temp = self._temp_path(target)
+        try:
+            with temp.open("wb") as out:
+                shutil.copyfileobj(fileobj, out)
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
+
+    def _send_to(self, path: str, fileobj: BinaryIO) -> int:
+        source = self.resolve(path)
+        size = source.stat().st_size
+        with source.open("rb") as src:
+            try:
+                out_fd = fileobj.fileno()
+            except (AttributeError, OSError):
+                shutil.copyfileobj(src, fileobj)
+                return size
+            fileobj.flush()
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out_fd, src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            # sendfile bypasses the file object's position bookkeeping.
+            fileobj.seek(0, os.SEEK_END)
+            return offset
+
+    async def upload_bytes(
+        self,
+        path: str,
+        data: bytes,
+        *,
+        content_type: str | None = None,  # noqa: ARG002
+    ) -> None:
+        await asyncio.to_thread(self._write_atomic, path, data)
+
+    async def upload_fileobj(
+        self,
+        path: str,
+        fileobj: BinaryIO,
+        *,
+        content_type: str | None = None,  # noqa: ARG002
+    ) -> None:
+        await asyncio.to_thread(self._copy_atomic, path, fileobj)
+
+    async def upload_stream(self, path: str, chunks: AsyncIterable[bytes]) -> int:
+        """Write an async byte stream (e.g. a request body) atomically.
+
+        The file I/O runs in worker threads; small chunks are gathered into
+        ``_STREAM_WRITE_BYTES`` writes so each thread hop does real work.
+        """
+        target = self.resolve(path)
+        temp = await asyncio.to_thread(self._temp_path, target)
+        size = 0
+        try:
+            out = await asyncio.to_thread(temp.open, "wb")
+            try:
+                pending = bytearray()
+                async for chunk in chunks:
+                    pending += chunk
+                    size += len(chunk)
+                    if len(pending) >= _STREAM_WRITE_BYTES:
+                        await asyncio.to_thread(out.write, bytes(pending))
+                        pending.clear()
+                if pending:
+                    await asyncio.to_thread(out.write, bytes(pending))
+            finally:
+                await asyncio.to_thread(out.close)
+            await asyncio.to_thread(os.replace, temp, target)
+        finally:
+            await asyncio.to_thread(temp.unlink, missing_ok=True)
+        return size
+
+    async def download_bytes(self, path: str) -> bytes:
+        return await asyncio.to_thread(self.resolve(path).read_bytes)
+
+    async def download_to_fileobj(self, path: str, fileobj: BinaryIO) -> int:
+        return await asyncio.to_thread(self._send_to, path, fileobj)
+
+    def _stat(self, path: str) -> ObjectInfo | None:
+        target = self.resolve(path)
+        if not target.is_file():
+            return None
+        with target.open("rb") as src:
+            crc32c = file_crc32c_b64(src)
+            size = src.tell()
+        return ObjectInfo(size=size, crc32c=crc32c)
+
+    async def stat(self, path: str) -> ObjectInfo | None:
+        return await asyncio.to_thread(self._stat, path)
+
+    def _copy_file(self, source_path: str, dest_path: str) -> None:
+        source = self.resolve(source_path)
+        target = self.resolve(dest_path)
+        temp = self._temp_path(target)
+        try:
+            # copyfile uses sendfile on Linux, so the bytes stay in the kernel.
+            shutil.copyfile(source, temp)
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
+
+    async def copy(self, source_path: str, dest_path: str) -> None:
+        await asyncio.to_thread(self._copy_file, source_path, dest_path)
+
+    def _signed_url(self, method: str, path: str, expires_s: int) -> str:
+        expires_at = int(time.time()) + expires_s
+        query = urlencode(
+            {"expires": expires_at, "signature": sign_local_url(method, path, expires_at)}
+        )
+        return f"{self.base_url}/v1/storage/{quote(path)}?{query}"
+
+    async def signed_get_url(self, path: str, *, expires_s: int = 3600) -> str:
+        return self._signed_url("GET", path, expires_s)
+
+    async def signed_put_url(
+        self,
+        path: str,
+        *,
+        content_type: str,  # noqa: ARG002
+        expires_s: int = 900,
+    ) -> str:
+        return self._signed_url("PUT", path, expires_s)
+
+    async def create_resumable_upload_url(
+        self,
+        path: str,
+        *,
+        content_type: str,  # noqa: ARG002
+        size: int | None = None,  # noqa: ARG002
+        origin: str | None = None,  # noqa: ARG002
+    ) -> str:
+        # Local uploads are a single PUT; there is nothing to resume.
+        return self._signed_url("PUT", path, settings.GCS_UPLOAD_URL_TTL_S)
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryStorage:
+    """Storage in a process-local dict; objects vanish with the process."""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[bytes, str | None]] = {}
+
+    async def upload_bytes(
+        self, path: str, data: bytes, *, content_type: str | None = None
+    ) -> None:
+        self.objects[path] = (bytes(data), content_type)
+
+    async def upload_fileobj(
+        self, path: str, fileobj: BinaryIO, *, content_type: str | None = None
+    ) -> None:
+        self.objects[path] = (fileobj.read(), content_type)
+
+    async def download_bytes(self, path: str) -> bytes:
+        try:
+            return self.objects[path][0]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    async def download_to_fileobj(self, path: str, fileobj: BinaryIO) -> int:
+        data = await self.download_bytes(path)
+        fileobj.write(data)
+        return len(data)
+
+    async def stat(self, path: str) -> ObjectInfo | None:
+        if path not in self.objects:
+            return None
+        data, content_type = self.objects[path]
+        return ObjectInfo(size=len(data), crc32c=crc32c_b64(data), content_type=content_type)
+
+    async def copy(self, source_path: str, dest_path: str) -> None:
+        if source_path not in self.objects:
+            raise FileNotFoundError(source_path)
+        self.objects[dest_path] = self.objects[source_path]
+
+    async def signed_get_url(
+        self,
+        path: str,
+        *,
+        expires_s: int = 3600,  # noqa: ARG002
+    ) -> str:
+        return f"memory://{quote(path)}"
+
+    async def signed_put_url(
+        self,
+        path: str,
+        *,
+        content_type: str,  # noqa: ARG002
+        expires_s: int = 900,  # noqa: ARG002
+    ) -> str:
+        return f"memory://{quote(path)}"
+
+    async def create_resumable_upload_url(
+        self,
+        path: str,
+        *,
+        content_type: str,  # noqa: ARG002
+        size: int | None = None,  # noqa: ARG002
+        origin: str | None = None,  # noqa: ARG002
+    ) -> str:
+        return f"memory://{quote(path)}"
+
+    async def close(self) -> None:
+        return None
+
+
+_storage: StorageBackend | None = None
+
+
+def _create_storage() -> StorageBackend:
+    backend = settings.STORAGE_BACKEND
+    if backend == "gcs":
+        return GcsStorage()
+    if backend == "local":
+        return LocalStorage(settings.LOCAL_STORAGE_ROOT, base_url=settings.LOCAL_STORAGE_BASE_URL)
+    if backend == "memory":
+        return MemoryStorage()
+    raise RuntimeError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = _create_storage()
+    return _storage
+
+
+def is_configured() -> bool:
+    """Whether the selected backend can issue URLs (GCS needs a bucket)."""
+    return settings.STORAGE_BACKEND != "gcs" or bool(settings.GCS_BUCKET)
+
+
+async def upload_bytes_if_changed(
+    backend: StorageBackend,
+    path: str,
+    data: bytes,
+    *,
+    content_type: str | None = None,
+) -> tuple[ObjectInfo, bool]:
+    """Upload ``data`` unless an identical object (same size and CRC32C) is stored.
+
+    Returns the object's info and whether an upload actually happened.
+    """
+    info = ObjectInfo(size=len(data), crc32c=crc32c_b64(data), content_type=content_type)
+    existing = await backend.stat(path)
+    if existing is not None and (existing.size, existing.crc32c) == (info.size, info.crc32c):
+        return existing, False
+    await backend.upload_bytes(path, data, content_type=content_type)
+    return info, True
+
+
+async def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+    _storage = None
+
+
+__all__ = [
+    "ObjectInfo",
+    "StorageBackend",
+    "GcsStorage",
+    "LocalStorage",
+    "MemoryStorage",
+    "get_storage",
+    "is_configured",
+    "close_storage",
+    "upload_bytes_if_changed",
+    "sign_local_url",
+    "verify_local_url",
+]
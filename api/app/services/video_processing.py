@@ -0,0 +1,169 @@
+"""Video post-processing with ffmpeg subprocesses.
+
+ffmpeg runs as a child process, so the worker's event loop stays free;
+``FFMPEG_CONCURRENCY`` bounds how many run at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.asset import FASTSTART_VARIANT, MOBILE_VARIANT, POSTER_VARIANT
+
+logger = get_logger(__name__)
+
+_semaphore: asyncio.Semaphore | None = None
+
+
+class FfmpegError(RuntimeError):
+    """Raised when ffmpeg exits non-zero or runs past ``FFMPEG_TIMEOUT_S``."""
+
+
+@dataclass(frozen=True, slots=True)
+class Rendition:
+    variant: str
+    ext: str
+    mime_type: str
+    data: bytes
+    width: int | None = None
+    height: int | None = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.FFMPEG_CONCURRENCY)
+    return _semaphore
+
+
+async def run_ffmpeg(*args: str) -> None:
+    async with _get_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            settings.FFMPEG_PATH,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-nostdin",
+            "-y",
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=settings.FFMPEG_TIMEOUT_S
+            )
+        except TimeoutError:
+            raise FfmpegError(f"ffmpeg timed out after {settings.FFMPEG_TIMEOUT_S}s") from None
+        finally:
+            # Timed out or cancelled: don't leave ffmpeg writing into a
+            # directory that is about to be removed.
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+    if process.returncode != 0:
+        detail = stderr.decode(errors="replace").strip().splitlines()[-3:]
+        raise FfmpegError(f"ffmpeg exited with {process.returncode}: {' '.join(detail)}")
+
+
+def faststart_args(source: Path, target: Path) -> list[str]:
+    # Stream copy: only the container is rewritten, with the moov atom first.
+    return ["-i", str(source), "-map", "0", "-c", "copy", "-movflags", "+faststart", str(target)]
+
+
+def poster_args(source: Path, target: Path) -> list[str]:
+    # The thumbnail filter picks a representative frame rather than a black first one.
+    return ["-i", str(source), "-vf", "thumbnail", "-frames:v", "1", "-q:v", "3", str(target)]
+
+
+def mobile_args(source: Path, target: Path) -> list[str]:
+    kbps = settings.VIDEO_MOBILE_BITRATE_KBPS
+    return [
+        "-i",
+        str(source),
+        "-vf",
+        f"scale=-2:'min({settings.VIDEO_MOBILE_MAX_HEIGHT},ih)'",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-profile:v",
+        "main",
+        "-b:v",
+        f"{kbps}k",
+        "-maxrate",
+        f"{kbps}k",
+        "-bufsize",
+        f"{2 * kbps}k",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "96k",
+        "-movflags",
+        "+faststart",
+        str(target),
+    ]
+
+
+async def _render(
+    variant: str, source: Path, target: Path, build: Callable[[Path, Path], list[str]]
+) -> Rendition | None:
+    try:
+        await run_ffmpeg(*build(source, target))
+        output = await asyncio.to_thread(target.read_bytes)
+        if target.suffix != ".jpg":
+            return Rendition(variant, "mp4", "video/mp4", output)
+        with Image.open(io.BytesIO(output)) as image:
+            width, height = image.size
+    except (FfmpegError, OSError) as exc:
+        logger.warning("video_rendition_failed", variant=variant, error=str(exc))
+        return None
+    return Rendition(variant, "jpg", "image/jpeg", output, width=width, height=height)
+
+
+async def postprocess_video(data: bytes) -> list[Rendition]:
+    """Produce the faststart remux, a poster JPEG and a mobile rendition of ``data``.
+
+    A rendition that fails is logged and left out; ``FfmpegError`` is raised
+    only when none succeed. The task group cancels (and kills) the remaining
+    ffmpeg runs on any other error before the working directory is removed.
+    """
+    with tempfile.TemporaryDirectory(prefix="video-") as workdir:
+        root = Path(workdir)
+        source = root / "source.mp4"
+        await asyncio.to_thread(source.write_bytes, data)
+
+        outputs = {
+            FASTSTART_VARIANT: (root / "faststart.mp4", faststart_args),
+            POSTER_VARIANT: (root / "poster.jpg", poster_args),
+            MOBILE_VARIANT: (root / "mobile.mp4", mobile_args),
+        }
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(_render(variant, source, target, build))
+                for variant, (target, build) in outputs.items()
+            ]
+    renditions = [task.result() for task in tasks if task.result() is not None]
+    if not renditions:
+        raise FfmpegError("every video rendition failed")
+    return renditions
+
+
+__all__ = [
+    "FfmpegError",
+    "Rendition",
+    "faststart_args",
+    "mobile_args",
+    "postprocess_video",
+    "poster_args",
+    "run_ffmpeg",
+]
@@ -0,0 +1,26 @@
+import base64
+import hashlib
+from typing import BinaryIO
+
+import google_crc32c
+
+
+def crc32c_b64(data: bytes) -> str:
+    """CRC32C in the base64 big-endian form GCS reports in object metadata."""
+    checksum = google_crc32c.value(data)
+    return base64.b64encode(checksum.to_bytes(4, "big")).decode()
+
+
+def file_crc32c_b64(fileobj: BinaryIO, *, chunk_size: int = 1 << 20) -> str:
+    """``crc32c_b64`` of a file's contents, read ``chunk_size`` bytes at a time."""
+    checksum = google_crc32c.Checksum()
+    while chunk := fileobj.read(chunk_size):
+        checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode()
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+__all__ = ["crc32c_b64", "file_crc32c_b64", "sha256_hex"]
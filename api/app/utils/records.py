@@ -0,0 +1,166 @@
+"""Incremental NDJSON/CSV record parsing over async byte streams."""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Literal
+
+RecordFormat = Literal["ndjson", "csv"]
+
+# Longest line or (multi-line, quoted) CSV record kept in memory. Anything
+# longer is reported as a bad row rather than buffered.
+MAX_RECORD_BYTES = 1 << 20
+
+_BOM = b"\xef\xbb\xbf"
+
+
+def _decode(line: bytes) -> str | ValueError:
+    try:
+        return line.removesuffix(b"\r").decode("utf-8")
+    except UnicodeDecodeError as exc:
+        return ValueError(f"Invalid UTF-8 at byte {exc.start}: {exc.reason}")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | ValueError]:
+    """Yield lines (without line endings) as the chunks arrive.
+
+    Each line is decoded on its own, so a line that is not valid UTF-8, or
+    longer than ``MAX_RECORD_BYTES``, yields a ``ValueError`` in its place and
+    the lines after it are still read.
+    """
+    pending = b""
+    first = True
+    overlong = False
+    async for chunk in chunks:
+        pending += chunk
+        if first and (len(pending) >= len(_BOM) or b"\n" in pending):
+            pending = pending.removeprefix(_BOM)
+            first = False
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if overlong:
+                # The tail of a line that was already reported.
+                overlong = False
+                continue
+            yield _decode(line)
+        if len(pending) > MAX_RECORD_BYTES:
+            if not overlong:
+                yield ValueError(f"Line is longer than {MAX_RECORD_BYTES} bytes")
+            overlong = True
+            pending = b""
+    if pending and not overlong:
+        yield _decode(pending.removeprefix(_BOM) if first else pending)
+
+
+def _ends_inside_quotes(record: str) -> bool:
+    """Whether ``record`` stops inside a quoted field (so it continues on the next line).
+
+    Only a quote that opens a field starts quoting; quotes in the middle of
+    an unquoted field (``He said "hi``) are literal, as the csv module reads
+    them.
+    """
+    in_quotes = False
+    field_start = True
+    index = 0
+    while index < len(record):
+        char = record[index]
+        if in_quotes:
+            if char == '"':
+                if record.startswith('"', index + 1):
+                    index += 1
+                else:
+                    in_quotes = False
+        elif char == '"' and field_start:
+            in_quotes = True
+        field_start = not in_quotes and char == ","
+        index += 1
+    return in_quotes
+
+
+async def _csv_records(
+    lines: AsyncIterator[str | ValueError],
+) -> AsyncIterator[list[str] | ValueError]:
+    # A quoted field may contain newlines, so keep joining physical lines until
+    # the record no longer ends inside quotes.
+    buffer: list[str] = []
+    size = 0
+    async for line in lines:
+        if isinstance(line, ValueError):
+            # A bad line breaks the record it belongs to.
+            buffer.clear()
+            size = 0
+            yield line
+            continue
+        buffer.append(line)
+        size += len(line) + 1
+        record = "\n".join(buffer)
+        if _ends_inside_quotes(record):
+            if size > MAX_RECORD_BYTES:
+                buffer.clear()
+                size = 0
+                yield ValueError(f"Unterminated quoted field (over {MAX_RECORD_BYTES} bytes)")
+            continue
+        buffer.clear()
+        size = 0
+        if not record:
+            continue
+        try:
+            yield next(csv.reader([record], strict=True))
+        except csv.Error as exc:
+            yield ValueError(f"Invalid CSV: {exc}")
+    if buffer:
+        yield ValueError("Unterminated quoted field at end of input")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], fmt: RecordFormat
+) -> AsyncIterator[tuple[int, dict | ValueError]]:
+    """Yield ``(row_number, record)`` pairs; unparseable rows yield the error instead.
+
+    CSV input needs a header row; row numbers count data rows from 1, and a
+    bad header is reported as row 0 and ends the input. Parse errors never
+    propagate, so earlier rows are unaffected by a bad one.
+    """
+    lines = iter_lines(chunks)
+    row = 0
+    if fmt == "ndjson":
+        async for line in lines:
+            if isinstance(line, str) and not line.strip():
+                continue
+            row += 1
+            if isinstance(line, ValueError):
+                yield row, line
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row, ValueError(f"Invalid JSON: {exc}")
+                continue
+            if not isinstance(record, dict):
+                yield row, ValueError("Each line must be a JSON object")
+                continue
+            yield row, record
+        return
+
+    header: list[str] | None = None
+    async for values in _csv_records(lines):
+        if header is None:
+            if isinstance(values, ValueError):
+                yield 0, ValueError(f"Invalid header row: {values}")
+                return
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if isinstance(values, ValueError):
+            yield row, values
+            continue
+        if len(values) != len(header):
+            yield row, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        # Empty CSV cells mean "not provided".
+        yield row, {name: value for name, value in zip(header, values, strict=True) if value}
+
+
+__all__ = ["MAX_RECORD_BYTES", "RecordFormat", "iter_lines", "iter_records"]
@@ -23,9 +23,14 @@ def mime_to_ext(mime_type: str) -> str:
     return "bin"
 
 
-def gcs_object_key(report_id: str, kind: AssetKind | str, ext: str) -> str:
+def gcs_object_key(
+    report_id: str, kind: AssetKind | str, ext: str, variant: str | None = None
+) -> str:
+    """Object key for a report asset; derived variants sit beside the original."""
     ext = ext.lstrip(".").lower()
     kind_value = kind.value if isinstance(kind, AssetKind) else str(kind)
+    if variant:
+        kind_value = f"{kind_value}.{variant}"
     return f"reports/{report_id}/{kind_value}.{ext}"
 
 
@@ -1,26 +1,49 @@
-"""Worker runner for processing background jobs from Redis queue."""
+"""Worker runner for processing background jobs.
+
+Jobs are dispatched either from a Redis list (the default) or, with
+``QUEUE_BACKEND=postgres``, straight from the ``jobs`` table. The Postgres
+consumer LISTENs on a dedicated connection outside the worker's pool; behind
+PgBouncer (``DB_PGBOUNCER``) LISTEN does not survive transaction pooling, so
+it only polls, every ``QUEUE_POLL_INTERVAL_S``.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
 import os
 import signal
 from collections.abc import Awaitable, Callable
 
+import asyncpg
 from redis.asyncio import Redis
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.enums import JobStatus, JobType
 from app.core.logging import configure_logging, get_logger
-from app.db.session import create_engine_and_sessionmaker
+from app.db.session import create_engine_and_sessionmaker, sanitize_asyncpg_url
 from app.jobs.extract_moments import run as run_extract
 from app.jobs.generate_video import run as run_video
 from app.jobs.gimpify_image import run as run_gimpify
+from app.jobs.utils import SessionFactory
 from app.models.job import Job
-
-JobHandler = Callable[[AsyncSession, str], Awaitable[None]]
+from app.services import genai_extractor
+from app.services.image_processing import close_process_pool
+from app.services.job_service import (
+    JOBS_CHANNEL,
+    claim_job,
+    claim_next_job,
+    extend_lease,
+    queue_depth,
+    requeue_expired_jobs,
+)
+from app.services.queue import enqueue_jobs
+from app.services.storage import close_storage
+
+JobHandler = Callable[[SessionFactory, str], Awaitable[None]]
 
 _JOB_HANDLERS: dict[JobType, JobHandler] = {
     JobType.EXTRACT_MOMENTS: run_extract,
@@ -30,7 +53,7 @@ _JOB_HANDLERS: dict[JobType, JobHandler] = {
 
 logger = get_logger(__name__)
 
-_ENGINE, SessionLocal = create_engine_and_sessionmaker(settings.DATABASE_URL)
+_ENGINE, SessionLocal = create_engine_and_sessionmaker(settings.DATABASE_URL, profile="worker")
 
 
 class GracefulShutdown:
@@ -38,7 +61,7 @@ class GracefulShutdown:
 
     def __init__(self) -> None:
         self._shutdown_requested = False
-        self._current_job_id: str | None = None
+        self._current_job_ids: set[str] = set()
 
     @property
     def shutdown_requested(self) -> bool:
@@ -48,22 +71,71 @@ class GracefulShutdown:
         self._shutdown_requested = True
         logger.info(
             "shutdown_requested",
-            current_job_id=self._current_job_id,
-            message="Will exit after current job completes" if self._current_job_id else "Exiting",
+            current_job_ids=sorted(self._current_job_ids),
+            message="Will exit after current jobs complete" if self._current_job_ids else "Exiting",
         )
 
-    def set_current_job(self, job_id: str | None) -> None:
-        self._current_job_id = job_id
+    def job_started(self, job_id: str | None) -> None:
+        if job_id:
+            self._current_job_ids.add(job_id)
+
+    def job_finished(self, job_id: str | None) -> None:
+        self._current_job_ids.discard(job_id)
+
+
+class JobSlots:
+    """Run up to ``WORKER_CONCURRENCY`` jobs at once in this worker.
+
+    Consumers ``acquire`` a slot before taking a message, so with the default
+    of one the worker still finishes each job before fetching the next.
+    """
+
+    def __init__(self, shutdown: GracefulShutdown, size: int) -> None:
+        self._shutdown = shutdown
+        self._semaphore = asyncio.Semaphore(size)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def acquire(self) -> None:
+        await self._semaphore.acquire()
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    def start(self, job_id: str | None, work: Awaitable[None]) -> None:
+        """Run ``work`` in the background, releasing the acquired slot when done."""
+
+        async def run() -> None:
+            self._shutdown.job_started(job_id)
+            try:
+                await work
+            finally:
+                self._shutdown.job_finished(job_id)
+                self.release()
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def wait(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
 
 async def _load_job(db: AsyncSession, job_id: str) -> Job | None:
     return await db.get(Job, job_id)
 
 
-async def _mark_failed(db: AsyncSession, job: Job, error: str) -> None:
-    job.status = JobStatus.FAILED
-    job.last_error = error
-    await db.flush()
+async def _mark_failed(job_id: str, error: str, *, keep_prediction: bool = False) -> None:
+    async with SessionLocal() as db:
+        job = await _load_job(db, job_id)
+        if job is None:
+            return
+        job.status = JobStatus.FAILED
+        job.last_error = error
+        # As in ``mark_job_failed``: only a timeout leaves a prediction to resume.
+        if not keep_prediction:
+            job.idempotency_key = None
+        await db.commit()
 
 
 class JobProcessingError(Exception):
@@ -96,41 +168,62 @@ async def handle_message(payload: dict) -> None:
         log.warning("no_handler_for_job_type")
         return
 
+    # Claim the job in its own short transaction; handlers open further
+    # transactions around their DB work rather than holding this one. The
+    # claim is a single conditional UPDATE, so duplicate deliveries of a job
+    # that is already running (or done) are dropped here.
     async with SessionLocal() as db:
-        job = await _load_job(db, job_id)
+        job = await claim_job(db, job_id, lease_s=settings.JOB_LEASE_S)
         if job is None:
-            log.warning("job_not_found")
+            log.info("job_not_claimed", skipping=True)
             return
+        await db.commit()
+        log.info("job_started", attempt=job.attempts)
 
-        if job.status == JobStatus.SUCCEEDED:
-            log.info("job_already_succeeded", skipping=True)
-            return
+    await _execute(handler, job_id, log)
 
-        log.info("job_started", attempt=job.attempts + 1)
 
-        try:
-            await handler(db, job_id)
-            await db.commit()
-            log.info("job_completed", status=job.status.value)
+async def _execute(handler: JobHandler, job_id: str, log) -> None:
+    """Run a claimed job's handler, recording any unhandled failure."""
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        await handler(SessionLocal, job_id)
+        log.info("job_completed")
 
-        except TimeoutError as exc:
-            log.warning("job_timeout", error=str(exc))
-            await _mark_failed(db, job, f"Timeout: {exc}")
-            await db.commit()
+    except TimeoutError as exc:
+        log.warning("job_timeout", error=str(exc))
+        await _mark_failed(job_id, f"Timeout: {exc}", keep_prediction=True)
+
+    except ConnectionError as exc:
+        log.error("job_connection_error", error=str(exc))
+        await _mark_failed(job_id, f"Connection error: {exc}")
+
+    except Exception as exc:
+        log.exception("job_failed", error=str(exc))
+        await _mark_failed(job_id, str(exc))
+
+    finally:
+        heartbeat.cancel()
 
-        except ConnectionError as exc:
-            log.error("job_connection_error", error=str(exc))
-            await _mark_failed(db, job, f"Connection error: {exc}")
-            await db.commit()
 
+async def _heartbeat(job_id: str) -> None:
+    """Keep extending the job's lease while its handler runs."""
+    interval = settings.JOB_LEASE_S / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                still_running = await extend_lease(db, job_id, lease_s=settings.JOB_LEASE_S)
+                await db.commit()
         except Exception as exc:
-            log.exception("job_failed", error=str(exc))
-            await _mark_failed(db, job, str(exc))
-            await db.commit()
+            logger.warning("job_heartbeat_failed", job_id=job_id, error=str(exc))
+            continue
+        if not still_running:
+            return
 
 
 async def run_worker(queue: str = "jobs") -> None:
-    """Main worker loop that processes jobs from the Redis queue."""
+    """Main worker loop that processes jobs from the configured queue backend."""
     shutdown = GracefulShutdown()
 
     loop = asyncio.get_running_loop()
@@ -146,14 +239,49 @@ async def run_worker(queue: str = "jobs") -> None:
             # Windows doesn't support add_signal_handler
             signal.signal(sig, lambda _s, _f: signal_handler())
 
-    redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
-    logger.info("worker_started", queue=queue, pid=os.getpid())
+    logger.info("worker_started", backend=settings.QUEUE_BACKEND, queue=queue, pid=os.getpid())
+    await _warm_up()
 
+    try:
+        if settings.QUEUE_BACKEND == "postgres":
+            await _consume_postgres(shutdown)
+        else:
+            await _consume_redis(queue, shutdown)
+    finally:
+        await close_storage()
+        close_process_pool()
+        await _ENGINE.dispose()
+        logger.info("worker_stopped")
+
+
+async def _warm_up() -> None:
+    """Connect to Gemini up front so the first extraction job doesn't pay for it."""
+    try:
+        await asyncio.wait_for(
+            asyncio.to_thread(genai_extractor.warm_up), timeout=settings.GEMINI_REQUEST_TIMEOUT_S
+        )
+    except Exception as exc:
+        # Jobs still create the client lazily, so a failed warm-up is not fatal.
+        logger.warning("gemini_warm_up_failed", error=str(exc))
+
+
+async def _consume_redis(queue: str, shutdown: GracefulShutdown) -> None:
+    redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    slots = JobSlots(shutdown, settings.WORKER_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    next_sweep = loop.time()
     try:
         while not shutdown.shutdown_requested:
+            # Jobs whose worker died mid-run are only in the database now; put
+            # them back on the list every QUEUE_POLL_INTERVAL_S.
+            if loop.time() >= next_sweep:
+                await _sweep_expired_leases()
+                next_sweep = loop.time() + settings.QUEUE_POLL_INTERVAL_S
+            await slots.acquire()
             # Use timeout so we can check shutdown flag periodically
             result = await redis.blpop(queue, timeout=1)
             if result is None:
+                slots.release()
                 continue
 
             _, raw = result
@@ -161,20 +289,104 @@ async def run_worker(queue: str = "jobs") -> None:
                 payload = json.loads(raw)
             except json.JSONDecodeError:
                 logger.warning("invalid_json_message", raw=raw[:100])
+                slots.release()
                 continue
 
-            job_id = payload.get("job_id")
-            shutdown.set_current_job(job_id)
-
-            try:
-                await handle_message(payload)
-            finally:
-                shutdown.set_current_job(None)
+            slots.start(payload.get("job_id"), handle_message(payload))
 
     finally:
+        await slots.wait()
         await redis.aclose()
-        await _ENGINE.dispose()
-        logger.info("worker_stopped")
+
+
+async def _sweep_expired_leases() -> None:
+    try:
+        async with SessionLocal() as db:
+            requeued = await requeue_expired_jobs(db)
+            await db.commit()
+        await _push_requeued(requeued)
+    except Exception as exc:
+        # Recovery is best effort; it must not stop the worker consuming.
+        logger.warning("lease_sweep_failed", error=str(exc))
+
+
+async def _open_listener(on_notify: Callable[..., None]) -> asyncpg.Connection | None:
+    """LISTEN for new jobs on a connection of its own, or ``None`` to just poll.
+
+    The connection is opened outside the engine's pool so it never takes one
+    of the few pooled connections the job handlers need.
+    """
+    if settings.DB_PGBOUNCER:
+        return None
+    db_url, connect_args = sanitize_asyncpg_url(settings.DATABASE_URL)
+    dsn = make_url(db_url).set(drivername="postgresql").render_as_string(hide_password=False)
+    try:
+        conn = await asyncpg.connect(dsn, **connect_args)
+        await conn.add_listener(JOBS_CHANNEL, on_notify)
+    except (OSError, asyncpg.PostgresError) as exc:
+        logger.warning("queue_listen_failed", error=str(exc))
+        return None
+    return conn
+
+
+async def _consume_postgres(shutdown: GracefulShutdown) -> None:
+    """Poll the jobs table, waking early on NOTIFY from ``ensure_job``."""
+    wakeup = asyncio.Event()
+    slots = JobSlots(shutdown, settings.WORKER_CONCURRENCY)
+
+    def on_notify(*_args) -> None:
+        wakeup.set()
+
+    listener = await _open_listener(on_notify)
+    try:
+        while not shutdown.shutdown_requested:
+            await slots.acquire()
+            # Clear before claiming so a NOTIFY that lands mid-claim is not lost.
+            wakeup.clear()
+            async with SessionLocal() as db:
+                job = await claim_next_job(db, lease_s=settings.JOB_LEASE_S)
+                await db.commit()
+
+            if job is None:
+                slots.release()
+                await _report_idle_queue()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(wakeup.wait(), timeout=settings.QUEUE_POLL_INTERVAL_S)
+                continue
+
+            log = logger.bind(job_id=job.id, job_type=job.type.value)
+            handler = _JOB_HANDLERS.get(job.type)
+            if handler is None:
+                log.warning("no_handler_for_job_type")
+                await _mark_failed(job.id, "No handler for job type")
+                slots.release()
+                continue
+
+            log.info("job_started", attempt=job.attempts)
+            slots.start(job.id, _execute(handler, job.id, log))
+    finally:
+        await slots.wait()
+        if listener is not None:
+            await listener.close()
+
+
+async def _report_idle_queue() -> None:
+    """Recover jobs from dead workers and log the exact queue depth."""
+    async with SessionLocal() as db:
+        requeued = await requeue_expired_jobs(db)
+        depth = await queue_depth(db)
+        await db.commit()
+    await _push_requeued(requeued)
+    logger.debug("queue_depth", depth=depth)
+
+
+async def _push_requeued(requeued: list[tuple[str, JobType]]) -> None:
+    """Log requeued jobs and, with the Redis queue, push them again."""
+    if not requeued:
+        return
+    logger.warning("jobs_lease_expired", requeued=len(requeued))
+    # A no-op for the Postgres queue, where the jobs table is the queue.
+    await enqueue_jobs([(job_id, job_type.value) for job_id, job_type in requeued])
 
 
 def main() -> None:
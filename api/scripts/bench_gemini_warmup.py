@@ -0,0 +1,69 @@
+"""Measure first-extraction latency in a fresh worker, with and without warm-up.
+
+Each run starts a new interpreter, so client creation and the first TLS
+handshake are included, as they are for the first job after a deploy.
+Needs real Gemini credentials (GEMINI_API_KEY or GOOGLE_API_KEY), and
+DATABASE_URL set (any value; the settings require it, no connection is made).
+Run it as a module from ``api/`` so ``app`` is importable:
+
+    cd api && uv run python -m scripts.bench_gemini_warmup --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+
+REPORT = (
+    "Lost 6-4 to the Rivals. Dave spent the second half arguing with the ref.\n"
+    "Steve's volley from halfway was the highlight of the season."
+)
+
+
+def _child(mode: str) -> None:
+    from app.services import genai_extractor
+
+    if mode == "warm":
+        genai_extractor.warm_up()
+    started = time.perf_counter()
+    genai_extractor.extract_moments(REPORT)
+    print(round((time.perf_counter() - started) * 1000))
+
+
+def _run(mode: str) -> int:
+    output = subprocess.run(
+        [sys.executable, "-m", "scripts.bench_gemini_warmup", "--child", mode],
+        cwd=API_ROOT,
+        check=True,
+        # stderr passes through so a failing child shows its traceback.
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return int(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child)
+        return
+
+    for mode in ("cold", "warm"):
+        timings = [_run(mode) for _ in range(args.runs)]
+        print(
+            f"{mode:>4}: first extraction median {statistics.median(timings)} ms "
+            f"(min {min(timings)}, max {max(timings)}, runs {args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,12 @@ async def async_engine(test_db_url: str):
     await engine.dispose()
 
 
+@pytest.fixture
+def session_factory(async_engine):
+    """Session factory for code that opens its own transactions (job handlers)."""
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
 @pytest.fixture
 async def db(async_engine):
     """Create a database session for each test.
@@ -0,0 +1,52 @@
+"""Tests for choosing which asset variant to serve."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.enums import AssetKind, AssetStatus
+from app.services.asset_service import pick_asset
+
+pytestmark = pytest.mark.asyncio
+
+
+def _asset(variant, *, width=None, mime_type="image/jpeg", kind=AssetKind.GIMPIFIED_IMAGE):
+    return SimpleNamespace(
+        kind=kind, variant=variant, width=width, mime_type=mime_type, status=AssetStatus.READY
+    )
+
+
+ORIGINAL = _asset("original")
+ASSETS = [
+    ORIGINAL,
+    _asset("thumb_320_webp", width=320, mime_type="image/webp"),
+    _asset("thumb_640_webp", width=640, mime_type="image/webp"),
+    _asset("thumb_320_avif", width=320, mime_type="image/avif"),
+    _asset("thumb_640_avif", width=640, mime_type="image/avif"),
+]
+
+
+async def test_returns_the_original_without_a_width():
+    assert pick_asset(ASSETS, AssetKind.GIMPIFIED_IMAGE) is ORIGINAL
+
+
+async def test_picks_smallest_thumbnail_wide_enough():
+    asset = pick_asset(ASSETS, AssetKind.GIMPIFIED_IMAGE, width=400)
+
+    assert asset.variant == "thumb_640_webp"
+
+
+async def test_prefers_the_clients_first_format():
+    asset = pick_asset(
+        ASSETS, AssetKind.GIMPIFIED_IMAGE, width=300, mime_types=["image/avif", "image/webp"]
+    )
+
+    assert asset.variant == "thumb_320_avif"
+
+
+async def test_falls_back_to_widest_thumbnail_then_original():
+    assert pick_asset(ASSETS, AssetKind.GIMPIFIED_IMAGE, width=2000).variant == "thumb_640_webp"
+    assert (
+        pick_asset(ASSETS, AssetKind.GIMPIFIED_IMAGE, width=300, mime_types=["image/png"])
+        is ORIGINAL
+    )
@@ -0,0 +1,50 @@
+"""Tests for ETag / conditional GET handling."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import get_read_db
+from app.main import app
+from app.services import report_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_db():
+        yield AsyncMock()
+
+    async def fake_version(db, report_id, author_id):
+        return ("2025-01-01T00:00:00+00:00", None, 0, None, 0)
+
+    monkeypatch.setattr(report_service, "report_version", fake_version)
+    monkeypatch.setattr(report_service, "list_jobs", AsyncMock(return_value=[]))
+    app.dependency_overrides[get_read_db] = fake_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+async def test_list_jobs_returns_etag_and_cache_control(client):
+    response = client.get("/v1/reports/r1/jobs", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == "private, no-cache"
+
+
+async def test_list_jobs_returns_304_when_etag_matches(client):
+    first = client.get("/v1/reports/r1/jobs", headers={"X-Author-Id": "author-1"})
+    etag = first.headers["etag"]
+
+    response = client.get(
+        "/v1/reports/r1/jobs",
+        headers={"X-Author-Id": "author-1", "If-None-Match": f'"other", {etag}'},
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    report_service.list_jobs.assert_awaited_once()
@@ -0,0 +1,95 @@
+"""Tests for the response compression middleware."""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = b'{"content": "' + b"gimp " * 1000 + b'"}'
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return Response(PAYLOAD, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/image")
+    async def image():
+        return Response(PAYLOAD, media_type="image/jpeg")
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for index in range(3):
+                yield f'{{"row": {index}}}\n'.encode()
+
+        return StreamingResponse(rows(), media_type="application/json")
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("plain " * 500)
+
+    return TestClient(app)
+
+
+def test_negotiate_prefers_server_order_and_respects_q():
+    assert negotiate_encoding("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip, br;q=0", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("identity", ["gzip"]) is None
+    assert negotiate_encoding("*", ["gzip"]) == "gzip"
+
+
+def test_large_json_is_gzipped(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(PAYLOAD)
+    assert response.content == PAYLOAD
+
+
+def test_large_json_is_brotli_compressed(client):
+    pytest.importorskip("brotli")
+    response = client.get("/large", headers={"Accept-Encoding": "br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == PAYLOAD
+
+
+def test_zstd_is_preferred_when_accepted(client):
+    pytest.importorskip("zstandard")
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br, zstd"})
+
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.content == PAYLOAD
+
+
+def test_small_and_non_allow_listed_bodies_are_untouched(client):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    text = client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in image.headers
+    assert "content-encoding" not in text.headers
+
+
+def test_streamed_json_is_compressed_incrementally(client):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw) == b'{"row": 0}\n{"row": 1}\n{"row": 2}\n'
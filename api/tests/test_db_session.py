@@ -0,0 +1,34 @@
+"""Tests for engine and pool configuration."""
+
+from app.core.config import settings
+from app.db.session import create_engine_and_sessionmaker, pool_stats
+
+
+def test_worker_profile_uses_worker_pool_size(monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_DB_POOL_SIZE", 3)
+    engine, _ = create_engine_and_sessionmaker(
+        "postgresql+asyncpg://u:p@localhost/db", profile="worker"
+    )
+
+    assert pool_stats(engine)["size"] == 3
+
+
+def test_pgbouncer_mode_disables_prepared_statement_caches(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    engine, _ = create_engine_and_sessionmaker("postgresql+asyncpg://u:p@localhost/db")
+
+    assert engine.url.query["prepared_statement_cache_size"] == "0"
+
+
+def test_prepared_statement_cache_size_can_be_set_separately(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    monkeypatch.setattr(settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", 50)
+    engine, _ = create_engine_and_sessionmaker("postgresql+asyncpg://u:p@localhost/db")
+
+    assert engine.url.query["prepared_statement_cache_size"] == "50"
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    monkeypatch.setattr(settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", None)
+    engine, _ = create_engine_and_sessionmaker("postgresql+asyncpg://u:p@localhost/db")
+
+    assert "prepared_statement_cache_size" not in engine.url.query
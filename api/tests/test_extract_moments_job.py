@@ -10,7 +10,7 @@ from app.services import report_service
 pytestmark = pytest.mark.asyncio
 
 
-async def test_extract_moments_job_updates_report(db, monkeypatch):
+async def test_extract_moments_job_updates_report(db, session_factory, monkeypatch):
     report = await report_service.create_report(
         db,
         author_id="author-1",
@@ -21,19 +21,57 @@ async def test_extract_moments_job_updates_report(db, monkeypatch):
         id="job-1",
         report_id=report.id,
         type=JobType.EXTRACT_MOMENTS,
-        status=JobStatus.QUEUED,
-        attempts=0,
+        status=JobStatus.RUNNING,
+        attempts=1,
     )
     db.add(job)
-    await db.flush()
+    await db.commit()
 
     def fake_extract(_: str) -> ExtractMomentsOut:
         return ExtractMomentsOut(gimp_name="MVP", champagne_moment="Last-second goal")
 
     monkeypatch.setattr(job_module, "extract_moments", fake_extract)
 
-    await job_module.run(db, job.id)
+    await job_module.run(session_factory, job.id)
 
+    await db.refresh(job)
+    await db.refresh(report)
     assert job.status == JobStatus.SUCCEEDED
     assert report.gimp_name == "MVP"
     assert report.champagne_moment == "Last-second goal"
+
+
+async def test_extract_moments_job_skips_gemini_for_templated_report(
+    db, session_factory, monkeypatch
+):
+    report = await report_service.create_report(
+        db,
+        author_id="author-1",
+        data=ReportCreate(
+            date="2025-01-01",
+            opponent="Rivals",
+            content="Gimp of the day: Dave\nChampagne moment: the last-minute winner",
+        ),
+    )
+    job = Job(
+        id="job-2",
+        report_id=report.id,
+        type=JobType.EXTRACT_MOMENTS,
+        status=JobStatus.RUNNING,
+        attempts=1,
+    )
+    db.add(job)
+    await db.commit()
+
+    def fail_extract(_: str) -> ExtractMomentsOut:
+        raise AssertionError("Gemini should not be called")
+
+    monkeypatch.setattr(job_module, "extract_moments", fail_extract)
+
+    await job_module.run(session_factory, job.id)
+
+    await db.refresh(job)
+    await db.refresh(report)
+    assert job.status == JobStatus.SUCCEEDED
+    assert report.gimp_name == "Dave"
+    assert report.champagne_moment == "the last-minute winner"
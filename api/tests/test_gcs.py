@@ -0,0 +1,145 @@
+"""Tests for the async GCS client."""
+
+import io
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import gcs
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    """Point the GCS service at a local emulator."""
+    monkeypatch.setattr(settings, "GCS_BUCKET", "test-bucket")
+    monkeypatch.setattr(settings, "GCS_EMULATOR_HOST", "http://localhost:4443/")
+    monkeypatch.setattr(gcs, "_http", None)
+    monkeypatch.setattr(gcs, "_semaphore", None)
+
+
+@pytest.fixture
+def recorded_requests(emulator, monkeypatch):
+    """Route GCS HTTP traffic to an in-process mock and record the requests."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.params.get("uploadType") == "resumable":
+            return httpx.Response(200, headers={"Location": "http://localhost:4443/session/1"})
+        content_range = request.headers.get("Content-Range", "")
+        if content_range.endswith("/*"):
+            end = content_range.removeprefix("bytes ").partition("/")[0].partition("-")[2]
+            return httpx.Response(308, headers={"Range": f"bytes=0-{end}"})
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(gcs, "_http", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+async def test_signed_get_url_uses_emulator_host(emulator):
+    url = await gcs.signed_get_url("reports/r1/gimp_original.jpg")
+    assert url == "http://localhost:4443/test-bucket/reports/r1/gimp_original.jpg"
+
+
+async def test_signed_put_url_quotes_object_path(emulator):
+    url = await gcs.signed_put_url("reports/r 1/video.mp4", content_type="video/mp4")
+    assert url == "http://localhost:4443/test-bucket/reports/r%201/video.mp4"
+
+
+async def test_signed_url_requires_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "GCS_BUCKET", None)
+    monkeypatch.setattr(settings, "GCS_EMULATOR_HOST", None)
+    with pytest.raises(RuntimeError):
+        await gcs.signed_put_url("reports/r1/video.mp4", content_type="video/mp4")
+
+
+async def test_signed_url_v4_query_parameters(monkeypatch):
+    monkeypatch.setattr(settings, "GCS_BUCKET", "test-bucket")
+    monkeypatch.setattr(settings, "GCS_EMULATOR_HOST", None)
+
+    async def fake_signer():
+        async def sign(payload: bytes) -> bytes:
+            assert payload.startswith(b"GOOG4-RSA-SHA256\n")
+            return b"\x01\x02"
+
+        return "signer@example.iam.gserviceaccount.com", sign
+
+    monkeypatch.setattr(gcs, "_get_signer", fake_signer)
+
+    url = await gcs.signed_put_url(
+        "reports/r1/gimp_original.jpg", content_type="image/jpeg", expires_s=600
+    )
+
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    assert parts.netloc == "storage.googleapis.com"
+    assert parts.path == "/test-bucket/reports/r1/gimp_original.jpg"
+    assert query["X-Goog-Algorithm"] == ["GOOG4-RSA-SHA256"]
+    assert query["X-Goog-Expires"] == ["600"]
+    assert query["X-Goog-SignedHeaders"] == ["content-type;host"]
+    assert query["X-Goog-Signature"] == ["0102"]
+    assert query["X-Goog-Credential"][0].startswith("signer@example.iam.gserviceaccount.com/")
+
+
+async def test_upload_bytes_uses_media_upload(recorded_requests):
+    await gcs.upload_bytes("reports/r1/video.mp4", b"data", content_type="video/mp4")
+
+    (request,) = recorded_requests
+    assert request.method == "POST"
+    assert request.url.path == "/upload/storage/v1/b/test-bucket/o"
+    assert request.url.params["uploadType"] == "media"
+    assert request.url.params["name"] == "reports/r1/video.mp4"
+    assert request.headers["Content-Type"] == "video/mp4"
+    assert request.content == b"data"
+
+
+async def test_upload_fileobj_streams_in_chunks(recorded_requests, monkeypatch):
+    chunk_size = 256 * 1024
+    monkeypatch.setattr(settings, "GCS_UPLOAD_CHUNK_SIZE", chunk_size)
+    data = b"x" * (chunk_size * 2 + 10)
+
+    await gcs.upload_fileobj("reports/r1/video.mp4", io.BytesIO(data), content_type="video/mp4")
+
+    session, *chunks = recorded_requests
+    assert session.url.params["uploadType"] == "resumable"
+    assert [request.headers["Content-Range"] for request in chunks] == [
+        f"bytes 0-{chunk_size - 1}/*",
+        f"bytes {chunk_size}-{chunk_size * 2 - 1}/*",
+        f"bytes {chunk_size * 2}-{len(data) - 1}/{len(data)}",
+    ]
+    assert b"".join(request.content for request in chunks) == data
+
+
+async def test_upload_fileobj_resumes_from_persisted_range(emulator, monkeypatch):
+    chunk_size = 512 * 1024
+    monkeypatch.setattr(settings, "GCS_UPLOAD_CHUNK_SIZE", chunk_size)
+    data = bytes(range(256)) * (chunk_size * 2 // 256) + b"tail"
+    ranges: list[str] = []
+    received = bytearray()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("uploadType") == "resumable":
+            return httpx.Response(200, headers={"Location": "http://localhost:4443/session/1"})
+        ranges.append(request.headers["Content-Range"])
+        # The first chunk is only half persisted.
+        content = request.content if len(ranges) > 1 else request.content[: chunk_size // 2]
+        received.extend(content)
+        if request.headers["Content-Range"].endswith("/*"):
+            return httpx.Response(308, headers={"Range": f"bytes=0-{len(received) - 1}"})
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(gcs, "_http", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    await gcs.upload_fileobj("reports/r1/video.mp4", io.BytesIO(data), content_type="video/mp4")
+
+    half = chunk_size // 2
+    assert ranges == [
+        f"bytes 0-{chunk_size - 1}/*",
+        f"bytes {half}-{half + chunk_size - 1}/*",
+        f"bytes {half + chunk_size}-{len(data) - 1}/{len(data)}",
+    ]
+    assert bytes(received) == data
@@ -0,0 +1,168 @@
+"""Tests for batched Gemini moment extraction."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.extract_moments import ExtractMomentsOut
+from app.services import genai_extractor
+from app.services.genai_extractor import ExtractionBatcher, trim_report
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_extract_moments_batch_maps_results_by_index(monkeypatch):
+    prompts = []
+
+    def fake_generate_json(prompt, config, **log_fields):
+        prompts.append(prompt)
+        return '{"results": [{"index": 1, "gimp_name": "Dave"}, {"index": 0, "gimp_name": "Al"}]}'
+
+    monkeypatch.setattr(genai_extractor, "_generate_json", fake_generate_json)
+
+    results = genai_extractor.extract_moments_batch(["first", "second", "third"])
+
+    assert "REPORT 0:\nfirst" in prompts[0]
+    assert "REPORT 2:\nthird" in prompts[0]
+    assert results[0] == ExtractMomentsOut(gimp_name="Al")
+    assert results[1] == ExtractMomentsOut(gimp_name="Dave")
+    assert isinstance(results[2], ValueError)
+
+
+async def test_batcher_sends_one_request_when_full(monkeypatch):
+    calls = []
+
+    def fake_batch(texts):
+        calls.append(texts)
+        return [ExtractMomentsOut(gimp_name=text) for text in texts[:-1]] + [ValueError("missed")]
+
+    monkeypatch.setattr(genai_extractor, "extract_moments_batch", fake_batch)
+    batcher = ExtractionBatcher(max_size=3, window_s=60)
+
+    results = await asyncio.gather(
+        *(batcher.submit(text) for text in ("a", "b", "c")), return_exceptions=True
+    )
+
+    assert calls == [["a", "b", "c"]]
+    assert [result.gimp_name for result in results[:2]] == ["a", "b"]
+    assert isinstance(results[2], ValueError)
+
+
+async def test_batcher_flushes_partial_batch_after_window(monkeypatch):
+    monkeypatch.setattr(
+        genai_extractor, "extract_moments", lambda text: ExtractMomentsOut(gimp_name=text)
+    )
+    batcher = ExtractionBatcher(max_size=10, window_s=0.01)
+
+    result = await asyncio.wait_for(batcher.submit("solo"), timeout=1)
+
+    assert result.gimp_name == "solo"
+
+
+async def test_batcher_fails_every_report_when_request_fails(monkeypatch):
+    def fail(texts):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(genai_extractor, "extract_moments_batch", fail)
+    batcher = ExtractionBatcher(max_size=2, window_s=60)
+
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert [str(result) for result in results] == ["quota exceeded", "quota exceeded"]
+
+
+async def test_trim_report_leaves_short_reports_alone():
+    assert trim_report("Short report.", 100) == "Short report."
+
+
+async def test_trim_report_keeps_key_sentences_within_budget():
+    filler = " ".join(f"Filler sentence number {index}." for index in range(200))
+    report = f"Kick-off at eight. {filler} Gimp of the day was Dave. {filler} We lost."
+
+    trimmed = trim_report(report, 300)
+
+    assert len(trimmed) <= 300
+    assert trimmed.startswith("Kick-off at eight.")
+    assert "Gimp of the day was Dave." in trimmed
+    assert "[...]" in trimmed
+
+
+async def test_trim_report_hard_cuts_a_single_huge_sentence():
+    assert trim_report("x" * 500, 100) == "x" * 100
+
+
+async def test_extract_moments_reuses_prebuilt_config(monkeypatch):
+    configs = []
+
+    def fake_generate_json(prompt, config, **log_fields):
+        configs.append(config)
+        return "{}"
+
+    monkeypatch.setattr(genai_extractor, "_generate_json", fake_generate_json)
+
+    genai_extractor.extract_moments("one")
+    genai_extractor.extract_moments("two")
+
+    assert configs[0] is configs[1]
+    assert configs[0]["response_json_schema"] == ExtractMomentsOut.model_json_schema()
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    logged = []
+    models = SimpleNamespace(generate_content=None)
+    monkeypatch.setattr(genai_extractor, "_get_client", lambda: SimpleNamespace(models=models))
+    monkeypatch.setattr(
+        genai_extractor,
+        "logger",
+        SimpleNamespace(info=lambda event, **fields: logged.append((event, fields))),
+    )
+    return models, logged
+
+
+async def test_generate_json_logs_failed_requests(gemini):
+    models, logged = gemini
+
+    def fail(**_):
+        raise ConnectionError("reset")
+
+    models.generate_content = fail
+    with pytest.raises(ConnectionError):
+        genai_extractor._generate_json("prompt", {}, reports=1)
+
+    models.generate_content = lambda **_: SimpleNamespace(text="")
+    with pytest.raises(ValueError):
+        genai_extractor._generate_json("prompt", {}, reports=1)
+
+    models.generate_content = lambda **_: SimpleNamespace(text="{}")
+    assert genai_extractor._generate_json("prompt", {}, reports=1) == "{}"
+
+    assert [(event, fields["outcome"]) for event, fields in logged] == [
+        ("gemini_request", "error"),
+        ("gemini_request", "empty"),
+        ("gemini_request", "ok"),
+    ]
+    assert all(fields["reports"] == 1 for _, fields in logged)
+
+
+async def test_generate_json_logs_late_responses_as_timeouts(gemini, monkeypatch):
+    models, logged = gemini
+    monkeypatch.setattr(settings, "GEMINI_REQUEST_TIMEOUT_S", 0)
+    models.generate_content = lambda **_: SimpleNamespace(text="{}")
+
+    genai_extractor._generate_json("prompt", {})
+
+    assert logged[0][1]["outcome"] == "timeout"
+
+
+async def test_batch_requests_are_judged_against_the_batch_timeout(gemini, monkeypatch):
+    models, logged = gemini
+    monkeypatch.setattr(settings, "GEMINI_REQUEST_TIMEOUT_S", 0)
+    monkeypatch.setattr(settings, "EXTRACT_BATCH_TIMEOUT_S", 60)
+    models.generate_content = lambda **_: SimpleNamespace(text='{"results": []}')
+
+    genai_extractor.extract_moments_batch(["a", "b"])
+
+    assert logged[0][1]["outcome"] == "ok"
@@ -0,0 +1,109 @@
+"""Tests for model-input image preprocessing."""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.services import image_processing
+from app.services.image_processing import (
+    IMAGE_PROCESSING_ERRORS,
+    prepare_model_input,
+    render_thumbnails,
+    run_in_process,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def _jpeg(size, *, orientation=None):
+    image = Image.new("RGB", size, "red")
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    if orientation is not None:
+        exif[0x0112] = orientation  # Orientation
+    output = io.BytesIO()
+    image.save(output, format="JPEG", exif=exif)
+    return output.getvalue()
+
+
+async def test_downscales_to_max_side_and_strips_exif():
+    prepared = prepare_model_input(_jpeg((4000, 3000)), max_side=1000)
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (1000, 750)
+        assert not image.getexif()
+
+
+async def test_applies_exif_orientation_to_pixels():
+    # Orientation 6 means "rotate 90° clockwise to display".
+    prepared = prepare_model_input(_jpeg((400, 300), orientation=6), max_side=1000)
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.size == (300, 400)
+
+
+async def test_flattens_transparency_onto_white():
+    output = io.BytesIO()
+    Image.new("RGBA", (10, 10), (0, 0, 0, 0)).save(output, format="PNG")
+
+    prepared = prepare_model_input(output.getvalue(), max_side=100)
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.mode == "RGB"
+        assert all(channel > 250 for channel in image.getpixel((5, 5)))
+
+
+async def test_rejects_data_that_is_not_an_image():
+    with pytest.raises(OSError):
+        prepare_model_input(b"not an image", max_side=100)
+
+
+async def test_run_in_process_uses_the_pool():
+    try:
+        prepared = await run_in_process(prepare_model_input, _jpeg((50, 50)), max_side=20)
+    finally:
+        image_processing.close_process_pool()
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.size == (20, 20)
+
+
+async def test_render_thumbnails_never_upscales():
+    thumbnails = render_thumbnails(_jpeg((800, 600)), widths=[320, 640, 1280], formats=["webp"])
+
+    assert [(thumb.variant, thumb.width, thumb.height) for thumb in thumbnails] == [
+        ("thumb_320_webp", 320, 240),
+        ("thumb_640_webp", 640, 480),
+        ("thumb_800_webp", 800, 600),
+    ]
+    with Image.open(io.BytesIO(thumbnails[0].data)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (320, 240)
+
+
+async def test_render_thumbnails_skips_unsupported_formats():
+    thumbnails = render_thumbnails(_jpeg((100, 100)), widths=[50], formats=["webp", "bmp"])
+
+    assert [thumb.mime_type for thumb in thumbnails] == ["image/webp"]
+
+
+async def test_decompression_bombs_are_image_processing_errors(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    with pytest.raises(IMAGE_PROCESSING_ERRORS):
+        prepare_model_input(_jpeg((100, 100)), max_side=50)
+
+
+async def test_run_in_process_replaces_a_broken_pool():
+    try:
+        with pytest.raises(IMAGE_PROCESSING_ERRORS):
+            await run_in_process(os._exit, 1)
+        prepared = await run_in_process(prepare_model_input, _jpeg((50, 50)), max_side=20)
+    finally:
+        image_processing.close_process_pool()
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.size == (20, 20)
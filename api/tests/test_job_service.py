@@ -0,0 +1,177 @@
+"""Tests for job claiming and requeueing."""
+
+import pytest
+
+from app.core.enums import AssetKind, JobStatus, JobType
+from app.jobs.utils import copy_output_asset, find_derived_assets, find_reusable_output
+from app.models.asset import Asset
+from app.schemas.report import ReportCreate
+from app.services import asset_service, job_service, report_service
+from app.services import storage as storage_module
+from app.services.storage import MemoryStorage
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_job(db):
+    report = await report_service.create_report(
+        db,
+        author_id="author-1",
+        data=ReportCreate(date="2025-01-01", opponent="Rivals", content="Test"),
+    )
+    return await job_service.ensure_job(db, report.id, JobType.EXTRACT_MOMENTS)
+
+
+async def test_claim_job_only_succeeds_once(db):
+    job = await _create_job(db)
+
+    first = await job_service.claim_job(db, job.id, lease_s=60)
+    second = await job_service.claim_job(db, job.id, lease_s=60)
+
+    assert first is not None
+    assert first.status == JobStatus.RUNNING
+    assert first.attempts == 1
+    assert first.lease_expires_at is not None
+    assert second is None
+
+
+async def test_claim_job_takes_over_expired_lease(db):
+    job = await _create_job(db)
+    await job_service.claim_job(db, job.id, lease_s=-1)
+
+    reclaimed = await job_service.claim_job(db, job.id, lease_s=60)
+
+    assert reclaimed is not None
+    assert reclaimed.attempts == 2
+
+
+async def test_ensure_job_requeues_failed_job(db):
+    job = await _create_job(db)
+    job.status = JobStatus.FAILED
+    job.attempts = 3
+    job.last_error = "boom"
+    job.idempotency_key = "fingerprint"
+    job.provider_job_id = "prediction-1"
+    await db.flush()
+
+    requeued = await job_service.ensure_job(db, job.report_id, JobType.EXTRACT_MOMENTS)
+
+    assert requeued.id == job.id
+    assert requeued.status == JobStatus.QUEUED
+    assert requeued.attempts == 0
+    assert requeued.last_error is None
+    assert requeued.idempotency_key is None
+    assert requeued.provider_job_id is None
+
+
+async def test_claim_next_job_prefers_priority_then_age(db):
+    report = await report_service.create_report(
+        db,
+        author_id="author-1",
+        data=ReportCreate(date="2025-01-01", opponent="Rivals", content="Test"),
+    )
+    older = await job_service.ensure_job(db, report.id, JobType.GENERATE_VIDEO)
+    urgent = await job_service.ensure_job(db, report.id, JobType.EXTRACT_MOMENTS, priority=10)
+    await db.flush()
+
+    assert await job_service.queue_depth(db) == 2
+    first = await job_service.claim_next_job(db, lease_s=60)
+    second = await job_service.claim_next_job(db, lease_s=60)
+
+    assert [first.id, second.id] == [urgent.id, older.id]
+    assert await job_service.claim_next_job(db, lease_s=60) is None
+    assert await job_service.queue_depth(db) == 0
+
+
+async def test_requeue_expired_jobs(db):
+    job = await _create_job(db)
+    await job_service.claim_job(db, job.id, lease_s=-1)
+
+    assert await job_service.requeue_expired_jobs(db) == [(job.id, job.type)]
+    assert await job_service.queue_depth(db) == 1
+
+
+async def test_running_jobs_without_a_lease_count_as_expired(db):
+    stuck, claimable = await _create_job(db), await _create_job(db)
+    for job in (stuck, claimable):
+        job.status = JobStatus.RUNNING
+        job.lease_expires_at = None
+    await db.flush()
+
+    assert await job_service.claim_job(db, claimable.id, lease_s=60) is not None
+    assert await job_service.requeue_expired_jobs(db) == [(stuck.id, stuck.type)]
+
+
+async def test_reusable_output_is_scoped_to_the_author(db):
+    reports = {}
+    for author_id in ("author-1", "author-2"):
+        report = await report_service.create_report(
+            db, author_id=author_id, data=ReportCreate(date="2025-01-01")
+        )
+        reports[author_id] = report
+    done = await job_service.ensure_job(db, reports["author-1"].id, JobType.GIMPIFY_IMAGE)
+    done.status = JobStatus.SUCCEEDED
+    done.idempotency_key = "fingerprint"
+    await asset_service.upsert_asset_ready(
+        db,
+        report_id=reports["author-1"].id,
+        author_id="author-1",
+        kind=AssetKind.GIMPIFIED_IMAGE,
+        gcs_path="reports/r/gimpified_image.jpg",
+        mime_type="image/jpeg",
+    )
+    job = await job_service.ensure_job(db, reports["author-2"].id, JobType.GIMPIFY_IMAGE)
+    await db.flush()
+
+    other_author = await find_reusable_output(
+        db, job, "fingerprint", AssetKind.GIMPIFIED_IMAGE, author_id="author-2"
+    )
+    same_author = await find_reusable_output(
+        db, job, "fingerprint", AssetKind.GIMPIFIED_IMAGE, author_id="author-1"
+    )
+
+    assert other_author is None
+    assert same_author is not None
+    assert same_author[0].id == done.id
+
+
+async def test_derived_thumbnails_are_found_for_reuse(db):
+    report = await report_service.create_report(
+        db, author_id="author-1", data=ReportCreate(date="2025-01-01")
+    )
+    assets = {}
+    for variant, path in (
+        ("original", "reports/r/gimpified_image.jpg"),
+        ("thumb_320_webp", "reports/r/gimpified_image.thumb_320_webp.webp"),
+    ):
+        assets[variant] = await asset_service.upsert_asset_ready(
+            db,
+            report_id=report.id,
+            author_id="author-1",
+            kind=AssetKind.GIMPIFIED_IMAGE,
+            gcs_path=path,
+            mime_type="image/webp",
+            variant=variant,
+        )
+    await db.flush()
+
+    derived = await find_derived_assets(db, assets["original"])
+
+    assert [asset.variant for asset in derived] == ["thumb_320_webp"]
+
+
+async def test_copy_output_asset_keeps_the_variant_in_the_key(monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(storage_module, "_storage", storage)
+    await storage.upload_bytes("reports/r1/gimpified_image.thumb_320_webp.webp", b"thumb")
+    source = Asset(
+        report_id="r1",
+        kind=AssetKind.GIMPIFIED_IMAGE,
+        variant="thumb_320_webp",
+        gcs_path="reports/r1/gimpified_image.thumb_320_webp.webp",
+    )
+
+    path = await copy_output_asset(source, "r2")
+
+    assert path == "reports/r2/gimpified_image.thumb_320_webp.webp"
+    assert await storage.download_bytes(path) == b"thumb"
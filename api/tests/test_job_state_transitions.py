@@ -1,13 +1,17 @@
 """Tests for job state transitions in the worker."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from app.core.config import settings
 from app.core.enums import JobStatus, JobType, ReportStatus
 from app.models.job import Job
 from app.models.report import Report
-from app.workers.runner import handle_message
+from app.services import queue
+from app.workers import runner
+from app.workers.runner import GracefulShutdown, JobSlots, handle_message
 
 pytestmark = pytest.mark.asyncio
 
@@ -39,6 +43,20 @@ def sample_report():
     return report
 
 
+@pytest.fixture(autouse=True)
+def fake_claim(sample_job, monkeypatch):
+    """Stand in for the conditional UPDATE that claims a job."""
+
+    async def claim(db, job_id, *, lease_s):
+        if job_id != sample_job.id or sample_job.status != JobStatus.QUEUED:
+            return None
+        sample_job.status = JobStatus.RUNNING
+        sample_job.attempts += 1
+        return sample_job
+
+    monkeypatch.setattr("app.workers.runner.claim_job", claim)
+
+
 class TestHandleMessage:
     """Tests for the handle_message function."""
 
@@ -78,6 +96,7 @@ class TestHandleMessage:
 
     async def test_marks_job_failed_on_exception(self, sample_job):
         """Test that jobs are marked failed when handler raises."""
+        sample_job.idempotency_key = "fingerprint"
         with patch("app.workers.runner.SessionLocal") as mock_session:
             mock_db = AsyncMock()
             mock_db.get.return_value = sample_job
@@ -99,10 +118,13 @@ class TestHandleMessage:
 
                 assert sample_job.status == JobStatus.FAILED
                 assert sample_job.last_error == "Test error"
+                # A failed prediction is never resumed by the next attempt.
+                assert sample_job.idempotency_key is None
                 mock_db.commit.assert_called()
 
     async def test_marks_job_failed_on_timeout(self, sample_job):
         """Test that jobs are marked failed on timeout errors."""
+        sample_job.idempotency_key = "fingerprint"
         with patch("app.workers.runner.SessionLocal") as mock_session:
             mock_db = AsyncMock()
             mock_db.get.return_value = sample_job
@@ -124,6 +146,8 @@ class TestHandleMessage:
 
                 assert sample_job.status == JobStatus.FAILED
                 assert "Timeout" in sample_job.last_error
+                # The prediction may still finish, so the retry can resume it.
+                assert sample_job.idempotency_key == "fingerprint"
 
     async def test_marks_job_failed_on_connection_error(self, sample_job):
         """Test that jobs are marked failed on connection errors."""
@@ -150,7 +174,7 @@ class TestHandleMessage:
                 assert "Connection error" in sample_job.last_error
 
     async def test_commits_on_successful_handler(self, sample_job):
-        """Test that successful handler execution commits the transaction."""
+        """Test that the claim is committed before the handler runs."""
         with patch("app.workers.runner.SessionLocal") as mock_session:
             mock_db = AsyncMock()
             mock_db.get.return_value = sample_job
@@ -171,6 +195,32 @@ class TestHandleMessage:
                 )
 
                 mock_db.commit.assert_called_once()
+                assert sample_job.status == JobStatus.RUNNING
+                assert sample_job.attempts == 1
+
+    async def test_skips_job_already_running(self, sample_job):
+        """Test that a duplicate delivery of a running job is dropped."""
+        sample_job.status = JobStatus.RUNNING
+        mock_handler = AsyncMock()
+
+        with patch("app.workers.runner.SessionLocal") as mock_session:
+            mock_db = AsyncMock()
+            mock_session.return_value.__aenter__.return_value = mock_db
+
+            with patch.dict(
+                "app.workers.runner._JOB_HANDLERS",
+                {JobType.EXTRACT_MOMENTS: mock_handler},
+            ):
+                await handle_message(
+                    {
+                        "job_id": sample_job.id,
+                        "job_type": sample_job.type.value,
+                    }
+                )
+
+            mock_handler.assert_not_called()
+            mock_db.commit.assert_not_called()
+            assert sample_job.attempts == 0
 
     async def test_skips_job_not_found(self):
         """Test that non-existent jobs are skipped."""
@@ -214,7 +264,7 @@ class TestJobTypeRouting:
                     }
                 )
 
-                mock_handler.assert_called_once_with(mock_db, sample_job.id)
+                mock_handler.assert_called_once_with(mock_session, sample_job.id)
 
     async def test_routes_gimpify_image(self, sample_job):
         """Test that gimpify_image jobs are routed correctly."""
@@ -237,7 +287,7 @@ class TestJobTypeRouting:
                     }
                 )
 
-                mock_handler.assert_called_once_with(mock_db, sample_job.id)
+                mock_handler.assert_called_once_with(mock_session, sample_job.id)
 
     async def test_routes_generate_video(self, sample_job):
         """Test that generate_video jobs are routed correctly."""
@@ -260,4 +310,104 @@ class TestJobTypeRouting:
                     }
                 )
 
-                mock_handler.assert_called_once_with(mock_db, sample_job.id)
+                mock_handler.assert_called_once_with(mock_session, sample_job.id)
+
+
+async def test_enqueue_job_is_a_no_op_for_postgres_queue(monkeypatch):
+    """With the Postgres queue the job row is the message, so Redis is never touched."""
+    monkeypatch.setattr(settings, "QUEUE_BACKEND", "postgres")
+    with patch("app.services.queue.Redis") as mock_redis:
+        await queue.enqueue_job("job-123", "extract_moments")
+
+    mock_redis.from_url.assert_not_called()
+
+
+async def test_enqueue_jobs_pushes_all_jobs_in_one_command():
+    with patch("app.services.queue.Redis") as mock_redis:
+        client = AsyncMock()
+        mock_redis.from_url.return_value = client
+
+        await queue.enqueue_jobs([("job-1", "extract_moments"), ("job-2", "generate_video")])
+
+    client.rpush.assert_awaited_once()
+    queue_name, *payloads = client.rpush.await_args.args
+    assert queue_name == "jobs"
+    assert len(payloads) == 2
+    client.aclose.assert_awaited_once()
+
+
+async def test_job_slots_run_jobs_concurrently_up_to_the_limit():
+    shutdown = GracefulShutdown()
+    slots = JobSlots(shutdown, 2)
+    release = asyncio.Event()
+    running = []
+
+    async def job(job_id):
+        running.append(job_id)
+        await release.wait()
+
+    for job_id in ("job-1", "job-2"):
+        await slots.acquire()
+        slots.start(job_id, job(job_id))
+    await asyncio.sleep(0)
+
+    assert running == ["job-1", "job-2"]
+    assert shutdown._current_job_ids == {"job-1", "job-2"}
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(slots.acquire(), timeout=0.01)
+
+    release.set()
+    await slots.wait()
+    assert shutdown._current_job_ids == set()
+    await asyncio.wait_for(slots.acquire(), timeout=1)
+
+
+async def test_worker_warm_up_failure_is_not_fatal(monkeypatch):
+    def fail():
+        raise RuntimeError("missing API key")
+
+    monkeypatch.setattr("app.services.genai_extractor.warm_up", fail)
+
+    await runner._warm_up()
+
+
+async def test_postgres_listener_uses_its_own_connection(monkeypatch):
+    conn = AsyncMock()
+    connect = AsyncMock(return_value=conn)
+    monkeypatch.setattr(runner.asyncpg, "connect", connect)
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+asyncpg://u:p@db/app?sslmode=require")
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+
+    listener = await runner._open_listener(lambda *_: None)
+
+    assert listener is conn
+    connect.assert_awaited_once_with("postgresql://u:p@db/app", ssl=True)
+    assert conn.add_listener.await_args.args[0] == runner.JOBS_CHANNEL
+
+
+async def test_postgres_listener_is_skipped_behind_pgbouncer(monkeypatch):
+    connect = AsyncMock()
+    monkeypatch.setattr(runner.asyncpg, "connect", connect)
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+
+    assert await runner._open_listener(lambda *_: None) is None
+    connect.assert_not_awaited()
+
+
+async def test_lease_sweep_pushes_requeued_jobs_back_to_redis(monkeypatch):
+    db = AsyncMock()
+    session = AsyncMock()
+    session.__aenter__.return_value = db
+    monkeypatch.setattr(runner, "SessionLocal", lambda: session)
+    monkeypatch.setattr(
+        runner,
+        "requeue_expired_jobs",
+        AsyncMock(return_value=[("job-1", JobType.GIMPIFY_IMAGE)]),
+    )
+    enqueue_jobs = AsyncMock()
+    monkeypatch.setattr(runner, "enqueue_jobs", enqueue_jobs)
+
+    await runner._sweep_expired_leases()
+
+    db.commit.assert_awaited_once()
+    enqueue_jobs.assert_awaited_once_with([("job-1", "gimpify_image")])
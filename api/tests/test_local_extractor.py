@@ -0,0 +1,69 @@
+"""Tests for the template-based moment extractor."""
+
+from app.schemas.extract_moments import ExtractMomentsOut
+from app.services.local_extractor import extract_moments_locally
+
+
+def test_extracts_both_labelled_fields():
+    report = (
+        "Tough one tonight against the Rivals.\n"
+        "**Gimp of the day:** Dave.\n"
+        "Champagne moment - Steve's volley from halfway!\n"
+    )
+
+    assert extract_moments_locally(report) == ExtractMomentsOut(
+        gimp_name="Dave", champagne_moment="Steve's volley from halfway"
+    )
+
+
+def test_needs_both_fields():
+    assert extract_moments_locally("Gimp of the day: Dave\nWe lost 5-2.") is None
+
+
+def test_rejects_conflicting_labels():
+    report = "Gimp: Dave\nChampagne moment: the nutmeg\nGimp: Al\n"
+
+    assert extract_moments_locally(report) is None
+
+
+def test_rejects_sentence_instead_of_name():
+    report = (
+        "Gimp of the day: hard to say, everyone was awful tonight\nChampagne moment: the nutmeg\n"
+    )
+
+    assert extract_moments_locally(report) is None
+
+
+def test_ignores_labels_mid_sentence():
+    report = "Nobody could agree who the gimp of the day: was.\nChampagne moment: the nutmeg\n"
+
+    assert extract_moments_locally(report) is None
+
+
+def test_blank_label_does_not_take_the_next_line():
+    report = "Gimp of the day:\n\nChampagne moment: Tom's volley\n"
+
+    assert extract_moments_locally(report) is None
+
+
+def test_rejects_placeholder_values():
+    assert extract_moments_locally("Gimp: N/A\nChampagne moment: the nutmeg\n") is None
+    assert extract_moments_locally("Gimp: Dave\nChampagne moment: -\n") is None
+
+
+def test_rejects_sentence_after_a_dash():
+    report = "The gimp - Dave was dreadful\nChampagne moment: the nutmeg\n"
+
+    assert extract_moments_locally(report) is None
+
+
+def test_rejects_values_containing_another_label():
+    report = "Gimp: Dave\nChampagne moment: the nutmeg. Gimp: Al\n"
+
+    assert extract_moments_locally(report) is None
+
+
+def test_overlong_champagne_moment_falls_back():
+    report = "Gimp: Dave\nChampagne moment: " + "a great goal " * 30 + "\n"
+
+    assert extract_moments_locally(report) is None
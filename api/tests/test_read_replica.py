@@ -0,0 +1,80 @@
+"""Tests for read-replica routing."""
+
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.db import session as session_module
+from app.db.session import READ_PRIMARY_COOKIE, get_read_db
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeSessionmaker:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.name
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_request(*, replica: bool, cookie: bool = False) -> Request:
+    state = SimpleNamespace(
+        db_sessionmaker=FakeSessionmaker("primary"),
+        db_replica_sessionmaker=FakeSessionmaker("replica") if replica else None,
+        replica_checked_at=0.0,
+        replica_fresh=False,
+    )
+    headers = [(b"cookie", f"{READ_PRIMARY_COOKIE}=1".encode())] if cookie else []
+    return Request({"type": "http", "app": SimpleNamespace(state=state), "headers": headers})
+
+
+async def read_session(request: Request) -> str:
+    async for session in get_read_db(request):
+        return session
+    raise AssertionError("no session yielded")
+
+
+async def test_read_db_uses_primary_without_replica():
+    assert await read_session(make_request(replica=False)) == "primary"
+
+
+async def test_read_db_uses_fresh_replica(monkeypatch):
+    async def fresh(app, sessionmaker):
+        return True
+
+    monkeypatch.setattr(session_module, "_replica_is_fresh", fresh)
+    assert await read_session(make_request(replica=True)) == "replica"
+
+
+async def test_read_db_sticks_to_primary_after_a_write(monkeypatch):
+    async def fresh(app, sessionmaker):
+        return True
+
+    monkeypatch.setattr(session_module, "_replica_is_fresh", fresh)
+    assert await read_session(make_request(replica=True, cookie=True)) == "primary"
+
+
+async def test_read_db_falls_back_when_replica_lags(monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_MAX_LAG_S", 1.0)
+
+    class LaggingReplica(FakeSessionmaker):
+        async def __aenter__(self):
+            return self
+
+        async def execute(self, _stmt):
+            return SimpleNamespace(scalar_one=lambda: 30.0)
+
+    request = make_request(replica=True)
+    request.app.state.db_replica_sessionmaker = LaggingReplica("replica")
+
+    assert await read_session(request) == "primary"
+    assert request.app.state.replica_fresh is False
@@ -0,0 +1,114 @@
+"""Tests for incremental NDJSON/CSV parsing."""
+
+import pytest
+
+from app.utils import records
+from app.utils.records import iter_records
+
+pytestmark = pytest.mark.asyncio
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def collect(data: bytes, fmt: str):
+    return [item async for item in iter_records(chunked(data), fmt)]
+
+
+async def test_ndjson_records_split_across_chunks():
+    data = (
+        b'{"date": "2025-01-01", "opponent": "Rivals"}\n\n{"date": "2025-01-08"}\r\nnot json\n[1]'
+    )
+
+    records = await collect(data, "ndjson")
+
+    assert records[0] == (1, {"date": "2025-01-01", "opponent": "Rivals"})
+    assert records[1] == (2, {"date": "2025-01-08"})
+    assert [(row, type(value)) for row, value in records[2:]] == [(3, ValueError), (4, ValueError)]
+
+
+async def test_csv_records_handle_quoted_newlines_and_multibyte_text():
+    data = (
+        "\ufeffdate,opponent,content\r\n"
+        '2025-01-01,Rivals,"Great match,\nsaid ""everyone"" – again"\r\n'
+        "2025-01-08,,\n"
+        "2025-01-15,too,many,columns\n"
+    ).encode()
+
+    records = await collect(data, "csv")
+
+    assert records[0] == (
+        1,
+        {
+            "date": "2025-01-01",
+            "opponent": "Rivals",
+            "content": 'Great match,\nsaid "everyone" – again',
+        },
+    )
+    assert records[1] == (2, {"date": "2025-01-08"})
+    assert records[2][0] == 3
+    assert isinstance(records[2][1], ValueError)
+
+
+async def test_csv_stray_quotes_are_per_row_errors():
+    data = (
+        b"date,opponent,content\n"
+        b'2025-01-01,Rivals,He said "hi\n'
+        b'2025-01-08,Rivals,"closed"then more\n'
+        b"2025-01-15,Rivals,Fine\n"
+    )
+
+    records = await collect(data, "csv")
+
+    assert records[0] == (
+        1,
+        {"date": "2025-01-01", "opponent": "Rivals", "content": 'He said "hi'},
+    )
+    assert records[1][0] == 2
+    assert isinstance(records[1][1], ValueError)
+    assert records[2] == (3, {"date": "2025-01-15", "opponent": "Rivals", "content": "Fine"})
+
+
+async def test_csv_unterminated_quote_is_capped(monkeypatch):
+    monkeypatch.setattr(records, "MAX_RECORD_BYTES", 64)
+    data = (
+        "date,opponent,content\n"
+        '2025-01-01,Rivals,"never closed\n' + "filler line\n" * 10 + "2025-01-15,Rivals,Fine\n"
+    ).encode()
+
+    rows = await collect(data, "csv")
+
+    assert isinstance(rows[0][1], ValueError)
+    assert "Unterminated" in str(rows[0][1])
+    assert rows[-1][1] == {"date": "2025-01-15", "opponent": "Rivals", "content": "Fine"}
+
+
+async def test_csv_unterminated_quote_at_end_is_a_row_error():
+    records = await collect(b'date,opponent,content\n2025-01-01,Rivals,"open\n', "csv")
+
+    assert [(row, type(value)) for row, value in records] == [(1, ValueError)]
+
+
+async def test_invalid_utf8_is_a_per_row_error():
+    data = b"date,opponent,content\n2025-01-01,Riv\xffals,Bad\n2025-01-08,Rivals,Good\n"
+
+    records = await collect(data, "csv")
+
+    assert records[0][0] == 1
+    assert "UTF-8" in str(records[0][1])
+    assert records[1] == (2, {"date": "2025-01-08", "opponent": "Rivals", "content": "Good"})
+
+    records = await collect(b'{"a": "\xc3"}\n{"b": "ok"}\n', "ndjson")
+
+    assert isinstance(records[0][1], ValueError)
+    assert records[1] == (2, {"b": "ok"})
+
+
+async def test_overlong_line_is_skipped(monkeypatch):
+    monkeypatch.setattr(records, "MAX_RECORD_BYTES", 16)
+
+    rows = await collect(b'{"a": "' + b"x" * 100 + b'"}\n{"b": "ok"}\n', "ndjson")
+
+    assert [(row, type(value)) for row, value in rows] == [(1, ValueError), (2, dict)]
@@ -0,0 +1,355 @@
+"""Tests for report route serialization."""
+
+import asyncio
+import csv
+import io
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.api.v1 import reports as reports_routes
+from app.core.config import settings
+from app.core.enums import AssetKind, AssetStatus, JobStatus, JobType, ReportStatus
+from app.core.exceptions import ForbiddenError, NotFoundError
+from app.db.session import get_db, get_read_db
+from app.main import app
+from app.services import asset_service, report_export, report_service
+from app.services import storage as storage_module
+from app.services.storage import MemoryStorage
+from app.utils.hashing import crc32c_b64
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_db():
+        yield AsyncMock()
+
+    report = SimpleNamespace(
+        id="r1",
+        author_id="author-1",
+        date=date(2025, 1, 1),
+        opponent="Rivals",
+        content="Great match.",
+        status=ReportStatus.PROCESSING,
+        gimp_name=None,
+        champagne_moment=None,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    job = SimpleNamespace(
+        id="j1",
+        report_id="r1",
+        type=JobType.EXTRACT_MOMENTS,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        last_error=None,
+        idempotency_key=None,
+        provider_job_id=None,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    monkeypatch.setattr(report_service, "report_version", AsyncMock(return_value=(NOW,)))
+    monkeypatch.setattr(report_service, "get_report", AsyncMock(return_value=report))
+    monkeypatch.setattr(report_service, "list_assets", AsyncMock(return_value=[]))
+    monkeypatch.setattr(report_service, "list_jobs", AsyncMock(return_value=[job]))
+    monkeypatch.setattr(report_service, "list_reports", AsyncMock(return_value=[report]))
+    app.dependency_overrides[get_read_db] = fake_db
+    app.dependency_overrides[get_db] = fake_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+async def test_get_report_serializes_detail_from_orm_rows(client):
+    response = client.get("/v1/reports/r1", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == "r1"
+    assert body["status"] == "processing"
+    assert body["assets"] == []
+    assert [job["type"] for job in body["jobs"]] == ["extract_moments"]
+
+
+async def test_list_reports_projects_requested_fields(client):
+    response = client.get("/v1/reports?fields=date,status", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": "r1", "date": "2025-01-01", "status": "processing"}]
+    assert report_service.list_reports.await_args.kwargs["fields"] == ["id", "date", "status"]
+
+
+async def test_list_reports_returns_summaries_without_content(client):
+    response = client.get("/v1/reports", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    (item,) = response.json()
+    assert "content" not in item
+    assert item["excerpt"] is None
+
+
+async def test_list_reports_rejects_unknown_fields(client):
+    response = client.get("/v1/reports?fields=content,secret", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 400
+
+
+async def test_report_stats_totals_counts(client, monkeypatch):
+    counts = dict.fromkeys(ReportStatus, 0) | {ReportStatus.DRAFT: 3, ReportStatus.FAILED: 1}
+    monkeypatch.setattr(report_service, "count_reports_by_status", AsyncMock(return_value=counts))
+
+    response = client.get("/v1/reports/stats", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 4
+    assert response.json()["counts"]["draft"] == 3
+
+
+async def test_batch_submit_returns_per_report_results(client, monkeypatch):
+    report = await report_service.get_report(None, "r1", "author-1")
+    job = (await report_service.list_jobs(None, "r1", "author-1"))[0]
+    monkeypatch.setattr(
+        report_service,
+        "submit_reports",
+        AsyncMock(return_value=({"r1": report, "r2": NotFoundError("Report not found")}, [job])),
+    )
+    enqueue_jobs = AsyncMock()
+    monkeypatch.setattr(reports_routes, "enqueue_jobs", enqueue_jobs)
+
+    response = client.post(
+        "/v1/reports:batchSubmit",
+        json={"report_ids": ["r1", "r2", "r1"]},
+        headers={"X-Author-Id": "author-1"},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(item["report_id"], item["status_code"]) for item in results] == [
+        ("r1", 200),
+        ("r2", 404),
+    ]
+    assert [item["type"] for item in results[0]["jobs"]] == ["extract_moments"]
+    assert report_service.submit_reports.await_args.args[1] == ["r1", "r2"]
+    enqueue_jobs.assert_awaited_once_with([("j1", "extract_moments")])
+
+
+async def test_import_reports_streams_rows_and_reports_errors(client, monkeypatch):
+    created = []
+
+    async def fake_create_reports(db, author_id, items):
+        created.extend(items)
+        return len(items)
+
+    monkeypatch.setattr(report_service, "create_reports", fake_create_reports)
+    body = "date,opponent,content\n2025-01-01,Rivals,Great\nnot-a-date,Rivals,Bad\n"
+
+    response = client.post(
+        "/v1/reports:import",
+        content=body.encode(),
+        headers={"X-Author-Id": "author-1", "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert response.json()["failed"] == 1
+    assert response.json()["errors"][0]["row"] == 2
+    assert response.json()["errors"][0]["error"].startswith("date:")
+    assert [item.opponent for item in created] == ["Rivals"]
+
+
+async def test_import_reports_reports_malformed_rows_instead_of_failing(client, monkeypatch):
+    async def fake_create_reports(db, author_id, items):
+        return len(items)
+
+    monkeypatch.setattr(report_service, "create_reports", fake_create_reports)
+    body = (
+        b"date,opponent,content\n"
+        b"2025-01-01,Rivals,Bad \xff byte\n"
+        b"2025-01-08,Rivals,Fine\n"
+        b'2025-01-15,Rivals,"unterminated\n'
+    )
+
+    response = client.post(
+        "/v1/reports:import",
+        content=body,
+        headers={"X-Author-Id": "author-1", "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert [error["row"] for error in response.json()["errors"]] == [1, 3]
+
+
+@pytest.fixture
+def export_batches(monkeypatch):
+    @asynccontextmanager
+    async def fake_sessionmaker():
+        yield AsyncMock()
+
+    async def fake_iter_report_batches(db, author_id, *, batch_size):
+        for report_id in ("r1", "r2"):
+            yield [
+                SimpleNamespace(
+                    id=report_id,
+                    author_id=author_id,
+                    date=date(2025, 1, 1),
+                    opponent="Rivals, away",
+                    content="Line one\nline two",
+                    status=ReportStatus.PUBLISHED,
+                    gimp_name=None,
+                    champagne_moment=None,
+                    created_at=NOW,
+                    updated_at=NOW,
+                )
+            ]
+
+    monkeypatch.setattr(
+        reports_routes, "read_sessionmaker", AsyncMock(return_value=fake_sessionmaker)
+    )
+    monkeypatch.setattr(report_service, "iter_report_batches", fake_iter_report_batches)
+
+
+async def test_export_reports_streams_ndjson(client, export_batches):
+    response = client.get("/v1/reports/export", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="reports.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ["r1", "r2"]
+    assert rows[0]["content"] == "Line one\nline two"
+    assert rows[0]["asset_urls"] is None
+
+
+async def test_export_reports_streams_csv_with_header(client, export_batches):
+    response = client.get(
+        "/v1/reports/export", params={"format": "csv"}, headers={"X-Author-Id": "author-1"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == ["r1", "r2"]
+    assert rows[0]["opponent"] == "Rivals, away"
+    assert rows[0]["content"] == "Line one\nline two"
+
+
+async def test_report_detail_is_serialized_by_pydantic_not_json_dumps(client, monkeypatch):
+    # The fast path returns bytes from the response model's serialize_json;
+    # the fallback renders a dict through JSONResponse (json.dumps).
+    def fail_render(self, content):
+        raise AssertionError("response went through JSONResponse.render")
+
+    monkeypatch.setattr(JSONResponse, "render", fail_render)
+
+    response = client.get("/v1/reports/r1", headers={"X-Author-Id": "author-1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["id"] == "r1"
+
+
+@pytest.fixture
+def attach(client, monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "memory")
+    monkeypatch.setattr(storage_module, "_storage", storage)
+
+    async def fake_upsert(db, **fields):
+        return SimpleNamespace(
+            id="a1",
+            variant="original",
+            width=None,
+            height=None,
+            sha256=None,
+            status=AssetStatus.READY,
+            created_at=NOW,
+            updated_at=NOW,
+            **fields,
+        )
+
+    monkeypatch.setattr(asset_service, "upsert_asset_ready", AsyncMock(side_effect=fake_upsert))
+
+    def post(gcs_path, **extra):
+        body = {"kind": "gimp_original", "gcs_path": gcs_path, "mime_type": "image/jpeg"}
+        return client.post(
+            "/v1/reports/r1/assets/attach",
+            json=body | extra,
+            headers={"X-Author-Id": "author-1"},
+        )
+
+    return storage, post
+
+
+async def test_attach_asset_uses_stored_metadata_without_reading_the_object(attach, monkeypatch):
+    storage, post = attach
+    await storage.upload_bytes("reports/r1/gimp_original.jpg", b"jpeg-bytes")
+    download = AsyncMock()
+    monkeypatch.setattr(storage, "download_to_fileobj", download)
+    monkeypatch.setattr(storage, "download_bytes", download)
+
+    assert post("reports/r1/gimp_original.jpg", crc32c="AAAAAA==").status_code == 400
+
+    response = post("reports/r1/gimp_original.jpg")
+    assert response.status_code == 200
+    assert response.json()["size_bytes"] == len(b"jpeg-bytes")
+    assert response.json()["crc32c"] == crc32c_b64(b"jpeg-bytes")
+    assert response.json()["sha256"] is None
+    download.assert_not_awaited()
+
+
+async def test_attach_asset_only_accepts_the_issued_path(attach):
+    storage, post = attach
+    await storage.upload_bytes("reports/other/gimp_original.jpg", b"someone else's")
+
+    for path in ("reports/other/gimp_original.jpg", "reports/r1/../other/gimp_original.jpg"):
+        assert post(path).status_code == 400
+    asset_service.upsert_asset_ready.assert_not_awaited()
+
+
+async def test_attach_asset_checks_ownership_before_storage(attach, monkeypatch):
+    storage, post = attach
+    monkeypatch.setattr(
+        report_service, "get_report", AsyncMock(side_effect=ForbiddenError("Not allowed"))
+    )
+    stat = AsyncMock()
+    monkeypatch.setattr(storage, "stat", stat)
+
+    assert post("reports/r1/gimp_original.jpg").status_code == 403
+    stat.assert_not_awaited()
+
+
+async def test_export_signs_a_batch_of_asset_urls_concurrently(monkeypatch):
+    assets = [
+        SimpleNamespace(report_id=f"r{index}", kind=AssetKind.GIMP_ORIGINAL, gcs_path=f"p{index}")
+        for index in range(3)
+    ]
+    in_flight = 0
+    all_started = asyncio.Event()
+
+    async def signed_get_url(path, *, expires_s):
+        nonlocal in_flight
+        in_flight += 1
+        if in_flight == len(assets):
+            all_started.set()
+        # Sequential signing would wait here forever.
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        return f"https://signed/{path}"
+
+    storage = MemoryStorage()
+    monkeypatch.setattr(storage, "signed_get_url", signed_get_url)
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "memory")
+    monkeypatch.setattr(storage_module, "_storage", storage)
+
+    urls = await report_export._asset_urls(assets)
+
+    assert urls["r2"] == {AssetKind.GIMP_ORIGINAL: "https://signed/p2"}
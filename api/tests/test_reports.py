@@ -1,11 +1,14 @@
 """Tests for report service operations."""
 
+from unittest.mock import AsyncMock
+
 import pytest
 
-from app.core.enums import AssetKind, JobType, ReportStatus
-from app.core.exceptions import BadRequestError
+from app.core.enums import AssetKind, JobStatus, JobType, ReportStatus
+from app.core.exceptions import BadRequestError, ForbiddenError, NotFoundError
+from app.models.asset import MODEL_INPUT_VARIANT, ORIGINAL_VARIANT
 from app.schemas.report import ReportCreate
-from app.services import asset_service, report_service
+from app.services import asset_service, job_service, report_service
 
 pytestmark = pytest.mark.asyncio
 
@@ -89,3 +92,190 @@ async def test_submit_transitions_to_processing(db):
     )
     report, _ = await report_service.submit_report(db, report.id, author_id="author-1")
     assert report.status == ReportStatus.PROCESSING
+
+
+async def test_report_version_changes_when_assets_change(db):
+    report = await report_service.create_report(
+        db,
+        author_id="author-1",
+        data=ReportCreate(date="2025-01-01", opponent="Rivals", content="Test"),
+    )
+    before = await report_service.report_version(db, report.id, "author-1")
+    await asset_service.upsert_asset_ready(
+        db,
+        report_id=report.id,
+        author_id="author-1",
+        kind=AssetKind.GIMP_ORIGINAL,
+        gcs_path="reports/1/gimp_original.jpg",
+        mime_type="image/jpeg",
+    )
+    after = await report_service.report_version(db, report.id, "author-1")
+
+    assert before != after
+
+
+async def test_report_version_sees_status_changes_with_the_same_timestamp(db):
+    # Within one transaction now() is constant, like a commit from a
+    # transaction that started before the last version was read.
+    report = await report_service.create_report(
+        db, author_id="author-1", data=ReportCreate(date="2025-01-01")
+    )
+    job = await job_service.ensure_job(db, report.id, JobType.EXTRACT_MOMENTS)
+    await db.flush()
+    before = await report_service.report_version(db, report.id, "author-1")
+
+    job.status = JobStatus.SUCCEEDED
+    await db.flush()
+    after = await report_service.report_version(db, report.id, "author-1")
+
+    assert before != after
+
+
+async def test_list_reports_returns_excerpt_instead_of_content(db):
+    await report_service.create_report(
+        db,
+        author_id="author-1",
+        data=ReportCreate(date="2025-01-01", opponent="Rivals", content="x" * 500),
+    )
+    db.expunge_all()
+
+    (report,) = await report_service.list_reports(db, "author-1")
+
+    assert report.excerpt == "x" * report_service.EXCERPT_CHARS + "…"
+    assert "content" not in report.__dict__
+
+
+async def test_count_reports_by_status(db):
+    for _ in range(2):
+        await report_service.create_report(
+            db,
+            author_id="author-1",
+            data=ReportCreate(date="2025-01-01", opponent="Rivals", content="Test"),
+        )
+    await report_service.create_report(
+        db,
+        author_id="author-2",
+        data=ReportCreate(date="2025-01-01", opponent="Rivals", content="Test"),
+    )
+
+    counts = await report_service.count_reports_by_status(db, "author-1")
+
+    assert counts[ReportStatus.DRAFT] == 2
+    assert counts[ReportStatus.PUBLISHED] == 0
+
+
+async def test_submit_reports_reports_per_report_outcomes(db):
+    ready, missing_original, foreign = [
+        await report_service.create_report(
+            db,
+            author_id=author_id,
+            data=ReportCreate(date="2025-01-01", opponent="Rivals", content="Test"),
+        )
+        for author_id in ("author-1", "author-1", "author-2")
+    ]
+    await asset_service.upsert_asset_ready(
+        db,
+        report_id=ready.id,
+        author_id="author-1",
+        kind=AssetKind.GIMP_ORIGINAL,
+        gcs_path="reports/1/gimp_original.jpg",
+        mime_type="image/jpeg",
+    )
+
+    outcomes, jobs = await report_service.submit_reports(
+        db, [ready.id, missing_original.id, foreign.id, "nope"], author_id="author-1"
+    )
+
+    assert outcomes[ready.id].status == ReportStatus.PROCESSING
+    assert isinstance(outcomes[missing_original.id], BadRequestError)
+    assert isinstance(outcomes[foreign.id], ForbiddenError)
+    assert isinstance(outcomes["nope"], NotFoundError)
+    assert {(job.report_id, job.type) for job in jobs} == {
+        (ready.id, job_type) for job_type in report_service.SUBMIT_JOB_TYPES
+    }
+
+
+async def test_create_reports_inserts_drafts_in_one_statement(db):
+    items = [ReportCreate(date="2025-01-01", opponent=f"Team {index}") for index in range(3)]
+
+    assert await report_service.create_reports(db, "author-1", items) == 3
+
+    reports = await report_service.list_reports(db, "author-1")
+    assert {report.opponent for report in reports} == {"Team 0", "Team 1", "Team 2"}
+    assert {report.status for report in reports} == {ReportStatus.DRAFT}
+
+
+async def test_iter_report_batches_streams_author_reports_in_batches(db):
+    items = [ReportCreate(date=f"2025-01-0{day}", opponent=f"Team {day}") for day in (3, 1, 2)]
+    await report_service.create_reports(db, "author-1", items)
+    await report_service.create_reports(db, "author-2", items[:1])
+
+    batches = [
+        batch async for batch in report_service.iter_report_batches(db, "author-1", batch_size=2)
+    ]
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert [report.opponent for batch in batches for report in batch] == [
+        "Team 1",
+        "Team 2",
+        "Team 3",
+    ]
+
+
+async def test_asset_variants_do_not_replace_the_original(db):
+    report = await report_service.create_report(
+        db, author_id="author-1", data=ReportCreate(date="2025-01-01")
+    )
+    await asset_service.upsert_asset_ready(
+        db,
+        report_id=report.id,
+        author_id="author-1",
+        kind=AssetKind.GIMP_ORIGINAL,
+        gcs_path="reports/r/gimp_original.jpg",
+        mime_type="image/jpeg",
+    )
+    await asset_service.upsert_asset_ready(
+        db,
+        report_id=report.id,
+        author_id="author-1",
+        kind=AssetKind.GIMP_ORIGINAL,
+        gcs_path="reports/r/gimp_original.model_input.jpg",
+        mime_type="image/jpeg",
+        variant=MODEL_INPUT_VARIANT,
+    )
+
+    assets = await asset_service.list_assets(db, report.id, "author-1")
+    assert {(asset.variant, asset.gcs_path) for asset in assets} == {
+        (ORIGINAL_VARIANT, "reports/r/gimp_original.jpg"),
+        (MODEL_INPUT_VARIANT, "reports/r/gimp_original.model_input.jpg"),
+    }
+
+
+async def test_submit_reports_ignores_derived_originals(db):
+    report = await report_service.create_report(
+        db, author_id="author-1", data=ReportCreate(date="2025-01-01")
+    )
+    await asset_service.upsert_asset_ready(
+        db,
+        report_id=report.id,
+        author_id="author-1",
+        kind=AssetKind.GIMP_ORIGINAL,
+        gcs_path="reports/r/gimp_original.model_input.jpg",
+        mime_type="image/jpeg",
+        variant=MODEL_INPUT_VARIANT,
+    )
+
+    outcomes, jobs = await report_service.submit_reports(db, [report.id], author_id="author-1")
+
+    assert isinstance(outcomes[report.id], BadRequestError)
+    assert jobs == []
+
+
+async def test_create_reports_splits_inserts_at_the_bind_parameter_limit(monkeypatch):
+    monkeypatch.setattr(report_service, "MAX_BIND_PARAMS", 12)
+    db = AsyncMock()
+    items = [ReportCreate(date="2025-01-01", opponent=f"Team {index}") for index in range(5)]
+
+    assert await report_service.create_reports(db, "author-1", items) == 5
+    # Six bound columns per row: two rows per statement.
+    assert db.execute.await_count == 3
@@ -0,0 +1,116 @@
+"""Tests for the storage backends."""
+
+import io
+from urllib.parse import urlsplit
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services import storage as storage_module
+from app.services.storage import LocalStorage, MemoryStorage, upload_bytes_if_changed
+from app.utils.hashing import crc32c_b64
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    """Select the local filesystem backend rooted at a temp directory."""
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    backend = LocalStorage(tmp_path, base_url="http://testserver")
+    monkeypatch.setattr(storage_module, "_storage", backend)
+    return backend
+
+
+async def test_local_storage_round_trip(local_storage, tmp_path):
+    await local_storage.upload_bytes("reports/r1/video.mp4", b"video-bytes")
+
+    assert (tmp_path / "reports/r1/video.mp4").read_bytes() == b"video-bytes"
+    assert await local_storage.download_bytes("reports/r1/video.mp4") == b"video-bytes"
+    # No temporary files are left behind by the atomic write.
+    assert [path.name for path in (tmp_path / "reports/r1").iterdir()] == ["video.mp4"]
+
+
+async def test_local_storage_sendfile_to_real_file(local_storage, tmp_path):
+    await local_storage.upload_fileobj("reports/r1/image.jpg", io.BytesIO(b"x" * 10_000))
+
+    with (tmp_path / "copy.jpg").open("w+b") as out:
+        size = await local_storage.download_to_fileobj("reports/r1/image.jpg", out)
+
+    assert size == 10_000
+    assert (tmp_path / "copy.jpg").read_bytes() == b"x" * 10_000
+
+
+async def test_local_storage_rejects_paths_outside_root(local_storage):
+    with pytest.raises(ValueError):
+        await local_storage.upload_bytes("../escape.txt", b"nope")
+
+
+async def test_memory_storage_round_trip():
+    backend = MemoryStorage()
+    await backend.upload_bytes("reports/r1/image.jpg", b"image", content_type="image/jpeg")
+
+    assert await backend.download_bytes("reports/r1/image.jpg") == b"image"
+    with pytest.raises(FileNotFoundError):
+        await backend.download_bytes("reports/r1/missing.jpg")
+
+
+async def test_local_storage_signed_urls_round_trip_through_api(local_storage):
+    client = TestClient(app)
+    put_url = await local_storage.signed_put_url("reports/r1/image.jpg", content_type="image/jpeg")
+    get_url = await local_storage.signed_get_url("reports/r1/image.jpg")
+
+    def relative(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.path}?{parts.query}"
+
+    assert client.put(relative(put_url), content=b"jpeg-bytes").status_code == 200
+    response = client.get(relative(get_url))
+    assert response.status_code == 200
+    assert response.content == b"jpeg-bytes"
+    assert response.headers["content-type"] == "image/jpeg"
+
+    # A GET signature cannot be reused to overwrite the object.
+    assert client.put(relative(get_url), content=b"evil").status_code == 403
+
+
+async def test_upload_bytes_if_changed_skips_identical_content():
+    backend = MemoryStorage()
+
+    first, uploaded_first = await upload_bytes_if_changed(
+        backend, "reports/r1/video.mp4", b"video", content_type="video/mp4"
+    )
+    second, uploaded_second = await upload_bytes_if_changed(
+        backend, "reports/r1/video.mp4", b"video", content_type="video/mp4"
+    )
+    _, uploaded_changed = await upload_bytes_if_changed(
+        backend, "reports/r1/video.mp4", b"other", content_type="video/mp4"
+    )
+
+    assert (uploaded_first, uploaded_second, uploaded_changed) == (True, False, True)
+    assert first.crc32c == second.crc32c == crc32c_b64(b"video")
+    assert await backend.download_bytes("reports/r1/video.mp4") == b"other"
+
+
+async def test_local_storage_stat_checksums_in_chunks(local_storage, tmp_path):
+    data = bytes(range(256)) * 10_000
+    (tmp_path / "reports/r1").mkdir(parents=True)
+    (tmp_path / "reports/r1/video.mp4").write_bytes(data)
+
+    info = await local_storage.stat("reports/r1/video.mp4")
+
+    assert (info.size, info.crc32c) == (len(data), crc32c_b64(data))
+
+
+async def test_local_storage_upload_stream_batches_small_chunks(local_storage, tmp_path):
+    async def chunks():
+        for _ in range(1000):
+            yield b"0123456789"
+
+    size = await local_storage.upload_stream("reports/r1/video.mp4", chunks())
+
+    assert size == 10_000
+    assert (tmp_path / "reports/r1/video.mp4").read_bytes() == b"0123456789" * 1000
+    assert [path.name for path in (tmp_path / "reports/r1").iterdir()] == ["video.mp4"]
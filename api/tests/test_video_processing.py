@@ -0,0 +1,117 @@
+"""Tests for ffmpeg video post-processing."""
+
+import asyncio
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services import video_processing
+from app.services.video_processing import FfmpegError, postprocess_video, run_ffmpeg
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_faststart_remux_copies_streams():
+    args = video_processing.faststart_args(Path("in.mp4"), Path("out.mp4"))
+
+    assert args[args.index("-c") + 1] == "copy"
+    assert args[args.index("-movflags") + 1] == "+faststart"
+
+
+async def test_mobile_rendition_caps_height_and_bitrate(monkeypatch):
+    monkeypatch.setattr(settings, "VIDEO_MOBILE_MAX_HEIGHT", 360)
+    monkeypatch.setattr(settings, "VIDEO_MOBILE_BITRATE_KBPS", 600)
+
+    args = video_processing.mobile_args(Path("in.mp4"), Path("out.mp4"))
+
+    assert "scale=-2:'min(360,ih)'" in args
+    assert args[args.index("-maxrate") + 1] == "600k"
+    assert args[args.index("-bufsize") + 1] == "1200k"
+
+
+async def test_run_ffmpeg_raises_on_non_zero_exit(monkeypatch):
+    monkeypatch.setattr(settings, "FFMPEG_PATH", shutil.which("false") or "false")
+
+    with pytest.raises(FfmpegError, match="exited with 1"):
+        await run_ffmpeg("-i", "missing.mp4")
+
+
+async def test_run_ffmpeg_missing_binary_is_an_os_error(monkeypatch):
+    monkeypatch.setattr(settings, "FFMPEG_PATH", "/nonexistent/ffmpeg")
+
+    with pytest.raises(OSError):
+        await run_ffmpeg("-version")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+async def test_postprocess_video_produces_all_renditions(tmp_path):
+    source = tmp_path / "source.mp4"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=size=1280x720:rate=25:duration=2",
+            "-pix_fmt",
+            "yuv420p",
+            str(source),
+        ],
+        check=True,
+    )
+
+    renditions = await postprocess_video(source.read_bytes())
+
+    by_variant = {rendition.variant: rendition for rendition in renditions}
+    assert set(by_variant) == {"faststart", "poster", "mobile"}
+    assert (by_variant["poster"].width, by_variant["poster"].height) == (1280, 720)
+    assert by_variant["mobile"].mime_type == "video/mp4"
+
+
+async def test_postprocess_video_keeps_renditions_that_succeed(monkeypatch):
+    async def fake_run_ffmpeg(*args):
+        target = Path(args[-1])
+        if target.name == "mobile.mp4":
+            raise FfmpegError("ffmpeg exited with 1: encoder missing")
+        if target.suffix == ".jpg":
+            Image.new("RGB", (64, 36)).save(target, "JPEG")
+        else:
+            target.write_bytes(b"mp4")
+
+    monkeypatch.setattr(video_processing, "run_ffmpeg", fake_run_ffmpeg)
+
+    renditions = await postprocess_video(b"source")
+
+    assert {rendition.variant for rendition in renditions} == {"faststart", "poster"}
+
+
+async def test_postprocess_video_raises_when_every_rendition_fails(monkeypatch):
+    monkeypatch.setattr(settings, "FFMPEG_PATH", shutil.which("false") or "false")
+
+    with pytest.raises(FfmpegError):
+        await postprocess_video(b"source")
+
+
+async def test_cancelled_run_ffmpeg_kills_the_process(monkeypatch, tmp_path):
+    pid_file = tmp_path / "pid"
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+    script.chmod(0o755)
+    monkeypatch.setattr(settings, "FFMPEG_PATH", str(script))
+
+    task = asyncio.create_task(run_ffmpeg("-version"))
+    while not pid_file.exists() or not pid_file.read_text().strip():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
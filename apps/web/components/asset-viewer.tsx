@@ -1,15 +1,49 @@
 import type { Asset, AssetKind } from "@/lib/api/types";
 import { buildPublicAssetUrl } from "@/lib/api/asset-url";
 
-function pickAsset(assets: Asset[], kind: AssetKind) {
-  return assets.find((asset) => asset.kind === kind && asset.status === "ready");
+function pickAsset(assets: Asset[], kind: AssetKind, variant = "original") {
+  return assets.find(
+    (asset) =>
+      asset.kind === kind &&
+      asset.status === "ready" &&
+      (asset.variant ?? "original") === variant,
+  );
+}
+
+function assetUrl(asset: Asset | undefined) {
+  return asset ? buildPublicAssetUrl(asset) : null;
+}
+
+function thumbnailSrcSet(assets: Asset[], kind: AssetKind, mimeType: string) {
+  return assets
+    .filter(
+      (asset) =>
+        asset.kind === kind &&
+        asset.status === "ready" &&
+        asset.variant?.startsWith("thumb_") &&
+        asset.mime_type === mimeType &&
+        asset.width,
+    )
+    .map((asset) => {
+      const url = buildPublicAssetUrl(asset);
+      return url ? `${url} ${asset.width}w` : null;
+    })
+    .filter(Boolean)
+    .join(", ");
 }
 
 export function AssetViewer({ assets }: { assets: Asset[] }) {
   const imageAsset = pickAsset(assets, "gimpified_image");
   const videoAsset = pickAsset(assets, "video");
+  // Post-processed renditions, when the worker produced them.
+  const faststartUrl = assetUrl(pickAsset(assets, "video", "faststart"));
+  const mobileUrl = assetUrl(pickAsset(assets, "video", "mobile"));
+  const posterUrl = assetUrl(pickAsset(assets, "video", "poster"));
 
   const imageUrl = imageAsset ? buildPublicAssetUrl(imageAsset) : null;
+  const avifSrcSet = thumbnailSrcSet(assets, "gimpified_image", "image/avif");
+  const webpSrcSet = thumbnailSrcSet(assets, "gimpified_image", "image/webp");
+  const imageSizes = "(min-width: 768px) 50vw, 100vw";
   const videoUrl = videoAsset ? buildPublicAssetUrl(videoAsset) : null;
 
   return (
@@ -17,11 +51,20 @@ export function AssetViewer({ assets }: { assets: Asset[] }) {
       <div className="rounded-2xl border border-slate-200 bg-white p-4">
         <p className="text-sm font-medium text-ink">Gimpified image</p>
         {imageUrl ? (
-          <img
-            src={imageUrl}
-            alt="Gimpified highlight"
-            className="mt-3 w-full rounded-xl object-cover"
-          />
+          <picture>
+            {avifSrcSet ? (
+              <source type="image/avif" srcSet={avifSrcSet} sizes={imageSizes} />
+            ) : null}
+            {webpSrcSet ? (
+              <source type="image/webp" srcSet={webpSrcSet} sizes={imageSizes} />
+            ) : null}
+            <img
+              src={imageUrl}
+              alt="Gimpified highlight"
+              loading="lazy"
+              className="mt-3 w-full rounded-xl object-cover"
+            />
+          </picture>
         ) : (
           <p className="mt-4 text-sm text-muted">
             Gimpified image not ready yet or bucket not configured.
@@ -34,9 +77,17 @@ export function AssetViewer({ assets }: { assets: Asset[] }) {
           <video
             controls
             preload="metadata"
+            poster={posterUrl ?? undefined}
             className="mt-3 w-full rounded-xl"
           >
-            <source src={videoUrl} />
+            {mobileUrl ? (
+              <source
+                src={mobileUrl}
+                type="video/mp4"
+                media="(max-width: 640px)"
+              />
+            ) : null}
+            <source src={faststartUrl ?? videoUrl} type="video/mp4" />
           </video>
         ) : (
           <p className="mt-4 text-sm text-muted">
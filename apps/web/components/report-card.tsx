@@ -24,9 +24,9 @@ export function ReportCard({
         </div>
         <StatusBadge status={report.status} />
       </div>
-      {report.content ? (
+      {report.excerpt ?? report.content ? (
         <p className="mt-4 text-sm text-slate-600">
-          {report.content}
+          {report.excerpt ?? report.content}
         </p>
       ) : (
         <p className="mt-4 text-sm text-slate-400">